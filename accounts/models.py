@@ -15,12 +15,14 @@ from phonenumber_field.modelfields import PhoneNumberField
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from terra360.tracking import TrackedFieldsMixin
+
 
 # =============== #
 # Core User model #
 # =============== #
 
-class User(AbstractUser):
+class User(TrackedFieldsMixin, AbstractUser):
     CLIENT_INDIV = "client_individual"
     CLIENT_COMPANY = "client_company"
     OWNER = "owner"
@@ -127,7 +129,7 @@ class UserProfile(TimeStampedModel):
 # Company / Org     #
 # ================= #
 
-class Company(TimeStampedModel):
+class Company(TrackedFieldsMixin, TimeStampedModel):
     LANDLORD = "landlord"  # propriétaire/bailleur
     AGENCY = "agency"  # agence
     CORPORATE = "corporate"  # client entreprise
@@ -4,6 +4,7 @@ from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from .models import UserProfile, Address, Company, CompanyMembership, KYCDocument
 from django.contrib.contenttypes.models import ContentType
+from terra360.signed_urls import SignedFileMixin, SignedURLListSerializer
 
 User = get_user_model()
 
@@ -91,7 +92,8 @@ class CompanyMembershipSerializer(serializers.ModelSerializer):
 
 
 # -------- KYC
-class KYCDocumentSerializer(serializers.ModelSerializer):
+class KYCDocumentSerializer(SignedFileMixin, serializers.ModelSerializer):
+    """`file` : URL signée à courte durée (cf. terra360.signed_urls), signée par page en liste."""
     owner_user_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), source="owner_user", required=False, allow_null=True
     )
@@ -107,6 +109,7 @@ class KYCDocumentSerializer(serializers.ModelSerializer):
             "owner_user_id", "owner_company_id", "created_at", "updated_at",
         ]
         read_only_fields = ["status", "reviewed_by", "reviewed_at"]
+        list_serializer_class = SignedURLListSerializer
 
     def create(self, validated_data):
         # lie le GenericFK à partir des raccourcis owner_user / owner_company
@@ -0,0 +1,22 @@
+# gunicorn.conf.py — chargé automatiquement par gunicorn depuis le répertoire courant (/app)
+"""
+Métriques Prometheus multiprocess (cf. terra360.instrumentation) : chaque worker écrit ses valeurs
+dans PROMETHEUS_MULTIPROC_DIR, /metrics agrège le répertoire. La variable est posée ici, avant le
+fork des workers, et le répertoire vidé au démarrage (valeurs d'un lancement précédent).
+"""
+import os
+import shutil
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/terra360-metrics")
+
+
+def on_starting(server):
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -3,6 +3,8 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
+from terra360.signed_urls import signed_url
+
 from .models import (
     PartyRole, Party, PartyAddress, PartyContact, PartyRelationship,
     PartyAttachment, PartyTag, PartyNote
@@ -128,7 +130,7 @@ class PartyAttachmentAdmin(admin.ModelAdmin):
     @admin.display(description="Fichier")
     def file_link(self, obj):
         if obj.file:
-            return format_html('<a href="{}" target="_blank">Télécharger</a>', obj.file.url)
+            return format_html('<a href="{}" target="_blank">Télécharger</a>', signed_url(obj.file))
         return "—"
 
 
@@ -0,0 +1,19 @@
+import parties.models
+import terra360.media
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parties', '0001_initial'),
+        ('public_api', '0004_mediablob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='partyattachment',
+            name='file',
+            field=terra360.media.DedupFileField(upload_to=parties.models.attachment_upload_to),
+        ),
+    ]
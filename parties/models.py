@@ -8,6 +8,8 @@ from django.db import models
 from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 
+from terra360.media import DedupFileField
+
 # =======================
 # Mixins / utilities
 # =======================
@@ -215,7 +217,7 @@ class PartyRelationship(TimeStampedModel):
 class PartyAttachment(TimeStampedModel):
     party = models.ForeignKey(Party, on_delete=models.CASCADE, related_name="attachments")
     title = models.CharField(max_length=200)
-    file = models.FileField(upload_to=attachment_upload_to)
+    file = DedupFileField(upload_to=attachment_upload_to)
     mime_type = models.CharField(max_length=120, blank=True)
     size_bytes = models.PositiveIntegerField(default=0)
 
@@ -269,12 +271,19 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 
+# Champs User / Company recopiés dans la Party liée
+USER_PARTY_FIELDS = ("first_name", "last_name", "username", "email", "phone")
+COMPANY_PARTY_FIELDS = ("name", "email", "phone")
+
+
 @receiver(post_save, sender="accounts.User")
-def create_or_update_party_for_user(sender, instance, created, **kwargs):
+def create_or_update_party_for_user(sender, instance, created, update_fields=None, **kwargs):
     """
     - Crée automatiquement une Party pour chaque User (si utile à ton business).
     - Met à jour le nom affiché.
     """
+    if update_fields is not None and not set(USER_PARTY_FIELDS) & set(update_fields):
+        return  # ex. update_last_login (update_fields=["last_login"]) à chaque connexion
     if created:
         full_name = instance.get_full_name().strip() or instance.username
         p = Party.objects.create(
@@ -330,11 +339,10 @@ def create_or_update_party_for_company(sender, instance, created, **kwargs):
             email=instance.email or "",
             phone=getattr(instance, "phone", None),
         )
-    else:
+    elif instance.has_changed(*COMPANY_PARTY_FIELDS):
         # Mettre à jour la Party liée si elle existe
-        party_qs = Party.objects.filter(company=instance)
-        if party_qs.exists():
-            p = party_qs.first()
+        p = Party.objects.filter(company=instance).first()
+        if p is not None:
             updates = []
             if p.full_name != instance.name:
                 p.full_name = instance.name
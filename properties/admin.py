@@ -10,6 +10,7 @@ from .models import (
     PropertyImage, UnitImage, PropertyDocument,
     FavoriteListing, VisitRequest, Valuation
 )
+from .renditions import rendition_url
 
 
 # =========
@@ -31,7 +32,7 @@ class PropertyImageInline(admin.TabularInline):
 
     def preview(self, obj):
         if obj and obj.image:
-            return format_html('<img src="{}" style="height:60px;border-radius:6px"/>', obj.image.url)
+            return format_html('<img src="{}" style="height:60px;border-radius:6px"/>', rendition_url(obj, "thumb"))
         return "—"
 
 
@@ -80,7 +81,7 @@ class UnitImageInline(admin.TabularInline):
 
     def preview(self, obj):
         if obj and obj.image:
-            return format_html('<img src="{}" style="height:60px;border-radius:6px"/>', obj.image.url)
+            return format_html('<img src="{}" style="height:60px;border-radius:6px"/>', rendition_url(obj, "thumb"))
         return "—"
 
 
@@ -173,7 +174,7 @@ class PropertyImageAdmin(admin.ModelAdmin):
 
     def thumb(self, obj):
         if obj and obj.image:
-            return format_html('<img src="{}" style="height:40px;border-radius:6px"/>', obj.image.url)
+            return format_html('<img src="{}" style="height:40px;border-radius:6px"/>', rendition_url(obj, "thumb"))
         return "—"
 
     thumb.short_description = "Aperçu"
@@ -188,7 +189,7 @@ class UnitImageAdmin(admin.ModelAdmin):
 
     def thumb(self, obj):
         if obj and obj.image:
-            return format_html('<img src="{}" style="height:40px;border-radius:6px"/>', obj.image.url)
+            return format_html('<img src="{}" style="height:40px;border-radius:6px"/>', rendition_url(obj, "thumb"))
         return "—"
 
     thumb.short_description = "Aperçu"
@@ -1,8 +1,8 @@
 # properties/filters.py
 import django_filters
-from django.db import models
 
 from .models import Listing
+from .search import search_listings
 
 
 class ListingFilter(django_filters.FilterSet):
@@ -15,9 +15,5 @@ class ListingFilter(django_filters.FilterSet):
         fields = ("listing_type", "is_featured")
 
     def filter_search(self, qs, name, value):
-        # cherche dans titre bien, adresse, ville…
-        return qs.filter(
-            models.Q(unit__property__title__icontains=value) |
-            models.Q(unit__property__city__icontains=value) |
-            models.Q(description__icontains=value)
-        )
+        # cherche dans titre bien, adresse, ville, quartier, équipements… (cf. properties.search)
+        return search_listings(qs, value).order_by("-search_rank", "-published_at")
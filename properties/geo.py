@@ -0,0 +1,114 @@
+# properties/geo.py
+"""
+Recherche géographique des annonces (rayon, bbox) et clustering serveur pour la carte.
+
+`Property.geom` est un PointField géographique (SRID 4326) avec index GiST (spatial_index par défaut) :
+`dwithin` / `intersects` sur `unit__property__geom` s'appuient dessus.
+"""
+from __future__ import annotations
+
+from django.contrib.gis.db.models import GeometryField
+from django.contrib.gis.db.models.functions import GeoHash
+from django.contrib.gis.geos import Point, Polygon
+from django.db.models import Avg, Count, FloatField, Func, Max, Min
+from django.db.models.functions import Cast
+
+LISTING_GEOM = "unit__property__geom"
+
+DEFAULT_RADIUS_KM = 5.0
+MAX_RADIUS_KM = 200.0
+MAX_ZOOM = 22
+
+# Précision geohash par niveau de zoom (≈ une dizaine de cellules par largeur d'écran)
+_GEOHASH_PRECISION = [
+    (3, 1), (5, 2), (8, 3), (10, 4), (13, 5), (15, 6), (18, 7), (MAX_ZOOM, 8),
+]
+
+
+def parse_point(value: str) -> Point:
+    """'lat,lng' → Point(lng, lat) en 4326."""
+    try:
+        lat, lng = (float(v) for v in value.split(","))
+    except (AttributeError, ValueError):
+        raise ValueError("Format attendu: lat,lng")
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("Coordonnées hors limites")
+    return Point(lng, lat, srid=4326)
+
+
+def parse_bbox(value: str) -> Polygon:
+    """'min_lng,min_lat,max_lng,max_lat' (ouest, sud, est, nord) → Polygon en 4326."""
+    try:
+        west, south, east, north = (float(v) for v in value.split(","))
+    except (AttributeError, ValueError):
+        raise ValueError("Format attendu: min_lng,min_lat,max_lng,max_lat")
+    if not (-180 <= west < east <= 180 and -90 <= south < north <= 90):
+        raise ValueError("Bounding box invalide")
+    bbox = Polygon.from_bbox((west, south, east, north))
+    bbox.srid = 4326
+    return bbox
+
+
+def parse_radius_km(value: str | None) -> float:
+    if not value:
+        return DEFAULT_RADIUS_KM
+    try:
+        radius = float(value)
+    except ValueError:
+        raise ValueError("radius_km doit être un nombre")
+    if not 0 < radius <= MAX_RADIUS_KM:
+        raise ValueError(f"radius_km doit être compris entre 0 et {MAX_RADIUS_KM:g}")
+    return radius
+
+
+def parse_zoom(value: str | None) -> int:
+    try:
+        zoom = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("zoom doit être un entier")
+    if not 0 <= zoom <= MAX_ZOOM:
+        raise ValueError(f"zoom doit être compris entre 0 et {MAX_ZOOM}")
+    return zoom
+
+
+def geohash_precision(zoom: int) -> int:
+    for max_zoom, precision in _GEOHASH_PRECISION:
+        if zoom <= max_zoom:
+            return precision
+    return _GEOHASH_PRECISION[-1][1]
+
+
+def cluster_listings(queryset, zoom: int) -> list[dict]:
+    """
+    Regroupe les annonces par cellule geohash (précision dépendant du zoom) :
+    un seul GROUP BY côté PostGIS, la carte ne reçoit jamais les points bruts.
+    """
+    geom = Cast(LISTING_GEOM, GeometryField(srid=4326))
+    rows = (
+        queryset
+        .filter(**{f"{LISTING_GEOM}__isnull": False})
+        .order_by()
+        .annotate(cell=GeoHash(geom, precision=geohash_precision(zoom)))
+        .values("cell")
+        .annotate(
+            count=Count("id"),
+            min_price=Min("price"),
+            max_price=Max("price"),
+            lng=Avg(Func(geom, function="ST_X", output_field=FloatField())),
+            lat=Avg(Func(geom, function="ST_Y", output_field=FloatField())),
+            listing_id=Min("id"),
+        )
+    )
+    return [
+        {
+            "id": row["cell"],
+            "lat": row["lat"],
+            "lng": row["lng"],
+            "count": row["count"],
+            "min_price": row["min_price"],
+            "max_price": row["max_price"],
+            # cellule à une seule annonce : le front peut ouvrir directement la fiche
+            "listing_id": row["listing_id"] if row["count"] == 1 else None,
+        }
+        for row in rows
+    ]
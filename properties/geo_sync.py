@@ -0,0 +1,63 @@
+# properties/geo_sync.py
+"""
+Dénormalisation Property.city / district → Listing.property_city / property_district.
+
+Un seul UPDATE ensembliste par lot de biens, limité aux annonces réellement divergentes
+(IS DISTINCT FROM) ; les groupes de stats quittés et rejoints sont ensuite recalculés.
+Les lots sont accumulés par properties.signals jusqu'au commit (cf. terra360.batching).
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.db import connection
+
+from terra360.batching import OnCommitBatch
+from .models import Listing, Property, Unit
+from .stats import LISTING_PATHS, group_keys, refresh_groups
+
+_SYNC_SQL = """
+WITH changed AS (
+    SELECT l.id, l.property_city AS old_city, l.property_district AS old_district,
+           p.city, p.district
+    FROM {listing} l
+    JOIN {unit} u ON u.id = l.unit_id
+    JOIN {property} p ON p.id = u.property_id
+    WHERE p.id = ANY(%s)
+      AND (l.property_city IS DISTINCT FROM p.city OR l.property_district IS DISTINCT FROM p.district)
+    FOR UPDATE OF l
+)
+UPDATE {listing} l
+SET property_city = c.city, property_district = c.district
+FROM changed c
+WHERE l.id = c.id
+RETURNING l.id, c.old_city, c.old_district
+"""
+
+
+def sync_listing_geo(property_ids: Iterable[int]) -> int:
+    """Recopie ville/quartier des biens dans leurs annonces. Retourne le nb d'annonces corrigées."""
+    property_ids = sorted(set(property_ids))
+    if not property_ids:
+        return 0
+    sql = _SYNC_SQL.format(
+        listing=Listing._meta.db_table, unit=Unit._meta.db_table, property=Property._meta.db_table,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [property_ids])
+        old_geo = {pk: (city, district) for pk, city, district in cursor.fetchall()}
+    if not old_geo:
+        return 0
+
+    # groupes de stats : ceux rejoints (état courant) + ceux quittés (ancienne ville/quartier)
+    changed = Listing.objects.filter(pk__in=old_geo)
+    keys = group_keys(changed)
+    for pk, *key in changed.order_by().values_list("pk", *LISTING_PATHS):
+        key[2], key[3] = old_geo[pk]
+        keys.add(tuple(key))
+    refresh_groups(keys)
+    return len(old_geo)
+
+
+# Biens dont les annonces sont à resynchroniser au commit
+geo_sync_batch = OnCommitBatch(sync_listing_geo)
@@ -1,9 +1,13 @@
 # properties/management/commands/seed_properties.py
 from django.core.management.base import BaseCommand
 from django.contrib.gis.geos import Point
+from django.db import connections, transaction
 from django.utils import timezone
+from django.utils.text import slugify
 from faker import Faker
+import multiprocessing
 import random
+import time
 
 from properties.models import (
     Property, Unit, Listing, Amenity,
@@ -14,15 +18,119 @@ from parties.models import Party  # optionnel si déjà présent
 
 fake = Faker("fr_FR")
 
+# Mode --bulk : quartiers d'Abidjan et emprise approximative de la Côte d'Ivoire
+DISTRICTS = ["Cocody", "Plateau", "Marcory", "Yopougon", "Treichville", "Koumassi",
+             "Riviera", "Angré", "Deux-Plateaux", "Bingerville", "Port-Bouët", "Abobo"]
+LNG_RANGE = (-8.6, -2.5)
+LAT_RANGE = (4.3, 10.7)
+POOL_SIZE = 500
+
+
+def _text_pools(rng_seed: int) -> dict:
+    """Textes Faker pré-générés : Faker coûte ~50 µs par appel, trop cher par ligne à l'échelle du million."""
+    f = Faker("fr_FR")
+    f.seed_instance(rng_seed)
+    return {
+        "titles": [f.sentence(nb_words=4) for _ in range(POOL_SIZE)],
+        "addresses": [f.street_address() for _ in range(POOL_SIZE)],
+        "cities": [f.city() for _ in range(POOL_SIZE // 10)],
+        "descriptions": [f.text(150) for _ in range(POOL_SIZE)],
+    }
+
+
+def _seed_chunk(job):
+    """
+    Génère un lot de propriétés (+ unités, annonces, équipements) en bulk_create.
+    Exécuté dans un worker : la graine dépend du n° de lot, pas du nombre de workers.
+    """
+    chunk_index, size, seed, user_ids, amenity_ids, pools = job
+    rng = random.Random(seed * 1_000_003 + chunk_index)
+    today = timezone.now().date()
+
+    with transaction.atomic():
+        props = []
+        for _ in range(size):
+            title = rng.choice(pools["titles"])
+            city = rng.choice(pools["cities"])
+            district = rng.choice(DISTRICTS)
+            props.append(Property(
+                title=title,
+                property_type=rng.choice([Property.RESIDENTIAL, Property.COMMERCIAL, Property.LAND]),
+                address=rng.choice(pools["addresses"]),
+                city=city,
+                district=district,
+                country="Côte d'Ivoire",
+                owner_user_id=rng.choice(user_ids),
+                geom=Point(rng.uniform(*LNG_RANGE), rng.uniform(*LAT_RANGE), srid=4326),
+                slug=slugify(f"{title}-{city}-{district}")[:260] or None,  # save() n'est pas appelé
+            ))
+        Property.objects.bulk_create(props)
+
+        units = []
+        for prop in props:
+            for j in range(rng.randint(1, 4)):
+                units.append(Unit(
+                    property_id=prop.pk,
+                    name=f"Unité {j + 1}",
+                    bedrooms=rng.randint(1, 5),
+                    bathrooms=rng.randint(1, 3),
+                    size_m2=rng.uniform(30, 250),
+                    is_available=True,
+                ))
+        Unit.objects.bulk_create(units)
+
+        city_by_property = {p.pk: (p.city, p.district) for p in props}
+        listings, unit_amenities = [], []
+        for unit in units:
+            city, district = city_by_property[unit.property_id]
+            listings.append(Listing(
+                unit_id=unit.pk,
+                listing_type=rng.choice([Listing.RENT, Listing.SALE]),
+                price=rng.randint(100_000, 10_000_000),
+                description=rng.choice(pools["descriptions"]),
+                currency="XOF",
+                property_city=city,  # dénormalisation habituellement faite par properties.signals
+                property_district=district,
+                is_active=True,
+                is_featured=rng.random() < 0.5,
+                available_from=today,
+            ))
+            for amenity_id in rng.sample(amenity_ids, rng.randint(1, min(3, len(amenity_ids)))):
+                unit_amenities.append(UnitAmenity(unit_id=unit.pk, amenity_id=amenity_id))
+        Listing.objects.bulk_create(listings)
+        UnitAmenity.objects.bulk_create(unit_amenities, ignore_conflicts=True)
+
+        PropertyAmenity.objects.bulk_create(
+            [
+                PropertyAmenity(property_id=prop.pk, amenity_id=amenity_id)
+                for prop in props
+                for amenity_id in rng.sample(amenity_ids, rng.randint(min(2, len(amenity_ids)), min(4, len(amenity_ids))))
+            ],
+            ignore_conflicts=True,
+        )
+    return len(props), len(listings)
+
 
 class Command(BaseCommand):
     help = "Génère des données factices pour les modèles Property, Unit, Listing, etc."
 
     def add_arguments(self, parser):
         parser.add_argument("--count", type=int, default=10, help="Nombre de propriétés à générer")
+        parser.add_argument("--bulk", action="store_true",
+                            help="Insertion par lots (bulk_create, sans signaux) puis recalcul des données dérivées")
+        parser.add_argument("--workers", type=int, default=1, help="Process de génération en parallèle (--bulk)")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Propriétés par lot/transaction (--bulk)")
+        parser.add_argument("--seed", type=int, default=None, help="Graine aléatoire (jeu de données reproductible)")
+        parser.add_argument("--skip-derived", action="store_true",
+                            help="--bulk : ne pas recalculer recherche, stats et suggestions")
 
     def handle(self, *args, **options):
         count = options["count"]
+        if options["seed"] is not None:
+            random.seed(options["seed"])
+            fake.seed_instance(options["seed"])
+        if options["bulk"]:
+            return self.handle_bulk(count, options)
 
         self.stdout.write(self.style.WARNING(f"Génération de {count} propriétés avec unités et annonces..."))
 
@@ -83,3 +191,67 @@ class Command(BaseCommand):
                 PropertyAmenity.objects.get_or_create(property=prop, amenity=amenity)
 
         self.stdout.write(self.style.SUCCESS(f"{count} propriétés créées avec succès !"))
+
+    def handle_bulk(self, count, options):
+        seed = options["seed"] if options["seed"] is not None else random.randrange(2 ** 31)
+        chunk_size = max(1, options["chunk_size"])
+        workers = max(1, options["workers"])
+
+        user_ids = list(User.objects.values_list("id", flat=True)[:10])
+        if not user_ids:
+            self.stdout.write(self.style.ERROR("Aucun utilisateur trouvé. Crée d’abord au moins un utilisateur."))
+            return
+        for label in ["Piscine", "Garage", "Jardin", "Sécurité 24/7", "Ascenseur", "Balcon", "Climatisation"]:
+            Amenity.objects.get_or_create(code=label.lower().replace(" ", "-"), label=label)
+        amenity_ids = list(Amenity.objects.order_by("id").values_list("id", flat=True))
+
+        pools = _text_pools(seed)
+        jobs = [
+            (i, min(chunk_size, count - start), seed, user_ids, amenity_ids, pools)
+            for i, start in enumerate(range(0, count, chunk_size))
+        ]
+        self.stdout.write(self.style.WARNING(
+            f"Génération bulk de {count} propriétés : {len(jobs)} lots, {workers} worker(s), graine {seed}..."
+        ))
+
+        started = time.monotonic()
+        done_props = done_listings = 0
+        if workers == 1:
+            results = map(_seed_chunk, jobs)
+        else:
+            # les workers forkés ne doivent pas réutiliser la connexion du parent
+            connections.close_all()
+            pool = multiprocessing.get_context("fork").Pool(workers)
+            results = pool.imap_unordered(_seed_chunk, jobs)
+        try:
+            for n_props, n_listings in results:
+                done_props += n_props
+                done_listings += n_listings
+                rate = done_listings / max(time.monotonic() - started, 1e-6)
+                self.stdout.write(f"  {done_props}/{count} propriétés, {done_listings} annonces ({rate:,.0f} annonces/s)")
+        finally:
+            if workers > 1:
+                pool.close()
+                pool.join()
+
+        if not options["skip_derived"]:
+            self.rebuild_derived()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{done_props} propriétés / {done_listings} annonces créées en {elapsed:.1f}s (graine {seed})"
+        ))
+
+    def rebuild_derived(self):
+        """bulk_create n'émet pas de signaux : données dérivées recalculées en quelques requêtes ensemblistes."""
+        from properties.search import refresh_listing_search
+        from properties.stats import rebuild_listing_stats
+        from properties.suggest import rebuild_suggestions
+        from public_api.tiles import invalidate_tiles
+
+        self.stdout.write("Recalcul des documents de recherche...")
+        refresh_listing_search(all_listings=True)
+        self.stdout.write("Reconstruction du rollup de stats...")
+        rebuild_listing_stats()
+        self.stdout.write("Reconstruction de l'index d'autocomplétion...")
+        rebuild_suggestions()
+        invalidate_tiles()
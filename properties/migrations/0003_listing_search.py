@@ -0,0 +1,78 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations, models
+
+
+# Copie figée de properties.search._REFRESH_SQL à la date de la migration (modèles historiques
+# uniquement : la migration ne doit pas dépendre du code applicatif, qui évolue)
+BACKFILL_SQL = """
+WITH docs AS (
+    SELECT l.id,
+           lower(unaccent(coalesce(p.title, ''))) AS title,
+           lower(unaccent(concat_ws(' ', p.city, p.district, p.address))) AS place,
+           lower(unaccent(concat_ws(' ', u.name, (
+               SELECT string_agg(a.label, ' ')
+               FROM {amenity} a
+               WHERE a.id IN (
+                   SELECT ua.amenity_id FROM {unit_amenity} ua WHERE ua.unit_id = u.id
+                   UNION
+                   SELECT pa.amenity_id FROM {property_amenity} pa WHERE pa.property_id = p.id
+               )
+           )))) AS extra,
+           lower(unaccent(coalesce(l.description, ''))) AS body
+    FROM {listing} l
+    JOIN {unit} u ON u.id = l.unit_id
+    JOIN {property} p ON p.id = u.property_id
+)
+UPDATE {listing} AS l
+SET search_document = concat_ws(' ', d.title, d.place, d.extra),
+    search_vector = setweight(to_tsvector('simple', d.title), 'A')
+                 || setweight(to_tsvector('simple', d.place), 'B')
+                 || setweight(to_tsvector('simple', d.extra), 'C')
+                 || setweight(to_tsvector('simple', d.body), 'D')
+FROM docs d
+WHERE l.id = d.id
+"""
+
+
+def backfill_search(apps, schema_editor):
+    tables = {
+        name: apps.get_model("properties", model)._meta.db_table
+        for name, model in (
+            ("listing", "Listing"), ("unit", "Unit"), ("property", "Property"), ("amenity", "Amenity"),
+            ("unit_amenity", "UnitAmenity"), ("property_amenity", "PropertyAmenity"),
+        )
+    }
+    schema_editor.execute(BACKFILL_SQL.format(**tables))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0002_alter_amenity_options_alter_unit_options_and_more'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        migrations.AddField(
+            model_name='listing',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='listing',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='listing_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_document'], name='listing_search_doc_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(backfill_search, migrations.RunPython.noop),
+    ]
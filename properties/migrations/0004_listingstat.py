@@ -0,0 +1,73 @@
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+
+def build_stats(apps, schema_editor):
+    # modèles historiques uniquement (cf. properties.stats.rebuild_listing_stats à cette date)
+    Listing = apps.get_model("properties", "Listing")
+    ListingStat = apps.get_model("properties", "ListingStat")
+    rows = (
+        Listing.objects.filter(is_active=True)
+        .order_by()
+        .values("listing_type", "unit__property__property_type", "property_city", "property_district",
+                "unit__bedrooms")
+        .annotate(count=Count("id"), price_sum=Sum("price"), price_min=Min("price"), price_max=Max("price"))
+    )
+    stats = {}
+    for row in rows:
+        key = (
+            row["listing_type"], row["unit__property__property_type"], row["property_city"] or "",
+            row["property_district"] or "", row["unit__bedrooms"] or 0,
+        )
+        stat = stats.get(key)
+        if stat is None:  # NULL et "" (ville/quartier) fusionnés dans le même groupe
+            stats[key] = dict(count=row["count"], price_sum=row["price_sum"],
+                              price_min=row["price_min"], price_max=row["price_max"])
+        else:
+            stat["count"] += row["count"]
+            stat["price_sum"] += row["price_sum"]
+            stat["price_min"] = min(stat["price_min"], row["price_min"])
+            stat["price_max"] = max(stat["price_max"], row["price_max"])
+    ListingStat.objects.bulk_create(
+        [
+            ListingStat(listing_type=key[0], property_type=key[1], city=key[2], district=key[3], bedrooms=key[4],
+                        **values)
+            for key, values in stats.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0003_listing_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('listing_type', models.CharField(choices=[('rent', 'Location'), ('sale', 'Vente')], max_length=16)),
+                ('property_type', models.CharField(choices=[('residential', 'Résidentiel'), ('commercial', 'Commercial'), ('land', 'Terrain')], max_length=32)),
+                ('city', models.CharField(blank=True, default='', max_length=120)),
+                ('district', models.CharField(blank=True, default='', max_length=120)),
+                ('bedrooms', models.IntegerField(default=0)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=24)),
+                ('price_min', models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True)),
+                ('price_max', models.DecimalField(blank=True, decimal_places=2, max_digits=14, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Statistique d’annonces',
+                'verbose_name_plural': 'Statistiques d’annonces',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='listingstat',
+            constraint=models.UniqueConstraint(fields=('listing_type', 'property_type', 'city', 'district', 'bedrooms'), name='unique_listing_stat_group'),
+        ),
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE/DROP INDEX CONCURRENTLY : pas de verrou d'écriture sur properties_listing
+    atomic = False
+
+    dependencies = [
+        ('properties', '0004_listingstat'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['published_at', 'id'], name='listing_active_pub_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['price', 'id'], name='listing_active_price_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['listing_type', 'published_at', 'id'], name='listing_active_type_pub_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['listing_type', 'price', 'id'], name='listing_active_type_price_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_featured', True)), fields=['published_at', 'id'], name='listing_featured_pub_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='listing',
+            index=django.contrib.postgres.indexes.GinIndex(condition=models.Q(('is_active', True)), fields=['property_city'], name='listing_active_city_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        # remplacés par les index partiels ci-dessus
+        RemoveIndexConcurrently(
+            model_name='listing',
+            name='properties__listing_92411a_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='listing',
+            name='properties__is_acti_fbce01_idx',
+        ),
+    ]
@@ -0,0 +1,29 @@
+import properties.models
+import terra360.media
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0006_image_renditions'),
+        ('public_api', '0004_mediablob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='propertydocument',
+            name='file',
+            field=terra360.media.DedupFileField(upload_to=properties.models.property_doc_upload_to),
+        ),
+        migrations.AlterField(
+            model_name='propertyimage',
+            name='image',
+            field=terra360.media.DedupImageField(upload_to=properties.models.property_image_upload_to),
+        ),
+        migrations.AlterField(
+            model_name='unitimage',
+            name='image',
+            field=terra360.media.DedupImageField(upload_to=properties.models.unit_image_upload_to),
+        ),
+    ]
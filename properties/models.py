@@ -5,14 +5,19 @@ from django.conf import settings
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 from django.contrib.gis.db import models  # GeoDjango fields inclus
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.text import slugify
 
+from terra360.media import DedupFileField, DedupImageField
+from terra360.tracking import TrackedFieldsMixin
+
 
 # =======================
 # Core : Property / Unit / Listing
 # =======================
 
-class Property(models.Model):
+class Property(TrackedFieldsMixin, models.Model):
     RESIDENTIAL = "residential"
     COMMERCIAL = "commercial"
     LAND = "land"
@@ -55,7 +60,7 @@ class Property(models.Model):
         return self.title
 
 
-class Unit(models.Model):
+class Unit(TrackedFieldsMixin, models.Model):
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name="units")
     name = models.CharField(max_length=120)
     bedrooms = models.IntegerField(default=0)
@@ -75,7 +80,7 @@ class Unit(models.Model):
         return f"{self.property} - {self.name}"
 
 
-class Listing(models.Model):
+class Listing(TrackedFieldsMixin, models.Model):
     RENT = "rent"
     SALE = "sale"
     LISTING_TYPES = [(RENT, "Location"), (SALE, "Vente")]
@@ -97,19 +102,69 @@ class Listing(models.Model):
     published_at = models.DateTimeField(auto_now_add=True)
     views_count = models.PositiveIntegerField(default=0)
 
+    # ➕ Recherche plein texte / floue (maintenu par properties.search.refresh_listing_search)
+    search_document = models.TextField(blank=True, default="", editable=False)
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
     class Meta:
         indexes = [
-            models.Index(fields=["listing_type"]),
-            models.Index(fields=["is_active", "is_featured"]),
             models.Index(fields=["published_at"]),
             models.Index(fields=["price"]),
             models.Index(fields=["property_city", "property_district"]),
+            # Index partiels (annonces actives) alignés sur les formes de ListingFilterSet :
+            # filtre type optionnel + tri/curseur (-published_at, -id) ou (price, id)
+            models.Index(fields=["published_at", "id"], name="listing_active_pub_idx",
+                         condition=models.Q(is_active=True)),
+            models.Index(fields=["price", "id"], name="listing_active_price_idx",
+                         condition=models.Q(is_active=True)),
+            models.Index(fields=["listing_type", "published_at", "id"], name="listing_active_type_pub_idx",
+                         condition=models.Q(is_active=True)),
+            models.Index(fields=["listing_type", "price", "id"], name="listing_active_type_price_idx",
+                         condition=models.Q(is_active=True)),
+            models.Index(fields=["published_at", "id"], name="listing_featured_pub_idx",
+                         condition=models.Q(is_active=True, is_featured=True)),
+            # ?city= (ILIKE '%…%') sur la colonne dénormalisée
+            GinIndex(fields=["property_city"], opclasses=["gin_trgm_ops"], name="listing_active_city_trgm",
+                     condition=models.Q(is_active=True)),
+            GinIndex(fields=["search_vector"], name="listing_search_vector_gin"),
+            GinIndex(fields=["search_document"], opclasses=["gin_trgm_ops"], name="listing_search_doc_trgm"),
         ]
 
     def __str__(self):
         return f"{self.unit} - {self.listing_type}"
 
 
+class ListingStat(models.Model):
+    """
+    Rollup des annonces actives par (type d'annonce, type de bien, ville, quartier, chambres),
+    maintenu par properties.stats : sert /listings/stats/ sans agréger toute la table.
+    """
+    listing_type = models.CharField(max_length=16, choices=Listing.LISTING_TYPES)
+    property_type = models.CharField(max_length=32, choices=Property.TYPES)
+    city = models.CharField(max_length=120, blank=True, default="")
+    district = models.CharField(max_length=120, blank=True, default="")
+    bedrooms = models.IntegerField(default=0)
+
+    count = models.PositiveIntegerField(default=0)
+    price_sum = models.DecimalField(max_digits=24, decimal_places=2, default=0)
+    price_min = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    price_max = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Statistique d’annonces"
+        verbose_name_plural = "Statistiques d’annonces"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["listing_type", "property_type", "city", "district", "bedrooms"],
+                name="unique_listing_stat_group",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.listing_type}/{self.property_type} {self.city} {self.district} {self.bedrooms}ch: {self.count}"
+
+
 # =======================
 # Catalogue d'équipements / services
 # =======================
@@ -175,9 +230,21 @@ def property_doc_upload_to(instance: "PropertyDocument", filename: str) -> str:
     return f"properties/{instance.property_id}/docs/{uuid.uuid4()}-{filename}"
 
 
-class PropertyImage(models.Model):
+class ResponsiveImage(models.Model):
+    """Champs renseignés par properties.renditions après l'upload (déclinaisons WebP/AVIF, LQIP)."""
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
+    placeholder = models.TextField(blank=True, default="", editable=False)
+    processed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+
+class PropertyImage(ResponsiveImage):
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name="images")
-    image = models.ImageField(upload_to=property_image_upload_to)
+    image = DedupImageField(upload_to=property_image_upload_to)
     caption = models.CharField(max_length=200, blank=True)
     is_primary = models.BooleanField(default=False)
     ordering = models.PositiveIntegerField(default=0)
@@ -190,9 +257,9 @@ class PropertyImage(models.Model):
         return f"Photo {self.property} ({'★' if self.is_primary else ''})"
 
 
-class UnitImage(models.Model):
+class UnitImage(ResponsiveImage):
     unit = models.ForeignKey(Unit, on_delete=models.CASCADE, related_name="images")
-    image = models.ImageField(upload_to=unit_image_upload_to)
+    image = DedupImageField(upload_to=unit_image_upload_to)
     caption = models.CharField(max_length=200, blank=True)
     ordering = models.PositiveIntegerField(default=0)
 
@@ -212,7 +279,7 @@ class PropertyDocument(models.Model):
     property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name="documents")
     doc_type = models.CharField(max_length=16, choices=TYPES, default=OTHER)
     title = models.CharField(max_length=200)
-    file = models.FileField(upload_to=property_doc_upload_to)
+    file = DedupFileField(upload_to=property_doc_upload_to)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -0,0 +1,273 @@
+# properties/renditions.py
+"""
+Déclinaisons responsives des photos (PropertyImage / UnitImage).
+
+Après l'upload (tâche Celery `properties.process_image`, programmée au commit) :
+- l'original est décodé une fois (JPEG : décodage réduit via `draft`), orienté selon l'EXIF ;
+- chaque largeur de IMAGE_RENDITION_WIDTHS (thumb / card / full, sans agrandissement) est
+  encodée dans chaque format de IMAGE_RENDITION_FORMATS pris en charge par Pillow (WebP, AVIF),
+  sans métadonnées (EXIF/GPS retirés) ;
+- un placeholder LQIP (WebP ~16 px en data URI) et les dimensions d'origine sont calculés ;
+- les clés sont écrites sur l'image (`renditions`, `width`, `height`, `placeholder`).
+
+`renditions` = {"source": <nom de l'original>, "thumb": {"width", "height", "webp", "avif"}, ...} ;
+"source" permet de savoir si l'original a changé depuis le dernier traitement. Original illisible :
+{"source", "error"} — échec enregistré, non retenté tant que l'original n'est pas remplacé.
+Les serializers lisent `image_sources` / `rendition_url`, qui retombent sur l'original tant que
+le traitement n'est pas passé.
+"""
+from __future__ import annotations
+
+import base64
+import logging
+import mimetypes
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models import F, Q
+from django.db.models.fields.json import KT
+from django.utils import timezone
+from PIL import ExifTags, Image, ImageOps, UnidentifiedImageError, features
+
+from terra360.media import is_blob_name
+
+logger = logging.getLogger(__name__)
+
+MIME_TYPES = {"webp": "image/webp", "avif": "image/avif"}
+PLACEHOLDER_SIZE = 16
+
+
+# ---------- Lecture (serializers, admin) ----------
+
+def is_attempted(image) -> bool:
+    """Original courant déjà passé par le traitement (déclinaisons produites, ou échec enregistré)."""
+    return bool(image.image) and (image.renditions or {}).get("source") == image.image.name
+
+
+def is_processed(image) -> bool:
+    return is_attempted(image) and "error" not in image.renditions
+
+
+def rendition_name(source: str, renditions: dict | None, name: str, fmt: str = "webp") -> str:
+    """Clé de stockage d'une déclinaison, à défaut l'original (pas encore traité, ou remplacé depuis)."""
+    renditions = renditions or {}
+    if renditions.get("source") != source or "error" in renditions:
+        return source
+    return renditions.get(name, {}).get(fmt) or source
+
+
+def rendition_url(image, name: str, fmt: str = "webp") -> str | None:
+    if not image.image:
+        return None
+    return image.image.storage.url(rendition_name(image.image.name, image.renditions, name, fmt))
+
+
+def image_sources(image) -> dict | None:
+    """
+    Structure `srcset` pour <picture> :
+    {"src", "width", "height", "placeholder", "sources": [{"type", "srcset"}, ...]}.
+    """
+    if not image.image:
+        return None
+    if not is_processed(image):
+        return {"src": image.image.url, "width": image.width, "height": image.height,
+                "placeholder": None, "sources": []}
+    storage = image.image.storage
+    # une même déclinaison peut servir plusieurs noms (original plus petit que les cibles)
+    by_width = {entry["width"]: entry for entry in _entries(image.renditions)}
+    sizes = [by_width[w] for w in sorted(by_width)]
+    sources = []
+    for fmt in ("avif", "webp"):  # du plus compact au plus compatible
+        candidates = [f"{storage.url(entry[fmt])} {entry['width']}w" for entry in sizes if entry.get(fmt)]
+        if candidates:
+            sources.append({"type": MIME_TYPES[fmt], "srcset": ", ".join(candidates)})
+    return {
+        "src": rendition_url(image, "card"),
+        "width": image.width,
+        "height": image.height,
+        "placeholder": image.placeholder or None,
+        "sources": sources,
+    }
+
+
+# ---------- Traitement ----------
+
+def available_formats() -> list[str]:
+    formats = []
+    for fmt in settings.IMAGE_RENDITION_FORMATS:
+        try:
+            supported = features.check(fmt)
+        except ValueError:  # format inconnu de cette version de Pillow
+            supported = False
+        if supported:
+            formats.append(fmt)
+        else:
+            logger.debug("Format de déclinaison %s non pris en charge par Pillow", fmt)
+    return formats
+
+
+def _encode(img: Image.Image, fmt: str, quality: int) -> bytes:
+    buf = BytesIO()
+    # aucun `exif=` transmis : les déclinaisons ne portent aucune métadonnée
+    img.save(buf, format=fmt.upper(), quality=quality)
+    return buf.getvalue()
+
+
+def _placeholder(img: Image.Image) -> str:
+    tiny = img.copy()
+    tiny.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    data = _encode(tiny.convert("RGB"), "webp", 30)
+    return "data:image/webp;base64," + base64.b64encode(data).decode()
+
+
+def _rendition_key(source: str, name: str, fmt: str) -> str:
+    folder, filename = posixpath.split(source)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(folder, "renditions", f"{stem}-{name}.{fmt}")
+
+
+def _entries(renditions: dict | None):
+    # "source" / "error" sont des chaînes, les déclinaisons des dicts
+    return [entry for entry in (renditions or {}).values() if isinstance(entry, dict)]
+
+
+def rendition_keys(renditions: dict | None) -> set[str]:
+    keys = set()
+    for entry in _entries(renditions):
+        keys.update(entry.get(fmt) for fmt in MIME_TYPES if entry.get(fmt))
+    return keys
+
+
+def delete_renditions(storage, keys) -> None:
+    for key in keys:
+        try:
+            storage.delete(key)
+        except Exception:
+            logger.warning("Suppression de la déclinaison %s impossible", key, exc_info=True)
+
+
+def _save_renditions(image, source: str, **values) -> bool:
+    # l'original a pu être remplacé pendant le traitement : n'écrire que s'il est inchangé
+    return bool(type(image).objects.filter(pk=image.pk, image=source).update(processed_at=timezone.now(), **values))
+
+
+def _release_previous(image, storage, written=()) -> None:
+    # les déclinaisons d'un blob partagé (terra360.media) sont supprimées avec le blob, pas ici
+    previous = image.renditions or {}
+    if previous.get("source") and not is_blob_name(previous["source"]):
+        delete_renditions(storage, rendition_keys(previous) - set(written))
+
+
+def reuse_renditions(image) -> bool:
+    """Même fichier (blob dédupliqué) déjà traité pour une autre image : ses déclinaisons sont reprises."""
+    from .models import PropertyImage, UnitImage
+
+    source = image.image.name
+    if not is_blob_name(source):
+        return False
+    for model in (PropertyImage, UnitImage):
+        done = (
+            model.objects.filter(image=source, renditions__source=source)
+            .exclude(renditions__has_key="error")  # échec enregistré : ne se propage pas aux autres lignes
+            .exclude(pk=image.pk if model is type(image) else None)
+            .values("renditions", "width", "height", "placeholder").first()
+        )
+        if done and _save_renditions(image, source, **done):
+            _release_previous(image, image.image.storage)
+            return True
+    return False
+
+
+def process_image(image) -> bool:
+    """Génère les déclinaisons d'une image et les enregistre ; False si l'original est illisible."""
+    if reuse_renditions(image):
+        return True
+    field = image.image
+    source = field.name
+    storage = field.storage
+    widths = settings.IMAGE_RENDITION_WIDTHS
+    formats = available_formats()
+    quality = settings.IMAGE_RENDITION_QUALITY
+
+    try:
+        with field.open("rb") as fh:
+            img = Image.open(fh)
+            # dimensions d'origine, après rotation EXIF (orientations 5 à 8 : largeur/hauteur inversées)
+            orientation = img.getexif().get(ExifTags.Base.Orientation)
+            width, height = img.size[::-1] if orientation in (5, 6, 7, 8) else img.size
+            # JPEG : décodage directement à l'échelle utile (×2 de marge pour la qualité)
+            largest = max(widths.values())
+            img.draft("RGB", (largest * 2, largest * 2))
+            img = ImageOps.exif_transpose(img)
+            img.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as exc:
+        logger.warning("Image illisible, déclinaisons ignorées : %s", source, exc_info=True)
+        # échec enregistré : l'image sort de pending_images jusqu'au remplacement de l'original
+        error = f"{type(exc).__name__}: {exc}"[:200]
+        if _save_renditions(image, source, renditions={"source": source, "error": error}):
+            _release_previous(image, storage)
+        return False
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+
+    renditions = {"source": source}
+    written = []
+    by_width = {}
+    try:
+        for name, target in sorted(widths.items(), key=lambda item: item[1]):
+            w = min(target, img.width)
+            if w in by_width:  # original plus petit que plusieurs cibles : une seule déclinaison
+                renditions[name] = by_width[w]
+                continue
+            h = max(1, round(img.height * w / img.width))
+            resized = img if w == img.width else img.resize((w, h), Image.Resampling.LANCZOS)
+            entry = {"width": w, "height": h}
+            for fmt in formats:
+                key = storage.save(_rendition_key(source, name, fmt), ContentFile(_encode(resized, fmt, quality)))
+                written.append(key)
+                entry[fmt] = key
+            renditions[name] = by_width[w] = entry
+        placeholder = _placeholder(img)
+    except Exception:
+        delete_renditions(storage, written)
+        raise
+
+    if not _save_renditions(image, source, renditions=renditions, width=width, height=height,
+                            placeholder=placeholder):
+        if not is_blob_name(source):
+            delete_renditions(storage, written)
+        return False
+    _release_previous(image, storage, written)
+    return True
+
+
+def delete_blob_renditions(storage, name: str) -> None:
+    """Blob supprimé (terra360.media) : toutes ses déclinaisons possibles."""
+    if not (mimetypes.guess_type(name)[0] or "").startswith("image/"):
+        return
+    delete_renditions(storage, [
+        _rendition_key(name, rendition, fmt)
+        for rendition in settings.IMAGE_RENDITION_WIDTHS for fmt in MIME_TYPES
+    ])
+
+
+def schedule_processing(image) -> None:
+    """À appeler au commit : traitement asynchrone (le filet périodique rattrape un broker indisponible)."""
+    from .tasks import process_image_task
+    try:
+        process_image_task.delay(image._meta.label, image.pk)
+    except Exception:
+        logger.warning("Programmation du traitement de %s #%s impossible", image._meta.label, image.pk,
+                       exc_info=True)
+
+
+def pending_images(model, limit: int):
+    """Images jamais traitées ou dont l'original a changé depuis (les échecs enregistrés en sont exclus)."""
+    return (
+        model.objects.exclude(image="")
+        .alias(processed_source=KT("renditions__source"))
+        .filter(Q(processed_source__isnull=True) | ~Q(processed_source=F("image")))
+        .order_by("id")[:limit]
+    )
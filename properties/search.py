@@ -0,0 +1,113 @@
+# properties/search.py
+"""
+Document de recherche dénormalisé des annonces.
+
+Chaque Listing porte :
+- `search_document` : texte court (titre, lieu, unité, équipements) sans accents, en minuscules,
+  indexé en trigrammes (pg_trgm) pour la recherche floue ("cocodi" → "Cocody") ;
+- `search_vector` : tsvector pondéré (titre > lieu > unité/équipements > description), indexé en GIN.
+
+Les deux colonnes sont recalculées en SQL ensembliste (un seul UPDATE par lot) par
+`refresh_listing_search`, appelé depuis properties.signals.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Iterable
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import F, Q
+
+from .models import Amenity, Listing, Property, PropertyAmenity, Unit, UnitAmenity
+
+# Config 'simple' : pas de stemming, adapté aux noms propres (villes, quartiers) et au français
+SEARCH_CONFIG = "simple"
+
+_REFRESH_SQL = """
+WITH docs AS (
+    SELECT l.id,
+           lower(unaccent(coalesce(p.title, ''))) AS title,
+           lower(unaccent(concat_ws(' ', p.city, p.district, p.address))) AS place,
+           lower(unaccent(concat_ws(' ', u.name, (
+               SELECT string_agg(a.label, ' ')
+               FROM {amenity} a
+               WHERE a.id IN (
+                   SELECT ua.amenity_id FROM {unit_amenity} ua WHERE ua.unit_id = u.id
+                   UNION
+                   SELECT pa.amenity_id FROM {property_amenity} pa WHERE pa.property_id = p.id
+               )
+           )))) AS extra,
+           lower(unaccent(coalesce(l.description, ''))) AS body
+    FROM {listing} l
+    JOIN {unit} u ON u.id = l.unit_id
+    JOIN {property} p ON p.id = u.property_id
+    WHERE {where}
+)
+UPDATE {listing} AS l
+SET search_document = concat_ws(' ', d.title, d.place, d.extra),
+    search_vector = setweight(to_tsvector('{config}', d.title), 'A')
+                 || setweight(to_tsvector('{config}', d.place), 'B')
+                 || setweight(to_tsvector('{config}', d.extra), 'C')
+                 || setweight(to_tsvector('{config}', d.body), 'D')
+FROM docs d
+WHERE l.id = d.id
+"""
+
+
+def normalize_search_text(value: str | None) -> str:
+    """Minuscules + suppression des accents (même normalisation que unaccent côté SQL)."""
+    value = unicodedata.normalize("NFKD", value or "")
+    return "".join(c for c in value if not unicodedata.combining(c)).lower().strip()
+
+
+def refresh_listing_search(
+        listing_ids: Iterable[int] = (),
+        unit_ids: Iterable[int] = (),
+        property_ids: Iterable[int] = (),
+        all_listings: bool = False,
+) -> int:
+    """Recalcule le document de recherche des annonces ciblées. Retourne le nb de lignes mises à jour."""
+    clauses, params = [], []
+    for column, ids in (("l.id", listing_ids), ("u.id", unit_ids), ("p.id", property_ids)):
+        ids = sorted({int(i) for i in ids if i is not None})
+        if ids:
+            clauses.append(f"{column} = ANY(%s)")
+            params.append(ids)
+    if all_listings:
+        clauses, params = ["TRUE"], []
+    if not clauses:
+        return 0
+
+    sql = _REFRESH_SQL.format(
+        listing=Listing._meta.db_table,
+        unit=Unit._meta.db_table,
+        property=Property._meta.db_table,
+        amenity=Amenity._meta.db_table,
+        unit_amenity=UnitAmenity._meta.db_table,
+        property_amenity=PropertyAmenity._meta.db_table,
+        config=SEARCH_CONFIG,
+        where=" OR ".join(clauses),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def search_listings(queryset, query: str):
+    """
+    Filtre + annote `search_rank` : plein texte (préfixes, sans accents) OU similarité trigramme.
+    Le tri par pertinence est laissé à l'appelant (cf. ListingSearchFilter).
+    """
+    term = normalize_search_text(query)
+    tokens = re.findall(r"\w+", term)
+    if not tokens:
+        return queryset
+
+    ts_query = SearchQuery(" & ".join(f"{t}:*" for t in tokens), config=SEARCH_CONFIG, search_type="raw")
+    return (
+        queryset
+        .filter(Q(search_vector=ts_query) | Q(search_document__trigram_word_similar=term))
+        .annotate(search_rank=SearchRank(F("search_vector"), ts_query) + TrigramWordSimilarity(term, "search_document"))
+    )
@@ -1,7 +1,33 @@
 # apps/listings/signals.py
-from django.db.models.signals import pre_save, post_save
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
-from .models import Listing, Unit
+
+from terra360 import media
+
+from . import renditions
+from .geo_sync import geo_sync_batch
+from .models import Listing, Unit, Property, Amenity, UnitAmenity, PropertyAmenity, PropertyImage, UnitImage
+from .search import refresh_listing_search
+from .stats import group_keys, refresh_groups
+from .suggest import schedule_suggestions_rebuild
+
+# Champs d'un bien recopiés dans ses annonces (cf. properties.geo_sync)
+PROPERTY_GEO_FIELDS = {"city", "district"}
+
+# Champs d'une Listing qui entrent dans son document de recherche
+LISTING_SEARCH_FIELDS = {"description", "unit"}
+UNIT_SEARCH_FIELDS = {"name", "property"}
+PROPERTY_SEARCH_FIELDS = {"title", "address", "city", "district"}
+
+# Champs qui déplacent une annonce d'un groupe de stats à l'autre (cf. properties.stats)
+LISTING_STATS_FIELDS = {"listing_type", "price", "is_active", "unit", "property_city", "property_district"}
+UNIT_STATS_FIELDS = {"bedrooms", "property"}
+PROPERTY_STATS_FIELDS = {"property_type"}
+
+# Champs qui alimentent l'index d'autocomplétion (cf. properties.suggest)
+LISTING_SUGGEST_FIELDS = {"is_active", "unit", "property_city", "property_district"}
+PROPERTY_SUGGEST_FIELDS = {"title", "city", "district"}
 
 
 def _sync_listing_geo(listing: Listing):
@@ -10,16 +36,192 @@ def _sync_listing_geo(listing: Listing):
     listing.property_district = prop.district
 
 
+def _touches(instance, update_fields, fields) -> bool:
+    """La sauvegarde écrit-elle l'un de ces champs, et l'un d'eux a-t-il réellement changé ?"""
+    if update_fields is not None and not fields & set(update_fields):
+        return False
+    return instance.has_changed(*fields)
+
+
+def _refresh_search_on_commit(**ids):
+    transaction.on_commit(lambda: refresh_listing_search(**ids))
+
+
+def _refresh_stats_on_commit(keys):
+    if keys:
+        transaction.on_commit(lambda: refresh_groups(keys))
+
+
 @receiver(pre_save, sender=Listing)
 def listing_pre_save(sender, instance: Listing, **kwargs):
     if instance.unit_id and (not instance.property_city or not instance.property_district):
         _sync_listing_geo(instance)
 
 
+@receiver(post_save, sender=Listing)
+def listing_post_save(sender, instance: Listing, created: bool, update_fields=None, **kwargs):
+    if _touches(instance, update_fields, LISTING_SEARCH_FIELDS):
+        _refresh_search_on_commit(listing_ids=[instance.pk])
+
+
 @receiver(post_save, sender=Unit)
-def unit_post_save(sender, instance: Unit, **kwargs):
-    # Quand on modifie une Unit/Property, on propage dans toutes les Listings
-    qs = instance.listings.all().select_related("unit__property")
-    for listing in qs:
-        _sync_listing_geo(listing)
-        listing.save(update_fields=["property_city", "property_district"])
+def unit_post_save(sender, instance: Unit, created: bool, update_fields=None, **kwargs):
+    if created:
+        return  # pas encore d'annonce
+    # Une unité rattachée à un autre bien : ses annonces prennent la ville/quartier du nouveau bien
+    if _touches(instance, update_fields, {"property"}):
+        geo_sync_batch.add(instance.property_id)
+    if _touches(instance, update_fields, UNIT_SEARCH_FIELDS):
+        _refresh_search_on_commit(unit_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Property)
+def property_post_save(sender, instance: Property, created: bool, update_fields=None, **kwargs):
+    if created:
+        return
+    if _touches(instance, update_fields, PROPERTY_GEO_FIELDS):
+        # un UPDATE par lot de biens au commit, limité aux annonces divergentes
+        geo_sync_batch.add(instance.pk)
+    if _touches(instance, update_fields, PROPERTY_SEARCH_FIELDS):
+        _refresh_search_on_commit(property_ids=[instance.pk])
+
+
+@receiver(post_save, sender=UnitAmenity)
+@receiver(post_delete, sender=UnitAmenity)
+def unit_amenity_changed(sender, instance: UnitAmenity, **kwargs):
+    _refresh_search_on_commit(unit_ids=[instance.unit_id])
+
+
+@receiver(post_save, sender=PropertyAmenity)
+@receiver(post_delete, sender=PropertyAmenity)
+def property_amenity_changed(sender, instance: PropertyAmenity, **kwargs):
+    _refresh_search_on_commit(property_ids=[instance.property_id])
+
+
+@receiver(post_save, sender=Amenity)
+def amenity_post_save(sender, instance: Amenity, created: bool, **kwargs):
+    if created:
+        return
+    _refresh_search_on_commit(
+        unit_ids=list(instance.units.values_list("unit_id", flat=True)),
+        property_ids=list(instance.properties.values_list("property_id", flat=True)),
+    )
+
+
+# =======================
+# Rollup des stats : groupes avant (pre_*) + après (post_*) la modification
+# =======================
+
+@receiver(pre_save, sender=Listing)
+def listing_capture_stats_groups(sender, instance: Listing, update_fields=None, **kwargs):
+    if instance.pk and _touches(instance, update_fields, LISTING_STATS_FIELDS):
+        instance._stats_keys_before = group_keys(Listing.objects.filter(pk=instance.pk))
+
+
+@receiver(pre_delete, sender=Listing)
+def listing_capture_stats_groups_on_delete(sender, instance: Listing, **kwargs):
+    # une annonce supprimée quitte toujours son groupe, modifiée ou non (destroy, admin, cascades)
+    if instance.pk:
+        instance._stats_keys_before = group_keys(Listing.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Listing)
+def listing_refresh_stats(sender, instance: Listing, update_fields=None, **kwargs):
+    if _touches(instance, update_fields, LISTING_STATS_FIELDS):
+        before = instance.__dict__.pop("_stats_keys_before", set())
+        _refresh_stats_on_commit(before | group_keys(Listing.objects.filter(pk=instance.pk)))
+
+
+@receiver(post_delete, sender=Listing)
+def listing_deleted_refresh_stats(sender, instance: Listing, **kwargs):
+    _refresh_stats_on_commit(instance.__dict__.pop("_stats_keys_before", set()))
+
+
+@receiver(pre_save, sender=Unit)
+def unit_capture_stats_groups(sender, instance: Unit, update_fields=None, **kwargs):
+    if instance.pk and _touches(instance, update_fields, UNIT_STATS_FIELDS):
+        instance._stats_keys_before = group_keys(Listing.objects.filter(unit_id=instance.pk))
+
+
+@receiver(post_save, sender=Unit)
+def unit_refresh_stats(sender, instance: Unit, created: bool, update_fields=None, **kwargs):
+    if not created and _touches(instance, update_fields, UNIT_STATS_FIELDS):
+        before = instance.__dict__.pop("_stats_keys_before", set())
+        _refresh_stats_on_commit(before | group_keys(Listing.objects.filter(unit_id=instance.pk)))
+
+
+@receiver(pre_save, sender=Property)
+def property_capture_stats_groups(sender, instance: Property, update_fields=None, **kwargs):
+    if instance.pk and _touches(instance, update_fields, PROPERTY_STATS_FIELDS):
+        instance._stats_keys_before = group_keys(Listing.objects.filter(unit__property_id=instance.pk))
+
+
+@receiver(post_save, sender=Property)
+def property_refresh_stats(sender, instance: Property, created: bool, update_fields=None, **kwargs):
+    if not created and _touches(instance, update_fields, PROPERTY_STATS_FIELDS):
+        before = instance.__dict__.pop("_stats_keys_before", set())
+        _refresh_stats_on_commit(before | group_keys(Listing.objects.filter(unit__property_id=instance.pk)))
+
+
+# =======================
+# Index d'autocomplétion : recalcul groupé après les écritures qui l'affectent
+# =======================
+
+@receiver(post_save, sender=Listing)
+def listing_refresh_suggestions(sender, instance: Listing, update_fields=None, **kwargs):
+    if _touches(instance, update_fields, LISTING_SUGGEST_FIELDS):
+        transaction.on_commit(schedule_suggestions_rebuild)
+
+
+@receiver(post_save, sender=Property)
+def property_refresh_suggestions(sender, instance: Property, created: bool, update_fields=None, **kwargs):
+    # un bien neuf n'a pas encore d'annonce : il n'apparaît pas dans l'index
+    if not created and _touches(instance, update_fields, PROPERTY_SUGGEST_FIELDS):
+        transaction.on_commit(schedule_suggestions_rebuild)
+
+
+@receiver(post_delete, sender=Listing)
+@receiver(post_save, sender=Amenity)
+@receiver(post_delete, sender=Amenity)
+@receiver(post_save, sender=UnitAmenity)
+@receiver(post_delete, sender=UnitAmenity)
+@receiver(post_save, sender=PropertyAmenity)
+@receiver(post_delete, sender=PropertyAmenity)
+def catalogue_changed_refresh_suggestions(sender, instance, **kwargs):
+    transaction.on_commit(schedule_suggestions_rebuild)
+
+
+# =======================
+# Photos : déclinaisons responsives après l'upload (cf. properties.renditions)
+# =======================
+
+@receiver(post_save, sender=PropertyImage)
+@receiver(post_save, sender=UnitImage)
+def image_schedule_renditions(sender, instance, **kwargs):
+    # upload direct : traité une fois adopté en blob (blob_adopted), pas sous sa clé provisoire
+    if media.is_blob_name(instance.image.name) and not renditions.is_attempted(instance):
+        transaction.on_commit(lambda: renditions.schedule_processing(instance))
+
+
+@receiver(media.blob_adopted, sender=PropertyImage)
+@receiver(media.blob_adopted, sender=UnitImage)
+def image_adopted_renditions(sender, instance, **kwargs):
+    if not renditions.is_attempted(instance):
+        renditions.schedule_processing(instance)
+
+
+@receiver(post_delete, sender=PropertyImage)
+@receiver(post_delete, sender=UnitImage)
+def image_delete_renditions(sender, instance, **kwargs):
+    # déclinaisons d'un blob : partagées, supprimées avec lui (image_blob_collected)
+    if media.is_blob_name((instance.renditions or {}).get("source")):
+        return
+    keys = renditions.rendition_keys(instance.renditions)
+    if keys:
+        storage = instance.image.storage
+        transaction.on_commit(lambda: renditions.delete_renditions(storage, keys))
+
+
+@receiver(media.blob_collected)
+def image_blob_collected(sender, storage, name, **kwargs):
+    renditions.delete_blob_renditions(storage, name)
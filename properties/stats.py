@@ -0,0 +1,152 @@
+# properties/stats.py
+"""
+Rollup des statistiques d'annonces (ListingStat) pour /listings/stats/.
+
+- `refresh_groups(keys)` : recalcul incrémental des seuls groupes touchés (appelé par properties.signals) ;
+- `rebuild_listing_stats()` : reconstruction complète (migration, tâche périodique de réconciliation) ;
+- `stats_from_rollup(params)` : répond en O(groupes) aux combinaisons de filtres que le rollup sait servir,
+  `None` sinon (l'appelant retombe alors sur l'agrégat live).
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Iterable
+
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min, Q, Sum
+
+from .models import Listing, ListingStat
+
+# (champ ListingStat, chemin depuis Listing) — l'ordre définit la clé de groupe
+GROUP_FIELDS = (
+    ("listing_type", "listing_type"),
+    ("property_type", "unit__property__property_type"),
+    ("city", "property_city"),
+    ("district", "property_district"),
+    ("bedrooms", "unit__bedrooms"),
+)
+LISTING_PATHS = tuple(path for _, path in GROUP_FIELDS)
+
+# Paramètres de ListingFilterSet servis par le rollup ; les autres (prix, vedette, recherche, géo…)
+# imposent l'agrégat live. Les paramètres de pagination/tri n'influencent pas les stats.
+ROLLUP_PARAMS = {"type", "listing_type", "property_type", "city", "bedrooms", "active"}
+NEUTRAL_PARAMS = {"ordering", "page", "page_size", "pagination", "cursor", "count", "format"}
+
+# verrou consultatif (transactionnel) : partagé par refresh_groups, exclusif pour rebuild_listing_stats
+STATS_LOCK_ID = 0x7E4A_0001
+
+
+def _normalize_key(row) -> tuple:
+    listing_type, property_type, city, district, bedrooms = row
+    return listing_type, property_type, city or "", district or "", bedrooms if bedrooms is not None else 0
+
+
+def group_keys(listings) -> set[tuple]:
+    """Clés de groupe des annonces d'un queryset (actives ou non : un groupe peut devenir vide)."""
+    return {_normalize_key(row) for row in listings.order_by().values_list(*LISTING_PATHS).distinct()}
+
+
+def _group_filter(key) -> Q:
+    q = Q(is_active=True)
+    for (field, path), value in zip(GROUP_FIELDS, key):
+        if field in ("city", "district") and not value:
+            q &= Q(**{f"{path}__isnull": True}) | Q(**{path: ""})
+        else:
+            q &= Q(**{path: value})
+    return q
+
+
+def _aggregates(queryset) -> dict:
+    return queryset.aggregate(
+        count=Count("id"), price_sum=Sum("price"), price_min=Min("price"), price_max=Max("price"),
+    )
+
+
+def _lock_stats(shared: bool) -> None:
+    """Verrou pris jusqu'à la fin de la transaction courante (à appeler sous `atomic()`)."""
+    function = "pg_advisory_xact_lock_shared" if shared else "pg_advisory_xact_lock"
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {function}(%s)", [STATS_LOCK_ID])
+
+
+def refresh_groups(keys: Iterable[tuple]) -> None:
+    """Recalcule les groupes donnés (une agrégation indexée par groupe) ; supprime les groupes vides."""
+    keys = {_normalize_key(k) for k in keys}
+    if not keys:
+        return
+    with transaction.atomic():
+        # attend une reconstruction en cours : son instantané ne doit pas écraser ce recalcul
+        _lock_stats(shared=True)
+        for key in keys:
+            lookup = dict(zip((field for field, _ in GROUP_FIELDS), key))
+            agg = _aggregates(Listing.objects.filter(_group_filter(key)))
+            if agg["count"]:
+                ListingStat.objects.update_or_create(**lookup, defaults=agg)
+            else:
+                ListingStat.objects.filter(**lookup).delete()
+
+
+def rebuild_listing_stats() -> int:
+    """Reconstruit tout le rollup (un GROUP BY). Retourne le nombre de groupes."""
+    with transaction.atomic():
+        # exclusif : aucun refresh_groups ne s'intercale entre l'agrégat et le remplacement
+        _lock_stats(shared=False)
+        rows = (
+            Listing.objects.filter(is_active=True)
+            .order_by()
+            .values(*LISTING_PATHS)
+            .annotate(count=Count("id"), price_sum=Sum("price"), price_min=Min("price"), price_max=Max("price"))
+        )
+        stats: dict[tuple, dict] = {}
+        for row in rows:
+            key = _normalize_key([row[p] for p in LISTING_PATHS])
+            stat = stats.get(key)
+            if stat is None:  # NULL et "" (ville/quartier) fusionnés dans le même groupe
+                stats[key] = {f: row[f] for f in ("count", "price_sum", "price_min", "price_max")}
+            else:
+                stat["count"] += row["count"]
+                stat["price_sum"] += row["price_sum"]
+                stat["price_min"] = min(stat["price_min"], row["price_min"])
+                stat["price_max"] = max(stat["price_max"], row["price_max"])
+        ListingStat.objects.all().delete()
+        ListingStat.objects.bulk_create(
+            [
+                ListingStat(**dict(zip((field for field, _ in GROUP_FIELDS), key)), **values)
+                for key, values in stats.items()
+            ],
+            batch_size=1000,
+        )
+    return len(stats)
+
+
+def stats_from_rollup(params) -> dict | None:
+    """Stats pour les filtres `params` (query params de /listings/stats/), ou None si non servable."""
+    keys = {k for k, v in params.items() if v not in (None, "")}
+    if keys - ROLLUP_PARAMS - NEUTRAL_PARAMS:
+        return None
+    if params.get("active", "true").lower() not in {"true", "1"}:
+        return None  # le rollup ne couvre que les annonces actives
+
+    qs = ListingStat.objects.all()
+    listing_type = params.get("type") or params.get("listing_type")
+    if listing_type in {Listing.RENT, Listing.SALE}:
+        qs = qs.filter(listing_type=listing_type)
+    if params.get("property_type"):
+        qs = qs.filter(property_type=params["property_type"])
+    if params.get("city"):
+        qs = qs.filter(city__icontains=params["city"])
+    if params.get("bedrooms"):
+        try:
+            qs = qs.filter(bedrooms__gte=int(params["bedrooms"]))
+        except ValueError:
+            return None
+
+    agg = qs.aggregate(total=Sum("count"), price_sum=Sum("price_sum"),
+                       min_price=Min("price_min"), max_price=Max("price_max"))
+    total = agg["total"] or 0
+    return {
+        "total": total,
+        "min_price": agg["min_price"],
+        "max_price": agg["max_price"],
+        "avg_price": (Decimal(agg["price_sum"]) / total) if total else None,
+    }
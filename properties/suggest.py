@@ -0,0 +1,186 @@
+# properties/suggest.py
+"""
+Index d'autocomplétion de /search/suggest/ : villes, quartiers, titres de biens, équipements.
+
+- Les entrées (libellé, type, nb d'annonces actives) sont calculées par quelques GROUP BY
+  dans la tâche `properties.rebuild_search_suggestions`, déclenchée (avec anti-rebond) par
+  properties.signals, et stockées dans le cache partagé ;
+- chaque process en garde une copie en mémoire (`SuggestionIndex`) : recherche par préfixe
+  (bisect sur les débuts de mots) puis floue (trigrammes), sans requête SQL ;
+- la copie locale est rechargée quand le tampon `built_at` du cache change (vérifié au plus
+  toutes les SUGGEST_INDEX_CHECK_SECONDS).
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Amenity, Listing
+from .search import normalize_search_text
+
+logger = logging.getLogger(__name__)
+
+CITY, DISTRICT, PROPERTY, AMENITY = "city", "district", "property", "amenity"
+# départage à popularité égale
+TYPE_PRIORITY = {CITY: 0, DISTRICT: 1, PROPERTY: 2, AMENITY: 3}
+
+ENTRIES_KEY = "suggest:entries"
+STAMP_KEY = "suggest:built_at"
+REBUILD_SCHEDULED_KEY = "suggest:rebuild-scheduled"
+
+FUZZY_MIN_LENGTH = 4
+FUZZY_THRESHOLD = 0.6
+
+
+# ---------- Construction des entrées (SQL, hors chemin de requête) ----------
+
+def _merge(counts: dict, label: str | None, kind: str, n: int) -> None:
+    """Agrège par libellé normalisé ("Cocody" / "cocody ") en gardant la graphie la plus fréquente."""
+    key = normalize_search_text(label)
+    if not key:
+        return
+    entry = counts.setdefault((kind, key), {"label": label.strip(), "type": kind, "count": 0, "_best": 0})
+    entry["count"] += n
+    if n > entry["_best"]:
+        entry["label"], entry["_best"] = label.strip(), n
+
+
+def build_entries() -> list[dict]:
+    active = Listing.objects.filter(is_active=True).order_by()
+    counts: dict = {}
+
+    for row in active.values("property_city").annotate(n=Count("id")):
+        _merge(counts, row["property_city"], CITY, row["n"])
+    for row in active.values("property_district").annotate(n=Count("id")):
+        _merge(counts, row["property_district"], DISTRICT, row["n"])
+    for row in active.values("unit__property__title").annotate(n=Count("id")):
+        _merge(counts, row["unit__property__title"], PROPERTY, row["n"])
+
+    # équipements : portés par l'unité ou par le bien
+    amenity_counts = defaultdict(int)
+    for path in ("unit__unit_amenities__amenity_id", "unit__property__property_amenities__amenity_id"):
+        rows = active.filter(**{f"{path}__isnull": False}).values(path).annotate(n=Count("id", distinct=True))
+        for row in rows:
+            amenity_counts[row[path]] += row["n"]
+    for amenity_id, label in Amenity.objects.filter(pk__in=amenity_counts).values_list("id", "label"):
+        _merge(counts, label, AMENITY, amenity_counts[amenity_id])
+
+    entries = []
+    for entry in counts.values():
+        entry.pop("_best")
+        entries.append(entry)
+    return entries
+
+
+def rebuild_suggestions() -> dict:
+    """Recalcule les entrées et les publie dans le cache partagé."""
+    # libéré avant la lecture : une écriture commitée pendant le calcul programme un nouveau passage
+    cache.delete(REBUILD_SCHEDULED_KEY)
+    data = {"built_at": time.time(), "entries": build_entries()}
+    cache.set_many({ENTRIES_KEY: data, STAMP_KEY: data["built_at"]}, timeout=None)
+    return data
+
+
+def schedule_suggestions_rebuild() -> None:
+    """Demande un recalcul, regroupant les écritures rapprochées en un seul passage."""
+    delay = settings.SUGGEST_REBUILD_DELAY
+    if not cache.add(REBUILD_SCHEDULED_KEY, 1, timeout=delay + 60):
+        return  # un recalcul est déjà programmé
+    from .tasks import rebuild_search_suggestions
+    try:
+        rebuild_search_suggestions.apply_async(countdown=delay)
+    except Exception:  # broker indisponible : le recalcul périodique rattrapera
+        cache.delete(REBUILD_SCHEDULED_KEY)
+        logger.warning("Programmation du recalcul des suggestions impossible", exc_info=True)
+
+
+# ---------- Index en mémoire ----------
+
+def _trigrams(text: str) -> set[str]:
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SuggestionIndex:
+    def __init__(self, entries: list[dict]):
+        self.entries = entries
+        # (suffixe commençant à chaque mot, n° d'entrée) : "riviera 3" trouve "Cocody Riviera 3"
+        keys = []
+        by_gram = defaultdict(list)
+        for i, entry in enumerate(entries):
+            text = normalize_search_text(entry["label"])
+            words = text.split()
+            keys.extend((" ".join(words[w:]), i) for w in range(len(words)))
+            for gram in _trigrams(text):
+                by_gram[gram].append(i)
+        keys.sort()
+        self._keys = [k for k, _ in keys]
+        self._ids = [i for _, i in keys]
+        self._by_gram = dict(by_gram)
+
+    def _rank(self, i: int):
+        entry = self.entries[i]
+        return -entry["count"], TYPE_PRIORITY[entry["type"]], entry["label"]
+
+    def prefix(self, query: str) -> set[int]:
+        start = bisect.bisect_left(self._keys, query)
+        end = bisect.bisect_left(self._keys, query + "\uffff", lo=start)
+        return set(self._ids[start:end])
+
+    def fuzzy(self, query: str, exclude: set[int]) -> list[int]:
+        grams = _trigrams(query)
+        shared = defaultdict(int)
+        for gram in grams:
+            for i in self._by_gram.get(gram, ()):
+                shared[i] += 1
+        # part des trigrammes de la saisie retrouvés dans le libellé (≈ word_similarity de pg_trgm)
+        scored = [
+            (n / len(grams), i) for i, n in shared.items()
+            if i not in exclude and n / len(grams) >= FUZZY_THRESHOLD
+        ]
+        scored.sort(key=lambda s: (-s[0],) + self._rank(s[1]))
+        return [i for _, i in scored]
+
+    def search(self, query: str, limit: int = 8) -> list[dict]:
+        query = " ".join(normalize_search_text(query).split())
+        if not query:
+            return []
+        found = sorted(self.prefix(query), key=self._rank)[:limit]
+        if len(found) < limit and len(query) >= FUZZY_MIN_LENGTH:
+            found += self.fuzzy(query, set(found))[:limit - len(found)]
+        return [dict(self.entries[i]) for i in found]
+
+
+_local = {"index": None, "built_at": None, "checked_at": 0.0}
+_local_lock = threading.Lock()
+
+
+def get_index() -> SuggestionIndex:
+    now = time.monotonic()
+    if _local["index"] is not None and now - _local["checked_at"] < settings.SUGGEST_INDEX_CHECK_SECONDS:
+        return _local["index"]
+    with _local_lock:
+        _local["checked_at"] = now
+        built_at = cache.get(STAMP_KEY)
+        if _local["index"] is not None and built_at == _local["built_at"]:
+            return _local["index"]
+        data = cache.get(ENTRIES_KEY)
+        if data is None:  # cache froid : construction locale, publiée pour les autres process
+            data = rebuild_suggestions()
+        _local["index"] = SuggestionIndex(data["entries"])
+        _local["built_at"] = data["built_at"]
+        return _local["index"]
+
+
+def suggest(query: str, limit: int = 8) -> list[dict]:
+    return get_index().search(query, limit=limit)
@@ -0,0 +1,60 @@
+# properties/tasks.py
+import logging
+
+from celery import shared_task
+from django.apps import apps
+
+from terra360 import media
+
+from . import renditions
+from .models import PropertyImage, UnitImage
+from .stats import rebuild_listing_stats
+from .suggest import rebuild_suggestions
+from .view_counts import flush_views
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="properties.flush_listing_views", ignore_result=True)
+def flush_listing_views():
+    """Reporte en base (UPDATE groupé) les vues d'annonces accumulées dans Redis."""
+    return flush_views()
+
+
+@shared_task(name="properties.rebuild_listing_stats", ignore_result=True)
+def rebuild_listing_stats_task():
+    """Réconciliation périodique du rollup ListingStat (écritures hors signaux : update(), SQL brut…)."""
+    return rebuild_listing_stats()
+
+
+@shared_task(name="properties.rebuild_search_suggestions", ignore_result=True)
+def rebuild_search_suggestions():
+    """Recalcule l'index d'autocomplétion (villes, quartiers, biens, équipements) et le publie en cache."""
+    return len(rebuild_suggestions()["entries"])
+
+
+@shared_task(name="properties.process_image", ignore_result=True)
+def process_image_task(model_label: str, pk: int):
+    """Déclinaisons WebP/AVIF + LQIP d'une PropertyImage/UnitImage (cf. properties.renditions)."""
+    model = apps.get_model(model_label)
+    image = model.objects.filter(pk=pk).first()
+    if image is None or not image.image or renditions.is_attempted(image):
+        return False
+    return renditions.process_image(image)
+
+
+@shared_task(name="properties.process_pending_images", ignore_result=True)
+def process_pending_images(limit: int = 200):
+    """Filet périodique : images jamais traitées (broker indisponible à l'upload, reprise d'historique)."""
+    done = 0
+    for model in (PropertyImage, UnitImage):
+        for image in renditions.pending_images(model, limit):
+            try:
+                # historique / adoption manquée : passage en blob d'abord (déclinaisons partagées)
+                if not media.is_blob_name(image.image.name):
+                    media.adopt(model, image.pk, "image")
+                    image.refresh_from_db()
+                done += renditions.process_image(image)
+            except Exception:
+                logger.exception("Déclinaisons de %s #%s en échec", model._meta.label, image.pk)
+    return done
@@ -0,0 +1,55 @@
+from django.test import TestCase
+
+from properties.models import Listing, ListingStat, Property, Unit
+from properties.stats import rebuild_listing_stats
+
+
+class ListingStatDeleteTests(TestCase):
+    """Le rollup ListingStat suit la suppression d'une annonce lue en base et non modifiée."""
+
+    def setUp(self):
+        prop = Property.objects.create(
+            title="Résidence Les Palmiers", property_type=Property.RESIDENTIAL,
+            city="Abidjan", district="Cocody",
+        )
+        self.unit = Unit.objects.create(property=prop, name="A1", bedrooms=2, bathrooms=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.kept = Listing.objects.create(unit=self.unit, listing_type=Listing.RENT, price=300000)
+            self.deleted = Listing.objects.create(unit=self.unit, listing_type=Listing.RENT, price=500000)
+
+    def stat(self):
+        return ListingStat.objects.get(listing_type=Listing.RENT, city="Abidjan", district="Cocody", bedrooms=2)
+
+    def test_unmodified_listing_delete_updates_rollup(self):
+        self.assertEqual(self.stat().count, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            Listing.objects.get(pk=self.deleted.pk).delete()
+        stat = self.stat()
+        self.assertEqual(stat.count, 1)
+        self.assertEqual(stat.price_max, 300000)
+
+    def test_last_listing_delete_removes_group(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Listing.objects.filter(pk__in=[self.kept.pk, self.deleted.pk]).delete()
+        self.assertFalse(ListingStat.objects.exists())
+
+    def test_cascade_delete_updates_rollup(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Unit.objects.get(pk=self.unit.pk).delete()
+        self.assertFalse(ListingStat.objects.exists())
+
+
+class ListingStatRebuildTests(TestCase):
+    """La reconstruction fusionne ville/quartier NULL et "" dans le même groupe."""
+
+    def test_rebuild_merges_null_and_empty_geo(self):
+        for title, district in (("Villa A", None), ("Villa B", "")):
+            prop = Property.objects.create(
+                title=title, property_type=Property.RESIDENTIAL, city="Abidjan", district=district,
+            )
+            unit = Unit.objects.create(property=prop, name="A1", bedrooms=3, bathrooms=2)
+            Listing.objects.create(unit=unit, listing_type=Listing.SALE, price=1000000)
+
+        self.assertEqual(rebuild_listing_stats(), 1)
+        stat = ListingStat.objects.get()
+        self.assertEqual((stat.district, stat.count), ("", 2))
@@ -0,0 +1,102 @@
+# properties/view_counts.py
+"""
+Compteur de vues des annonces, sans écriture sur la ligne Listing à chaque vue.
+
+- chaque vue fait un HINCRBY dans un hash Redis (atomique, pas de read-modify-write) ;
+- la tâche périodique `properties.flush_listing_views` renomme le hash (atomique), puis reporte
+  tous les compteurs en base en un `UPDATE … FROM (VALUES …)` par lot ; le hash renommé est
+  supprimé avant le COMMIT : un lot n'est jamais reporté deux fois (au pire perdu si le COMMIT échoue) ;
+- la lecture additionne `Listing.views_count` (persisté) et les vues en attente.
+"""
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+from typing import Iterable
+
+import redis
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Listing
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "listing:views:pending"
+FLUSHING_KEY = "listing:views:flushing"
+FLUSH_LOCK_KEY = "listing:views:flush-lock"
+FLUSH_CHUNK_SIZE = 1000
+
+
+@lru_cache(maxsize=1)
+def _redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def record_view(listing_id: int) -> int:
+    """Enregistre une vue ; retourne le nombre de vues pas encore reportées en base pour cette annonce."""
+    pipe = _redis().pipeline(transaction=False)
+    pipe.hincrby(PENDING_KEY, listing_id, 1)
+    pipe.hget(FLUSHING_KEY, listing_id)
+    pending, flushing = pipe.execute()
+    return int(pending) + int(flushing or 0)
+
+
+def pending_views(listing_ids: Iterable[int]) -> dict[int, int]:
+    """Vues en attente par annonce (un seul aller-retour Redis). {} si Redis est indisponible."""
+    ids = [i for i in listing_ids if i is not None]
+    if not ids:
+        return {}
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        pipe.hmget(PENDING_KEY, ids)
+        pipe.hmget(FLUSHING_KEY, ids)
+        pending, flushing = pipe.execute()
+    except redis.RedisError:
+        logger.warning("Redis indisponible : vues en attente ignorées", exc_info=True)
+        return {}
+    counts = {}
+    for listing_id, a, b in zip(ids, pending, flushing):
+        total = int(a or 0) + int(b or 0)
+        if total:
+            counts[listing_id] = total
+    return counts
+
+
+def _bulk_add_views(counts: list[tuple[int, int]]) -> None:
+    values = ", ".join(["(%s::bigint, %s::integer)"] * len(counts))
+    sql = (
+        f"UPDATE {Listing._meta.db_table} AS l SET views_count = l.views_count + v.n "
+        f"FROM (VALUES {values}) AS v(id, n) WHERE l.id = v.id"
+    )
+    params = [x for pair in counts for x in pair]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def flush_views() -> int:
+    """Reporte les vues en attente en base. Retourne le nombre de vues reportées."""
+    r = _redis()
+    lock = r.lock(FLUSH_LOCK_KEY, timeout=300, blocking=False)
+    if not lock.acquire():
+        return 0
+    try:
+        # Un FLUSHING_KEY resté d'un flush interrompu est retraité avant d'en prendre un nouveau
+        if not r.exists(FLUSHING_KEY):
+            try:
+                r.rename(PENDING_KEY, FLUSHING_KEY)
+            except redis.ResponseError:  # rien en attente
+                return 0
+
+        counts = sorted(
+            (int(k), int(v)) for k, v in r.hgetall(FLUSHING_KEY).items() if int(v) > 0
+        )
+        with transaction.atomic():
+            for start in range(0, len(counts), FLUSH_CHUNK_SIZE):
+                _bulk_add_views(counts[start:start + FLUSH_CHUNK_SIZE])
+            # avant le COMMIT : si Redis échoue, la transaction est annulée et le lot retraité tel quel ;
+            # supprimé puis COMMIT en échec → lot perdu, plutôt que compté deux fois
+            r.delete(FLUSHING_KEY)
+        return sum(n for _, n in counts)
+    finally:
+        lock.release()
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class Public_apiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "public_api"
+
+    def ready(self):
+        from . import signals
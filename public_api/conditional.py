@@ -0,0 +1,105 @@
+# public_api/conditional.py
+"""
+GET conditionnels (ETag / Last-Modified) sans sérialiser la réponse.
+
+Les validateurs viennent des générations de modèles de terra360.cache (incrémentées à chaque
+écriture commitée) : une lecture de quelques clés en cache, aucune requête SQL. Un client qui
+renvoie `If-None-Match` (ou `If-Modified-Since`) inchangé reçoit un 304 vide.
+
+Cache indisponible (lecture des générations en échec) : aucun validateur n'est émis ni accepté.
+Une génération absente (flush, éviction) repart d'une graine horodatée, jamais d'une valeur
+déjà servie ; une incrémentation perdue pendant une panne est rejouée par le process qui l'a subie.
+
+Limite assumée : les écritures hors signaux (UPDATE ensemblistes, compteur de vues reporté
+depuis Redis) ne changent pas l'ETag ; `views_count` peut donc être servi en 304 légèrement en retard.
+"""
+from __future__ import annotations
+
+import hashlib
+
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from terra360.cache import model_state
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:24]
+    return f"W/{quote_etag(digest)}"
+
+
+def is_not_modified(request, etag: str | None, last_modified: float | None) -> bool:
+    """Sémantique RFC 9110 : If-None-Match prime sur If-Modified-Since (comparaison faible des ETags)."""
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        if etag is None:
+            return False
+        tags = parse_etags(if_none_match)
+        strip = lambda tag: tag[2:] if tag.startswith("W/") else tag  # noqa: E731
+        return "*" in tags or strip(etag) in {strip(t) for t in tags}
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return since is not None and last_modified is not None and int(last_modified) <= since
+
+
+def set_validators(response, etag: str | None, last_modified: float | None):
+    if etag:
+        response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def not_modified_response(etag, last_modified):
+    return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+
+class ConditionalGetMixin:
+    """
+    Viewset : ETag/Last-Modified sur `conditional_actions`, calculés après authentification et
+    permissions (`initial`) mais avant le queryset et la sérialisation.
+
+    `conditional_models` : modèles dont dépend la réponse ; `conditional_per_user` : réponse
+    propre à l'utilisateur (l'ETag inclut son id).
+    """
+    conditional_models: tuple = ()
+    conditional_actions = ("list", "retrieve")
+    conditional_per_user = False
+
+    def conditional_validators(self, request):
+        generations, last_modified = model_state(self.conditional_models)
+        if generations is None:
+            return None, None  # cache indisponible : pas de validateur, donc jamais de 304
+        user_id = request.user.pk if self.conditional_per_user else None
+        etag = make_etag(
+            self.__class__.__name__, generations, request.get_full_path(),
+            request.headers.get("Accept", ""), user_id,
+        )
+        return etag, last_modified
+
+    def _conditional(self, request) -> bool:
+        return request.method in ("GET", "HEAD") and getattr(self, "action", None) in self.conditional_actions
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self._conditional(request):
+            self._validators = self.conditional_validators(request)
+            if is_not_modified(request, *self._validators):
+                raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return not_modified_response(*self._validators)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, "_validators", None)
+        if validators and response.status_code == status.HTTP_200_OK:
+            set_validators(response, *validators)
+        return response
@@ -0,0 +1,225 @@
+# public_api/home.py
+"""
+Sections de l'écran Home (/home/), chacune en cache indépendamment.
+
+Stratégie stale-while-revalidate :
+- une entrée en cache n'expire jamais, elle porte une date de fraîcheur (`fresh_until`) ;
+- une entrée périmée est servie telle quelle et son recalcul est confié à Celery
+  (`public_api.refresh_home_section`), un verrou évitant les recalculs concurrents ;
+- seul le tout premier appel (cache vide) calcule sur le chemin de la requête.
+
+Invalidation : les signaux Banner / QuickAction / Category / MapTeaser marquent leur section périmée
+et demandent un recalcul (cf. public_api.signals). Les districts tendance sont recalculés
+périodiquement par Celery beat, jamais sur le chemin de la requête.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+from django.utils.text import slugify
+
+from properties.models import Listing
+from .models import Banner, QuickAction, Category, MapTeaser
+from .serializers import BannerSerializer, QuickActionSerializer, CategorySerializer, MapTeaserSerializer
+
+logger = logging.getLogger(__name__)
+
+SECTION_KEY = "home:section:{}"
+REFRESH_LOCK_KEY = "home:refreshing:{}"
+REFRESH_LOCK_TIMEOUT = 60
+
+
+# ---------- Builders : chacun retourne (données, durée de fraîcheur en secondes) ----------
+
+def build_banners():
+    now = timezone.now()
+    banners_qs = (
+        Banner.objects
+        .filter(active=True)
+        .filter(Q(starts_at__isnull=True) | Q(starts_at__lte=now))
+        .filter(Q(ends_at__isnull=True) | Q(ends_at__gte=now))
+        .order_by("order", "id")
+        .only("id", "title", "subtitle", "cta", "to", "icon", "image")
+    )
+    banners = [dict(b) for b in BannerSerializer(banners_qs, many=True).data]
+    if not banners:
+        banners = [
+            {"id": "b1", "title": "Investissez malin", "subtitle": "Rendements locatifs jusqu’à 12%",
+             "cta": "Explorer", "to": "/#listings", "icon": "trending-up"},
+            {"id": "b2", "title": "Nouveautés", "subtitle": "Annonces fraîchement publiées", "cta": "Voir",
+             "to": "/#listings?ordering=-published_at", "icon": "flash"},
+        ]
+
+    # la section redevient périmée à la prochaine ouverture/fermeture de fenêtre d'une bannière
+    ttl = settings.HOME_SECTION_TTL
+    boundaries = Banner.objects.filter(active=True).aggregate(
+        next_start=Min("starts_at", filter=Q(starts_at__gt=now)),
+        next_end=Min("ends_at", filter=Q(ends_at__gt=now)),
+    )
+    for boundary in boundaries.values():
+        if boundary:
+            ttl = min(ttl, max(1, int((boundary - now).total_seconds())))
+    return banners, ttl
+
+
+def build_quick_actions():
+    qa_qs = (
+        QuickAction.objects
+        .filter(active=True)
+        .order_by("order", "id")
+        .only("id", "icon", "label", "to", "gradient", "color")
+    )
+    quick_actions = [dict(q) for q in QuickActionSerializer(qa_qs, many=True).data]
+    if not quick_actions:
+        quick_actions = [
+            {"id": "qa1", "icon": "map", "label": "Carte", "to": "/#map", "gradient": True},
+            {"id": "qa2", "icon": "heart", "label": "Favoris", "to": "/favorites"},
+            {"id": "qa3", "icon": "calendar", "label": "Visites", "to": "/visits"},
+            {"id": "qa4", "icon": "filter", "label": "Filtres", "to": "/#listings"},
+        ]
+    return quick_actions, settings.HOME_SECTION_TTL
+
+
+def build_categories():
+    cat_qs = (
+        Category.objects
+        .filter(active=True)
+        .order_by("order", "id")
+        .only("id", "slug", "label", "icon", "color")
+    )
+    categories = [dict(c) for c in CategorySerializer(cat_qs, many=True).data]
+    if not categories:
+        categories = [
+            {"id": "all", "label": "Tout", "icon": "grid"},
+            {"id": "rent", "label": "Location", "icon": "pricetag"},
+            {"id": "sell", "label": "Vente", "icon": "cash"},
+            {"id": "featured", "label": "Vedettes", "icon": "star"},
+            {"id": "new", "label": "Nouveaux", "icon": "flash"},
+        ]
+    return categories, settings.HOME_SECTION_TTL
+
+
+def _district_entries(rows, default_label):
+    districts = []
+    for i, row in enumerate(rows):
+        label = row.get("property_district") or row.get("property_city") or default_label(i)
+        if not label:
+            continue
+        districts.append({
+            "id": slugify(label) or f"d{i + 1}",
+            "label": label,
+            # si tu as un champ 'district.cover' ailleurs, remplace ceci:
+            "cover": f"https://picsum.photos/300/300?seed={slugify(label) or i}",
+        })
+    return districts
+
+
+def build_trending_districts():
+    # Idée: "tendance" = où il y a le plus d'annonces récentes
+    recent_since = timezone.now() - timedelta(days=30)
+    district_counts = (
+        Listing.objects.filter(published_at__gte=recent_since)
+        .values("property_city", "property_district")
+        .annotate(n=Count("id"))
+        .order_by("-n")[:12]
+    )
+    districts = _district_entries(district_counts, lambda i: "Inconnu")
+
+    # Fallback si pas d'activité récente
+    if not districts:
+        fallback_agg = (
+            Listing.objects
+            .values("property_city", "property_district")
+            .annotate(n=Count("id"))
+            .order_by("-n")[:6]
+        )
+        districts = _district_entries(fallback_agg, lambda i: f"Zone {i + 1}")
+    # recalculé par beat : la durée de fraîcheur couvre deux passages
+    return districts, settings.HOME_TRENDING_REFRESH_SECONDS * 2
+
+
+def build_map_teaser():
+    teaser_obj = (
+        MapTeaser.objects
+        .filter(active=True)
+        .order_by("order", "id")
+        .only("title", "subtitle", "image", "to")
+        .first()
+    )
+    if teaser_obj:
+        map_teaser = dict(MapTeaserSerializer(teaser_obj).data)
+    else:
+        map_teaser = {
+            "image": "https://picsum.photos/900/600?map",
+            "title": "Explorer sur la carte",
+            "subtitle": "Localisez rapidement les biens proches de vous",
+            "to": "/#map",
+        }
+    return map_teaser, settings.HOME_SECTION_TTL
+
+
+# Ordre = ordre des clés du payload /home/
+SECTIONS = {
+    "banners": build_banners,
+    "quick_actions": build_quick_actions,
+    "districts": build_trending_districts,
+    "categories": build_categories,
+    "map_teaser": build_map_teaser,
+}
+
+
+# ---------- Cache stale-while-revalidate ----------
+
+def rebuild_section(name: str) -> dict:
+    value, ttl = SECTIONS[name]()
+    now = time.time()
+    entry = {"value": value, "fresh_until": now + ttl, "built_at": now}
+    cache.set(SECTION_KEY.format(name), entry, timeout=None)
+    cache.delete(REFRESH_LOCK_KEY.format(name))
+    return entry
+
+
+def schedule_refresh(name: str) -> None:
+    if not cache.add(REFRESH_LOCK_KEY.format(name), 1, timeout=REFRESH_LOCK_TIMEOUT):
+        return  # recalcul déjà en cours
+    if settings.HOME_REFRESH_ASYNC:
+        from .tasks import refresh_home_section
+        try:
+            refresh_home_section.delay(name)
+            return
+        except Exception:  # broker indisponible → recalcul local
+            logger.warning("Recalcul asynchrone de la section home %s impossible", name, exc_info=True)
+    rebuild_section(name)
+
+
+def invalidate_section(name: str) -> None:
+    """Marque la section périmée (toujours servie) et demande son recalcul."""
+    key = SECTION_KEY.format(name)
+    entry = cache.get(key)
+    if entry is not None:
+        entry["fresh_until"] = 0
+        cache.set(key, entry, timeout=None)
+    cache.delete(REFRESH_LOCK_KEY.format(name))
+    schedule_refresh(name)
+
+
+def get_sections() -> dict[str, dict]:
+    """Entrées {value, fresh_until, built_at} de toutes les sections, en un seul aller-retour cache."""
+    keys = {name: SECTION_KEY.format(name) for name in SECTIONS}
+    cached = cache.get_many(keys.values())
+    now = time.time()
+    entries = {}
+    for name, key in keys.items():
+        entry = cached.get(key)
+        if entry is None:
+            entry = rebuild_section(name)  # cache froid uniquement
+        elif entry["fresh_until"] <= now:
+            schedule_refresh(name)
+        entries[name] = entry
+    return entries
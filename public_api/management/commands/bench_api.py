@@ -0,0 +1,226 @@
+# public_api/management/commands/bench_api.py
+"""
+Benchmark des endpoints chauds de l'API publique, en process via le client de test Django.
+
+    python manage.py bench_api --seed-count 20000 --iterations 100 --output bench/$(git rev-parse --short HEAD).json
+    python manage.py bench_api --keepdb --compare bench/abc1234.json
+
+Par défaut, une base de test jetable est créée et peuplée (seed_properties --bulk) ; `--keepdb`
+la conserve d'une exécution à l'autre, `--current-db` mesure la base configurée telle quelle.
+Pour chaque endpoint : latences p50/p95/p99, requêtes SQL par appel, octets renvoyés.
+Le cache partagé n'est jamais utilisé : cache mémoire du process, ou `--cache-url` vers une base
+Redis dédiée (pour mesurer avec le réseau) ; `--clear-cache` ne vide que ce cache-là.
+"""
+from __future__ import annotations
+
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from properties.models import FavoriteListing, Listing
+
+# nom → (chemin, authentifié)
+ENDPOINTS = {
+    "listings": ("/api/listings/", False),
+    "listings_cursor": ("/api/listings/?pagination=cursor", False),
+    "listings_search": ("/api/listings/?search=cocody", False),
+    "home": ("/api/home/", False),
+    "suggest": ("/api/search/suggest/?q=coc", False),
+    "stats": ("/api/listings/stats/", False),
+    "favorites": ("/api/favorites/", True),
+}
+
+# Cache propre au bench : les données de la base de test ne doivent jamais atteindre le cache
+# partagé (générations, sections /home/, suggestions…), et --clear-cache ne vide que celui-ci
+BENCH_CACHE_LOCMEM = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "bench-api"}
+
+BENCH_USERNAME = "bench-api"
+BENCH_FAVORITES = 50
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Percentile au rang le plus proche (valeurs déjà triées)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+class Command(BaseCommand):
+    help = "Mesure latences (p50/p95/p99), requêtes SQL et taille des réponses des endpoints publics."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed-count", type=int, default=5000,
+                            help="Propriétés à générer si la base ne contient aucune annonce")
+        parser.add_argument("--seed", type=int, default=42, help="Graine du jeu de données")
+        parser.add_argument("--workers", type=int, default=1, help="Workers de seed_properties --bulk")
+        parser.add_argument("--iterations", type=int, default=50, help="Appels mesurés par endpoint")
+        parser.add_argument("--warmup", type=int, default=5, help="Appels non mesurés par endpoint")
+        parser.add_argument("--endpoint", action="append", choices=sorted(ENDPOINTS),
+                            help="Limiter à certains endpoints (répétable)")
+        parser.add_argument("--clear-cache", action="store_true",
+                            help="Vider le cache du bench avant chaque appel (mesure à froid)")
+        parser.add_argument("--cache-url",
+                            help="Base Redis dédiée au bench (ex. redis://redis:6379/9) ; défaut : cache mémoire")
+        parser.add_argument("--keepdb", action="store_true", help="Conserver/réutiliser la base de test")
+        parser.add_argument("--current-db", action="store_true",
+                            help="Mesurer la base configurée (ni création de base, ni seed)")
+        parser.add_argument("--output", help="Fichier JSON de résultats")
+        parser.add_argument("--compare", help="Fichier JSON d'une exécution précédente à comparer")
+
+    def handle(self, *args, **options):
+        from terra360.celery import app as celery_app
+
+        # tâches déclenchées par les vues (recalcul /home/, suggestions…) exécutées en process
+        celery_app.conf.task_always_eager = True
+        setup_test_environment()
+        old_name = None
+        bench_caches = override_settings(CACHES={"default": self.bench_cache(options["cache_url"])})
+        bench_caches.enable()
+        try:
+            if not options["current_db"]:
+                old_name = connection.creation.create_test_db(
+                    verbosity=0, autoclobber=True, keepdb=options["keepdb"],
+                )
+            self.prepare_dataset(options)
+            results = self.run_benchmarks(options)
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+            bench_caches.disable()
+            teardown_test_environment()
+
+        report = {
+            "meta": {
+                "revision": git_revision(),
+                "timestamp": datetime.now(dt_timezone.utc).isoformat(),
+                "listings": self.listing_count,
+                "iterations": options["iterations"],
+                "clear_cache": options["clear_cache"],
+                "python": platform.python_version(),
+                "django": django.get_version(),
+            },
+            "results": results,
+        }
+        self.print_report(results, self.load_baseline(options["compare"]))
+        if options["output"]:
+            path = Path(options["output"])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"Résultats enregistrés dans {path}"))
+
+    def bench_cache(self, url):
+        if not url:
+            return BENCH_CACHE_LOCMEM
+        shared = settings.CACHES["default"]
+        if url.rstrip("/") == str(shared.get("LOCATION", "")).rstrip("/"):
+            raise CommandError("--cache-url doit désigner une base Redis dédiée, pas le cache partagé.")
+        return {**shared, "LOCATION": url, "KEY_PREFIX": "bench-api"}
+
+    # ---------- Jeu de données ----------
+
+    def prepare_dataset(self, options):
+        User = get_user_model()
+        user, _ = User.objects.get_or_create(username=BENCH_USERNAME, defaults={"email": "bench@example.com"})
+        if not options["current_db"] and not Listing.objects.exists():
+            call_command(
+                "seed_properties", count=options["seed_count"], bulk=True,
+                seed=options["seed"], workers=options["workers"], stdout=self.stdout,
+            )
+        if not FavoriteListing.objects.filter(user=user).exists():
+            FavoriteListing.objects.bulk_create(
+                [FavoriteListing(user=user, listing_id=pk)
+                 for pk in Listing.objects.order_by("id").values_list("id", flat=True)[:BENCH_FAVORITES]],
+                ignore_conflicts=True,
+            )
+        self.listing_count = Listing.objects.count()
+        self.auth_header = f"Bearer {RefreshToken.for_user(user).access_token}"
+
+    # ---------- Mesures ----------
+
+    def measure(self, client, path, auth, clear_cache):
+        headers = {"HTTP_AUTHORIZATION": self.auth_header} if auth else {}
+        if clear_cache:
+            cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(path, **headers)
+            elapsed = time.perf_counter() - started
+        return elapsed * 1000, len(queries), len(response.content), response.status_code
+
+    def run_benchmarks(self, options):
+        client = Client()
+        names = options["endpoint"] or list(ENDPOINTS)
+        results = {}
+        for name in names:
+            path, auth = ENDPOINTS[name]
+            for _ in range(options["warmup"]):
+                self.measure(client, path, auth, options["clear_cache"])
+            samples = [self.measure(client, path, auth, options["clear_cache"]) for _ in range(options["iterations"])]
+            statuses = {s[3] for s in samples}
+            if statuses != {200}:
+                raise CommandError(f"{name} ({path}) : statuts HTTP inattendus {sorted(statuses)}")
+            latencies = sorted(s[0] for s in samples)
+            results[name] = {
+                "path": path,
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p95_ms": round(percentile(latencies, 95), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+                "mean_ms": round(statistics.fmean(latencies), 3),
+                "queries_mean": round(statistics.fmean(s[1] for s in samples), 2),
+                "queries_max": max(s[1] for s in samples),
+                "bytes": round(statistics.fmean(s[2] for s in samples)),
+            }
+        return results
+
+    # ---------- Rapport ----------
+
+    def load_baseline(self, path):
+        if not path:
+            return {}
+        try:
+            return json.loads(Path(path).read_text())["results"]
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Référence illisible ({path}) : {exc}")
+
+    def print_report(self, results, baseline):
+        self.stdout.write(f"Annonces en base : {self.listing_count}")
+        header = f"{'endpoint':<18}{'p50':>10}{'p95':>10}{'p99':>10}{'queries':>9}{'bytes':>10}"
+        if baseline:
+            header += f"{'Δp95':>10}"
+        self.stdout.write(header)
+        for name, r in results.items():
+            line = (f"{name:<18}{r['p50_ms']:>8.2f}ms{r['p95_ms']:>8.2f}ms{r['p99_ms']:>8.2f}ms"
+                    f"{r['queries_mean']:>9.1f}{r['bytes']:>10}")
+            before = baseline.get(name)
+            if before and before.get("p95_ms"):
+                delta = (r["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+                style = self.style.ERROR if delta > 10 else self.style.SUCCESS if delta < -10 else str
+                line += style(f"{delta:>+9.1f}%")
+            self.stdout.write(line)
@@ -0,0 +1,62 @@
+# public_api/management/commands/bench_renderers.py
+"""
+Compare le rendu JSON standard de DRF et FastJSONRenderer (orjson) sur des pages de /api/listings/.
+
+    python manage.py bench_renderers --page-size 100 --iterations 200
+
+Les données de page (response.data) sont produites une fois par la vraie vue, puis seul le
+rendu est chronométré ; les deux sorties sont comparées après décodage.
+"""
+from __future__ import annotations
+
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from public_api.renderers import FastJSONRenderer, orjson
+from public_api.views import ListingViewSet
+
+
+class Command(BaseCommand):
+    help = "Benchmark du rendu JSON (DRF standard vs orjson) sur des pages d'annonces."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, action="append",
+                            help="Taille(s) de page à mesurer (répétable, défaut : 20 et 100)")
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--expand", default="", help="Valeur ?expand= de la liste (ex. unit,description)")
+
+    def page_data(self, page_size, expand):
+        request = APIRequestFactory().get("/api/listings/", {"page_size": page_size, "expand": expand})
+        response = ListingViewSet.as_view({"get": "list"})(request)
+        if response.status_code != 200:
+            raise CommandError(f"/api/listings/ a répondu {response.status_code}")
+        return response.data
+
+    def time_render(self, renderer, data, iterations):
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            body = renderer.render(data, "application/json", {})
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples), body
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson absent : FastJSONRenderer utilise le JSON standard."))
+        self.stdout.write(f"{'page':>6}{'rows':>7}{'drf ms':>10}{'fast ms':>10}{'speedup':>9}{'bytes':>10}")
+        for page_size in options["page_size"] or [20, 100]:
+            data = self.page_data(page_size, options["expand"])
+            drf_ms, drf_body = self.time_render(JSONRenderer(), data, options["iterations"])
+            fast_ms, fast_body = self.time_render(FastJSONRenderer(), data, options["iterations"])
+            if json.loads(drf_body) != json.loads(fast_body):
+                raise CommandError(f"Sorties différentes pour page_size={page_size}")
+            rows = len(data.get("results", data)) if isinstance(data, dict) else len(data)
+            self.stdout.write(
+                f"{page_size:>6}{rows:>7}{drf_ms:>10.3f}{fast_ms:>10.3f}"
+                f"{drf_ms / fast_ms if fast_ms else 0:>8.1f}x{len(fast_body):>10}"
+            )
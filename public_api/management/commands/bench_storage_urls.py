@@ -0,0 +1,71 @@
+# public_api/management/commands/bench_storage_urls.py
+"""
+Micro-benchmark de la génération d'URLs de médias : S3Storage standard vs PooledS3Storage.
+
+    python manage.py bench_storage_urls --count 1000 --iterations 20
+
+Les noms viennent des PropertyImage/UnitImage en base (complétés par des noms synthétiques
+jusqu'à `--count`). Aucune requête réseau : seule la génération d'URL est mesurée, non signée
+(AWS_QUERYSTRING_AUTH=False) puis signée. "froid" = nouvelle instance de stockage, comme un
+nouveau thread de worker avec le backend standard (session + ressource boto3 à créer).
+"""
+from __future__ import annotations
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from storages.backends.s3 import S3Storage
+
+from properties.models import PropertyImage, UnitImage
+from terra360.storage import PooledS3Storage
+
+
+class Command(BaseCommand):
+    help = "Benchmark de storage.url() sur N images (S3Storage standard vs PooledS3Storage)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1000)
+        parser.add_argument("--iterations", type=int, default=20)
+
+    def names(self, count):
+        names = []
+        for model in (PropertyImage, UnitImage):
+            names += model.objects.exclude(image="").values_list("image", flat=True)[:count - len(names)]
+        names += [f"blobs/sha256/00/00/{i:064x}.jpg" for i in range(count - len(names))]
+        return names
+
+    def time_urls(self, storage_class, names, iterations, querystring_auth):
+        cold_started = time.perf_counter()
+        storage = storage_class(querystring_auth=querystring_auth)
+        urls = [storage.url(name) for name in names]
+        cold_ms = (time.perf_counter() - cold_started) * 1000
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            for name in names:
+                storage.url(name)
+            samples.append((time.perf_counter() - started) * 1000)
+        return cold_ms, statistics.median(samples), urls
+
+    def handle(self, *args, **options):
+        try:
+            S3Storage()
+        except Exception as exc:
+            raise CommandError(f"Configuration S3/MinIO requise (MINIO_ENABLED) : {exc}")
+        names = self.names(options["count"])
+        self.stdout.write(f"{len(names)} images, {options['iterations']} itérations (médiane)")
+        self.stdout.write(f"{'mode':<10}{'backend':<18}{'froid ms':>10}{'chaud ms':>10}{'µs/url':>9}")
+        for signed in (False, True):
+            mode = "signée" if signed else "publique"
+            results = {}
+            for storage_class in (S3Storage, PooledS3Storage):
+                cold_ms, warm_ms, urls = self.time_urls(storage_class, names, options["iterations"], signed)
+                results[storage_class] = urls
+                self.stdout.write(
+                    f"{mode:<10}{storage_class.__name__:<18}{cold_ms:>10.2f}{warm_ms:>10.2f}"
+                    f"{warm_ms * 1000 / len(names):>9.1f}"
+                )
+            # les URLs signées portent un horodatage : seules les publiques doivent être identiques
+            if not signed and results[S3Storage] != results[PooledS3Storage]:
+                raise CommandError("URLs publiques différentes entre les deux backends")
@@ -0,0 +1,142 @@
+# public_api/management/commands/explain_queries.py
+"""
+Rejoue les formes de requêtes réelles de l'API et signale les plans en Seq Scan.
+
+    python manage.py explain_queries
+    python manage.py explain_queries --path "/api/listings/?type=rent&city=cocody" --verbose
+    python manage.py explain_queries --fail-on-seq-scan   # CI : code retour 1 si Seq Scan
+
+Chaque URL est appelée via le client de test (cache désactivé, pour que les requêtes atteignent
+la base) ; les SELECT capturés sont relancés en `EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)` dans
+une transaction annulée. Un Seq Scan n'est signalé que sur une table d'au moins `--min-rows`
+lignes estimées (pg_class.reltuples) : sur les petites tables il est le bon plan.
+"""
+from __future__ import annotations
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+
+# Formes émises par le front (ListingFilterSet, pagination, recherche, géo)
+SHAPES = [
+    "/api/listings/",
+    "/api/listings/?pagination=cursor",
+    "/api/listings/?type=rent",
+    "/api/listings/?type=sale&ordering=price",
+    "/api/listings/?type=rent&ordering=-price&pagination=cursor",
+    "/api/listings/?city=abidjan",
+    "/api/listings/?type=rent&city=cocody",
+    "/api/listings/?is_featured=true",
+    "/api/listings/?min_price=100000&max_price=500000&ordering=price",
+    "/api/listings/?search=cocody",
+    "/api/listings/?near=5.35,-3.99&radius_km=3&ordering=distance",
+    "/api/listings/stats/?city=abidjan&bedrooms=2",
+    "/api/home/",
+]
+
+NO_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+class _Rollback(Exception):
+    pass
+
+
+def walk(node):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from walk(child)
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN (ANALYZE, BUFFERS) des requêtes SQL des endpoints publics ; signale les Seq Scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", action="append",
+                            help="URL à rejouer (répétable ; remplace la liste par défaut)")
+        parser.add_argument("--min-rows", type=int, default=1000,
+                            help="Ignorer les Seq Scan sur les tables plus petites")
+        parser.add_argument("--fail-on-seq-scan", action="store_true",
+                            help="Code retour non nul si un Seq Scan est signalé")
+        parser.add_argument("--verbose", action="store_true", help="Afficher le SQL et le plan texte")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("explain_queries nécessite PostgreSQL.")
+        self.reltuples = {}
+        flagged = 0
+        setup_test_environment()
+        try:
+            with override_settings(CACHES=NO_CACHE):
+                for path in options["path"] or SHAPES:
+                    flagged += self.explain_path(path, options)
+        finally:
+            teardown_test_environment()
+
+        if flagged:
+            self.stdout.write(self.style.WARNING(f"{flagged} requête(s) en Seq Scan."))
+            if options["fail_on_seq_scan"]:
+                raise CommandError("Seq Scan détecté sur des formes de requêtes de l'API.")
+        else:
+            self.stdout.write(self.style.SUCCESS("Aucun Seq Scan sur les tables volumineuses."))
+
+    def explain_path(self, path: str, options) -> int:
+        with CaptureQueriesContext(connection) as ctx:
+            response = Client().get(path)
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{path} → HTTP {response.status_code}"))
+        flagged = 0
+        for query in ctx.captured_queries:
+            sql = query["sql"]
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            plan = self.explain(sql)
+            root = plan["Plan"]
+            seq_scans = [
+                node["Relation Name"] for node in walk(root)
+                if node["Node Type"] == "Seq Scan" and self.table_rows(node["Relation Name"]) >= options["min_rows"]
+            ]
+            indexes = sorted({node["Index Name"] for node in walk(root) if "Index Name" in node})
+            buffers = root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0)
+            line = f"  {plan['Execution Time']:8.2f} ms  {buffers:>7} buf  {sql[:90]}"
+            if seq_scans:
+                flagged += 1
+                self.stdout.write(self.style.ERROR(line))
+                self.stdout.write(self.style.ERROR(f"      Seq Scan : {', '.join(sorted(set(seq_scans)))}"))
+            else:
+                self.stdout.write(line)
+                if indexes:
+                    self.stdout.write(f"      index : {', '.join(indexes)}")
+            if options["verbose"]:
+                self.stdout.write(sql)
+                self.stdout.write(self.explain(sql, text=True))
+        return flagged
+
+    def explain(self, sql: str, text: bool = False):
+        fmt = "TEXT" if text else "JSON"
+        try:
+            # ANALYZE exécute la requête : transaction annulée par précaution
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT {fmt}) {sql}")
+                    rows = cursor.fetchall()
+                raise _Rollback
+        except _Rollback:
+            pass
+        if text:
+            return "\n".join(row[0] for row in rows)
+        result = rows[0][0]
+        if isinstance(result, str):
+            result = json.loads(result)
+        return result[0]
+
+    def table_rows(self, relation: str) -> float:
+        if relation not in self.reltuples:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples FROM pg_class WHERE relname = %s", [relation])
+                row = cursor.fetchone()
+            self.reltuples[relation] = row[0] if row else 0
+        return self.reltuples[relation]
@@ -0,0 +1,41 @@
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('public_api', '0002_banner_is_active_banner_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadIntent',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target', models.CharField(choices=[('avatar', 'Avatar'), ('kyc_document', 'Document KYC'), ('property_image', 'Photo de bien'), ('unit_image', 'Photo d’unité'), ('property_document', 'Document de bien')], max_length=32)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('filename', models.CharField(max_length=255)),
+                ('content_type', models.CharField(max_length=100)),
+                ('size', models.PositiveBigIntegerField()),
+                ('name', models.CharField(max_length=512)),
+                ('upload_id', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('completed', 'Terminé'), ('aborted', 'Abandonné')], default='pending', max_length=16)),
+                ('attached_model', models.CharField(blank=True, max_length=100)),
+                ('attached_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_intents', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Upload direct',
+                'verbose_name_plural': 'Uploads directs',
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='public_api__status_b16773_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,6 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 
 
@@ -46,3 +49,69 @@ class MapTeaser(OrderedActiveModel):
     title = models.CharField(max_length=200)
     subtitle = models.CharField(max_length=300, blank=True)
     to = models.CharField(max_length=200, default="/#map")
+
+
+class UploadIntent(models.Model):
+    """
+    Upload direct navigateur → MinIO (cf. public_api.uploads) : clé réservée, URL(s) présignée(s),
+    puis rattachement au modèle cible après vérification de l'objet (taille, type MIME).
+    """
+    PENDING = "pending"
+    COMPLETED = "completed"
+    ABORTED = "aborted"
+    STATUSES = [(PENDING, "En attente"), (COMPLETED, "Terminé"), (ABORTED, "Abandonné")]
+    TARGETS = [
+        ("avatar", "Avatar"),
+        ("kyc_document", "Document KYC"),
+        ("property_image", "Photo de bien"),
+        ("unit_image", "Photo d’unité"),
+        ("property_document", "Document de bien"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="upload_intents")
+    target = models.CharField(max_length=32, choices=TARGETS)
+    params = models.JSONField(default=dict, blank=True)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    # nom de stockage (relatif à la racine du storage, comme FieldFile.name)
+    name = models.CharField(max_length=512)
+    # upload multipart S3 (fichiers volumineux)
+    upload_id = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=16, choices=STATUSES, default=PENDING)
+    attached_model = models.CharField(max_length=100, blank=True)
+    attached_id = models.PositiveBigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Upload direct"
+        verbose_name_plural = "Uploads directs"
+        indexes = [models.Index(fields=["status", "expires_at"])]
+
+    def __str__(self):
+        return f"{self.target} {self.filename} ({self.status})"
+
+
+class MediaBlob(models.Model):
+    """Fichier stocké une seule fois par contenu (SHA-256), partagé entre lignes (cf. terra360.media)."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=512, unique=True)
+    size = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=100, blank=True)
+    refcount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Blob média"
+        verbose_name_plural = "Blobs médias"
+        indexes = [
+            models.Index(fields=["created_at"], name="mediablob_unreferenced_idx",
+                         condition=models.Q(refcount__lte=0)),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} réf.)"
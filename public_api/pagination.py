@@ -0,0 +1,172 @@
+# public_api/pagination.py
+from __future__ import annotations
+
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_count(queryset) -> int:
+    """Nombre de lignes estimé par le planificateur Postgres (EXPLAIN), sans COUNT(*)."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Pagination par numéro de page (comportement historique) + mode curseur (keyset).
+
+    Le mode curseur s'active avec `?pagination=cursor` (1ère page) puis suit `next` (`?cursor=…`).
+    Il filtre sur le dernier tuple vu, ex. `(published_at, id) < (v, id)`, au lieu d'un OFFSET :
+    la page 500 coûte le même prix que la page 1.
+
+    La vue déclare les tris autorisés (chacun terminé par une clé unique) :
+        cursor_orderings = {"-published_at": ("-published_at", "-id"), "price": ("price", "id")}
+        cursor_default_ordering = "-published_at"
+
+    Le total est optionnel : `?count=none` (défaut en mode curseur), `estimate` (planificateur) ou `exact`.
+    """
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    count_query_param = "count"
+    ordering_query_param = "ordering"
+    invalid_cursor_message = "Curseur invalide."
+
+    cursor_mode = False
+
+    # ---------- sélection du mode ----------
+    def use_cursor(self, request) -> bool:
+        params = request.query_params
+        return bool(params.get(self.cursor_query_param)) or params.get(self.mode_query_param) == "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.use_cursor(request) or not getattr(view, "cursor_orderings", None):
+            self.cursor_mode = False
+            return super().paginate_queryset(queryset, request, view)
+        return self.paginate_cursor(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            "count": self.count,
+            "next": self.get_next_link(),
+            "previous": None,
+            "results": data,
+        })
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    # ---------- mode curseur ----------
+    def paginate_cursor(self, queryset, request, view):
+        self.cursor_mode = True
+        self.request = request
+
+        ordering = self.get_cursor_ordering(request, view)
+        queryset = queryset.order_by(*ordering)
+        self.count = self.get_cursor_count(queryset, request)
+
+        position = self.decode_cursor(request, ordering, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(ordering, position))
+
+        page_size = self.get_page_size(request)
+        rows = list(queryset[:page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_position = [self.field_value(rows[-1], f) for f in ordering] if has_next else None
+        return rows
+
+    def get_cursor_ordering(self, request, view) -> tuple[str, ...]:
+        orderings = view.cursor_orderings
+        requested = request.query_params.get(self.ordering_query_param)
+        if requested in orderings:
+            return orderings[requested]
+        return orderings[view.cursor_default_ordering]
+
+    def get_cursor_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param, "none")
+        if mode == "exact":
+            return queryset.count()
+        if mode == "estimate":
+            return estimate_count(queryset)
+        return None
+
+    @staticmethod
+    def keyset_filter(ordering, values) -> Q:
+        """(a, b) > (va, vb) ⇔ a > va OR (a = va AND b > vb), avec le sens de chaque champ."""
+        clauses = []
+        for i, field in enumerate(ordering):
+            name = field.lstrip("-")
+            op = "lt" if field.startswith("-") else "gt"
+            equal = {f.lstrip("-"): values[j] for j, f in enumerate(ordering[:i])}
+            clauses.append(Q(**equal, **{f"{name}__{op}": values[i]}))
+        return reduce(or_, clauses)
+
+    @staticmethod
+    def model_field(model, field):
+        """Champ de modèle d'un élément de tri, relations comprises (`unit__bedrooms`)."""
+        *relations, name = field.lstrip("-").split("__")
+        for part in relations:
+            model = model._meta.get_field(part).related_model
+        return model._meta.get_field(name)
+
+    @staticmethod
+    def field_value(obj, field):
+        if isinstance(obj, dict):  # lignes values() (cf. public_api.projections)
+            return obj[field.lstrip("-")]
+        value = obj
+        for part in field.lstrip("-").split("__"):
+            value = getattr(value, part)
+        return value
+
+    # ---------- encodage ----------
+    @staticmethod
+    def encode_cursor(values) -> str:
+        # isoformat complet : DjangoJSONEncoder tronque les microsecondes (→ doublons/sauts)
+        raw = json.dumps(values, default=lambda v: v.isoformat() if hasattr(v, "isoformat") else str(v))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request, ordering, model):
+        """Valeurs du curseur, converties par le champ de chaque élément de tri (404 si invalide)."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        # curseur forgé : une valeur mal typée ne doit pas atteindre le SQL (erreur 500)
+        try:
+            values = [self.model_field(model, field).to_python(value) for field, value in zip(ordering, values)]
+        except (ValidationError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in values):
+            raise NotFound(self.invalid_cursor_message)
+        return values
@@ -0,0 +1,107 @@
+# public_api/projections.py
+"""
+Chemin rapide de GET /listings/ : projection `values()` + transformation précompilée.
+
+Le queryset renvoie des dicts plats (colonnes utiles + nom de fichier et déclinaisons de l'image
+de couverture en sous-requête) ; `ListingCardProjection.transform` les met au format exact de
+`ListingListSerializer`, sans instancier de modèles ni parcourir les champs DRF ligne à ligne.
+
+Le plan (clé de sortie, colonne, conversion) est dérivé une fois par jeu de champs des champs
+du serializer lui-même : le contrat JSON reste celui du serializer (cf. public_api.tests).
+`?expand=unit` (unité imbriquée avec images) et `?expand=cover` (srcset) restent servis par le serializer.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import JSONObject
+
+from properties.models import PropertyImage, UnitImage
+from properties.renditions import rendition_name
+from properties.view_counts import pending_views
+from .serializers import ListingListSerializer
+
+# champs calculés hors colonnes du modèle
+COVER_FIELD = "cover_image"
+UNIT_COVER = "_unit_cover"
+PROPERTY_COVER = "_property_cover"
+# champs qui imposent le serializer
+SERIALIZER_ONLY_FIELDS = {"unit", "cover"}
+
+
+def _cover_annotations() -> dict:
+    """Même choix que `cover_image_for` : 1ère image de l'unité, sinon image principale du bien."""
+    unit_cover = UnitImage.objects.filter(unit_id=OuterRef("unit_id")).order_by("ordering", "id")
+    property_cover = PropertyImage.objects.filter(
+        property_id=OuterRef("unit__property_id"), is_primary=True,
+    ).order_by("ordering", "id")
+    cover = JSONObject(image="image", renditions="renditions")
+    return {
+        UNIT_COVER: Subquery(unit_cover.values(cover=cover)[:1]),
+        PROPERTY_COVER: Subquery(property_cover.values(cover=cover)[:1]),
+    }
+
+
+class ListingCardProjection:
+    def __init__(self, fields: frozenset[str]):
+        serializer = ListingListSerializer(context={"sparse_fields": set(fields)})
+        self.plan = []
+        self.columns = ["id", "published_at", "price"]  # clés du curseur de pagination
+        self.with_cover = False
+        for name, field in serializer.fields.items():
+            if name == COVER_FIELD:
+                self.with_cover = True
+                self.plan.append((name, None, None))
+                continue
+            column = field.source.replace(".", "__")
+            self.plan.append((name, column, field.to_representation))
+            if column not in self.columns:
+                self.columns.append(column)
+        self.unit_storage = UnitImage._meta.get_field("image").storage
+        self.property_storage = PropertyImage._meta.get_field("image").storage
+
+    def values(self, queryset):
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if self.with_cover:
+            queryset = queryset.annotate(**_cover_annotations())
+            return queryset.values(*self.columns, UNIT_COVER, PROPERTY_COVER)
+        return queryset.values(*self.columns)
+
+    def cover_url(self, row):
+        # même URL que `listing_cover_url` : déclinaison "card", à défaut l'original
+        for key, storage in ((UNIT_COVER, self.unit_storage), (PROPERTY_COVER, self.property_storage)):
+            cover = row[key]
+            if cover and cover["image"]:
+                return storage.url(rendition_name(cover["image"], cover["renditions"], "card"))
+        return None
+
+    def transform(self, rows) -> list[dict]:
+        rows = list(rows)
+        pending = pending_views(row["id"] for row in rows)
+        plan = self.plan
+        out = []
+        for row in rows:
+            data = {}
+            for name, column, convert in plan:
+                if column is None:
+                    data[name] = self.cover_url(row)
+                    continue
+                value = row[column]
+                data[name] = None if value is None else convert(value)
+            if "views_count" in data:
+                data["views_count"] = (data["views_count"] or 0) + pending.get(row["id"], 0)
+            out.append(data)
+        return out
+
+
+@lru_cache(maxsize=64)
+def _projection(fields: frozenset[str]) -> ListingCardProjection:
+    return ListingCardProjection(fields)
+
+
+def listing_card_projection(fields) -> ListingCardProjection | None:
+    """Projection pour ce jeu de champs, ou None s'il faut passer par le serializer."""
+    if SERIALIZER_ONLY_FIELDS & set(fields):
+        return None
+    return _projection(frozenset(fields))
@@ -0,0 +1,127 @@
+# public_api/renderers.py
+"""
+Rendu/parsing JSON via orjson (optionnel) pour les réponses DRF.
+
+Même sortie que `rest_framework.renderers.JSONRenderer` (Decimal selon COERCE_DECIMAL_TO_STRING,
+datetimes ISO 8601 en "Z", durées en secondes…), plus les géométries GEOS (GeoJSON) et les
+`PhoneNumber` (E.164). Sans orjson installé, les classes retombent sur le JSON standard de DRF.
+"""
+from __future__ import annotations
+
+import datetime
+import decimal
+import json
+import uuid
+
+from django.contrib.gis.geos import GEOSGeometry
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+try:
+    from phonenumbers import PhoneNumber, PhoneNumberFormat, format_number
+except ImportError:
+    PhoneNumber = None
+
+
+def _geometry(obj):
+    return json.loads(obj.json)
+
+
+def _phone(obj):
+    return format_number(obj, PhoneNumberFormat.E164)
+
+
+def default(obj):
+    """Types non natifs pour orjson, alignés sur rest_framework.utils.encoders.JSONEncoder."""
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, datetime.datetime):
+        representation = obj.isoformat()
+        if representation.endswith("+00:00"):
+            representation = representation[:-6] + "Z"
+        return representation
+    if isinstance(obj, datetime.date):
+        return obj.isoformat()
+    if isinstance(obj, datetime.time):
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, decimal.Decimal):
+        return str(obj) if api_settings.COERCE_DECIMAL_TO_STRING else float(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, GEOSGeometry):
+        return _geometry(obj)
+    if PhoneNumber is not None and isinstance(obj, PhoneNumber):
+        return _phone(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)) or hasattr(obj, "__iter__") and not hasattr(obj, "keys"):
+        return list(obj)
+    if hasattr(obj, "keys"):
+        return dict(obj)
+    raise TypeError(f"Type non sérialisable en JSON : {type(obj).__name__}")
+
+
+class CompatJSONEncoder(JSONEncoder):
+    """Encodeur standard de DRF + GEOS / PhoneNumber (utilisé sans orjson)."""
+
+    def default(self, obj):
+        if isinstance(obj, GEOSGeometry):
+            return _geometry(obj)
+        if PhoneNumber is not None and isinstance(obj, PhoneNumber):
+            return _phone(obj)
+        return super().default(obj)
+
+
+# OPT_PASSTHROUGH_DATETIME : datetimes/dates/heures confiés à `default` (format DRF, "Z" pour UTC).
+# UUID et sous-classes de dict (ReturnDict, OrderedDict) sont sérialisés nativement par orjson,
+# avec le même résultat que DRF. Écarts restants :
+# - NaN / ±Infinity (float) : orjson écrit `null`, là où DRF lève ValueError (STRICT_JSON) ou écrit
+#   `NaN` ; sans impact ici (montants en Decimal, coordonnées GEOS finies) ;
+# - U+2028 / U+2029 : DRF les échappe (JSON inséré dans du JavaScript) ; rétabli dans `render`.
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    encoder_class = CompatJSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        options = ORJSON_OPTIONS
+        if self.get_indent(accepted_media_type, renderer_context):
+            options |= orjson.OPT_INDENT_2
+        ret = orjson.dumps(data, default=default, option=options)
+        # même échappement que JSONRenderer (séparateurs de ligne/paragraphe Unicode)
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
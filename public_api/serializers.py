@@ -1,5 +1,6 @@
 # public_api/serializers.py
 from __future__ import annotations
+from django.db.models import Prefetch
 from rest_framework import serializers
 
 # Parties
@@ -14,7 +15,11 @@ from properties.models import (
     PropertyImage, UnitImage, PropertyDocument,
     FavoriteListing, VisitRequest, Valuation
 )
-from public_api.models import Banner, QuickAction, Category, MapTeaser
+from properties.renditions import image_sources, rendition_url
+from properties.view_counts import pending_views
+from public_api.models import Banner, QuickAction, Category, MapTeaser, UploadIntent
+from terra360.signed_urls import SignedFileMixin, SignedURLListSerializer
+from .sparse import SparseFieldsetMixin
 
 
 # =============== Parties ===============
@@ -26,6 +31,7 @@ class PartyRoleSerializer(serializers.ModelSerializer):
 
 
 class PartySerializer(serializers.ModelSerializer):
+    # lignes PartyRole préchargées par la vue (un seul SELECT pour la page)
     roles = PartyRoleSerializer(many=True, read_only=True)
 
     class Meta:
@@ -40,28 +46,71 @@ class PartySerializer(serializers.ModelSerializer):
 
 # =============== Properties ===============
 
+def listing_media_prefetches(prefix=""):
+    """
+    Prefetchs des images d'unité + image principale du bien, pour que
+    ListingSerializer (cover_image, unit.images) coûte un nombre constant de requêtes.
+    `prefix` permet de l'appliquer depuis un autre modèle (ex: "listing__").
+    """
+    return [
+        Prefetch(f"{prefix}unit__images", queryset=UnitImage.objects.order_by("ordering", "id")),
+        Prefetch(
+            f"{prefix}unit__property__images",
+            queryset=PropertyImage.objects.filter(is_primary=True).order_by("ordering", "id"),
+            to_attr="primary_images",
+        ),
+    ]
+
+
+def cover_image_for(unit):
+    """
+    Image de couverture d'une unité : sa première UnitImage, à défaut la PropertyImage
+    principale du bien. Sans requête si les prefetchs de `listing_media_prefetches` sont posés.
+    """
+    if unit is None:
+        return None
+    images = list(unit.images.all())  # cache de prefetch si présent
+    if images:
+        return images[0]
+    prop = unit.property
+    primary = getattr(prop, "primary_images", None)
+    if primary is None:
+        primary = list(prop.images.filter(is_primary=True)[:1])
+    return primary[0] if primary else None
+
+
 class AmenitySerializer(serializers.ModelSerializer):
     class Meta:
         model = Amenity
         fields = "__all__"
 
 
-class PropertyImageSerializer(serializers.ModelSerializer):
+class ResponsiveImageMixin(serializers.Serializer):
+    """`sources` : déclinaisons WebP/AVIF en srcset + LQIP (cf. properties.renditions)."""
+    sources = serializers.SerializerMethodField()
+
+    def get_sources(self, obj):
+        return image_sources(obj)
+
+
+class PropertyImageSerializer(ResponsiveImageMixin, serializers.ModelSerializer):
     class Meta:
         model = PropertyImage
-        fields = ["id", "image", "caption", "is_primary", "ordering"]
+        fields = ["id", "image", "caption", "is_primary", "ordering", "sources"]
 
 
-class UnitImageSerializer(serializers.ModelSerializer):
+class UnitImageSerializer(ResponsiveImageMixin, serializers.ModelSerializer):
     class Meta:
         model = UnitImage
-        fields = ["id", "image", "caption", "ordering"]
+        fields = ["id", "image", "caption", "ordering", "sources"]
 
 
-class PropertyDocumentSerializer(serializers.ModelSerializer):
+class PropertyDocumentSerializer(SignedFileMixin, serializers.ModelSerializer):
+    """`file` : URL signée à courte durée (cf. terra360.signed_urls)."""
     class Meta:
         model = PropertyDocument
         fields = ["id", "doc_type", "title", "file", "uploaded_at"]
+        list_serializer_class = SignedURLListSerializer
 
 
 class PropertySerializer(serializers.ModelSerializer):
@@ -78,6 +127,39 @@ class PropertySerializer(serializers.ModelSerializer):
         read_only_fields = ["created_at", "updated_at"]
 
 
+class PropertyListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Bien en liste : image principale seulement ; géométrie, images et documents via ?expand=."""
+    cover_image = serializers.SerializerMethodField()
+    images = PropertyImageSerializer(many=True, read_only=True)
+    documents = PropertyDocumentSerializer(many=True, read_only=True)
+
+    expandable_fields = ("geom", "images", "documents")
+    field_columns = {"cover_image": (), "images": (), "documents": ()}
+    field_prefetches = {
+        "cover_image": lambda: [Prefetch(
+            "images",
+            queryset=PropertyImage.objects.filter(is_primary=True).order_by("ordering", "id"),
+            to_attr="primary_images",
+        )],
+        "images": lambda: [Prefetch("images")],
+        "documents": lambda: [Prefetch("documents")],
+    }
+
+    class Meta:
+        model = Property
+        fields = [
+            "id", "title", "property_type", "address", "city", "district", "country",
+            "owner", "owner_user", "cover_image", "created_at", "updated_at",
+            "geom", "images", "documents",
+        ]
+
+    def get_cover_image(self, obj):
+        primary = getattr(obj, "primary_images", None)
+        if primary is None:
+            primary = list(obj.images.filter(is_primary=True)[:1])
+        return rendition_url(primary[0], "card") if primary else None
+
+
 class UnitSerializer(serializers.ModelSerializer):
     images = UnitImageSerializer(many=True, read_only=True)
     property = serializers.PrimaryKeyRelatedField(queryset=Property.objects.all())
@@ -90,12 +172,60 @@ class UnitSerializer(serializers.ModelSerializer):
         ]
 
 
-class ListingSerializer(serializers.ModelSerializer):
+class UnitListSerializer(SparseFieldsetMixin, UnitSerializer):
+    """Unité en liste : images via ?expand=images."""
+    expandable_fields = ("images",)
+    field_columns = {"images": ()}
+    field_prefetches = {"images": lambda: [Prefetch("images", queryset=UnitImage.objects.order_by("ordering", "id"))]}
+
+    class Meta(UnitSerializer.Meta):
+        pass
+
+
+class PendingViewsListSerializer(serializers.ListSerializer):
+    """
+    Charge en un seul appel Redis les vues en attente de toute la page, lues ensuite par
+    ListingSerializer.to_representation (sinon un appel par ligne).
+    L'enfant indique où trouver l'id d'annonce via `pending_views_source`.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, "all") else data)
+        source = getattr(self.child, "pending_views_source", "pk")
+        self.context["pending_views"] = pending_views(getattr(item, source) for item in items)
+        return super().to_representation(items)
+
+
+class PendingViewsMixin:
+    """Ajoute à `views_count` les vues encore dans Redis (cf. properties.view_counts)."""
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if "views_count" not in data:
+            return data  # champ exclu par ?fields=
+        pending = self.context.get("pending_views")
+        if pending is None:
+            pending = pending_views([instance.pk])
+        data["views_count"] = (data["views_count"] or 0) + pending.get(instance.pk, 0)
+        return data
+
+
+def listing_cover_url(listing):
+    # 1ère image de l'unité, sinon image principale du bien (cf. listing_media_prefetches) ; déclinaison "card"
+    cover = cover_image_for(listing.unit)
+    return rendition_url(cover, "card") if cover else None
+
+
+def listing_cover_sources(listing):
+    cover = cover_image_for(listing.unit)
+    return image_sources(cover) if cover else None
+
+
+class ListingSerializer(PendingViewsMixin, serializers.ModelSerializer):
+    """Annonce complète (détail) : unité imbriquée avec toutes ses images."""
     unit = UnitSerializer(read_only=True)
-    property_city = serializers.CharField(source="unit.property.city", read_only=True)
-    property_district = serializers.CharField(source="unit.property.address",
-                                              read_only=True)  # à adapter si tu as district
     cover_image = serializers.SerializerMethodField()
+    cover = serializers.SerializerMethodField()
 
     class Meta:
         model = Listing
@@ -103,27 +233,70 @@ class ListingSerializer(serializers.ModelSerializer):
             "id", "listing_type", "price", "currency", "description",
             "is_active", "is_featured", "available_from", "published_at",
             "views_count", "unit", "property_city", "property_district",
-            "cover_image",
+            "cover_image", "cover",
         )
+        list_serializer_class = PendingViewsListSerializer
 
     def get_cover_image(self, obj):
-        # si tu as PropertyImage ou UnitImage, renvoie la première, sinon None
-        img = getattr(obj.unit, "images", None)
-        if img and img.exists():
-            return img.first().image.url
-        return None
+        return listing_cover_url(obj)
+
+    def get_cover(self, obj):
+        return listing_cover_sources(obj)
+
+
+class ListingListSerializer(SparseFieldsetMixin, PendingViewsMixin, serializers.ModelSerializer):
+    """Carte d'annonce (liste) : caractéristiques à plat ; unité complète et description via ?expand=."""
+    bedrooms = serializers.IntegerField(source="unit.bedrooms", read_only=True)
+    bathrooms = serializers.IntegerField(source="unit.bathrooms", read_only=True)
+    size_m2 = serializers.FloatField(source="unit.size_m2", read_only=True)
+    cover_image = serializers.SerializerMethodField()
+    cover = serializers.SerializerMethodField()
+    unit = UnitSerializer(read_only=True)
+
+    expandable_fields = ("unit", "description", "cover")
+    field_columns = {
+        "bedrooms": ("unit__bedrooms",),
+        "bathrooms": ("unit__bathrooms",),
+        "size_m2": ("unit__size_m2",),
+        "cover_image": ("unit__property__id",),
+        "cover": ("unit__property__id",),
+        "unit": tuple(f"unit__{f}" for f in UnitSerializer.Meta.fields if f != "images"),
+    }
+    field_prefetches = {
+        "cover_image": listing_media_prefetches,
+        "cover": listing_media_prefetches,
+        "unit": lambda: listing_media_prefetches()[:1],
+    }
+
+    class Meta:
+        model = Listing
+        fields = (
+            "id", "listing_type", "price", "currency", "is_featured", "published_at",
+            "views_count", "property_city", "property_district",
+            "bedrooms", "bathrooms", "size_m2", "cover_image",
+            "unit", "description", "cover",
+        )
+        list_serializer_class = PendingViewsListSerializer
+
+    def get_cover_image(self, obj):
+        return listing_cover_url(obj)
+
+    def get_cover(self, obj):
+        return listing_cover_sources(obj)
 
 
 class FavoriteListingSerializer(serializers.ModelSerializer):
-    listing = ListingSerializer(read_only=True)
+    listing = ListingListSerializer(read_only=True)
     listing_id = serializers.PrimaryKeyRelatedField(
         source="listing", queryset=Listing.objects.all(), write_only=True
     )
+    pending_views_source = "listing_id"
 
     class Meta:
         model = FavoriteListing
         fields = ["id", "listing", "listing_id", "created_at"]
         read_only_fields = ["created_at"]
+        list_serializer_class = PendingViewsListSerializer
 
 
 class VisitRequestSerializer(serializers.ModelSerializer):
@@ -176,3 +349,24 @@ class ValuationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Valuation
         fields = ["id", "property", "valued_by", "method", "value", "currency", "valued_at", "notes"]
+
+
+# =============== Uploads directs (cf. public_api.uploads) ===============
+
+class UploadIntentSerializer(serializers.ModelSerializer):
+    params = serializers.DictField(required=False, default=dict)
+    size = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = UploadIntent
+        fields = ["id", "target", "filename", "content_type", "size", "params", "status", "expires_at"]
+        read_only_fields = ["status", "expires_at"]
+
+
+class UploadPartSerializer(serializers.Serializer):
+    part_number = serializers.IntegerField(min_value=1, max_value=10000)
+    etag = serializers.CharField(max_length=128)
+
+
+class UploadCompleteSerializer(serializers.Serializer):
+    parts = UploadPartSerializer(many=True, required=False)
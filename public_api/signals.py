@@ -0,0 +1,109 @@
+# public_api/signals.py
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from parties.models import PartyRole
+from properties.models import Amenity, Listing, Property, PropertyDocument, PropertyImage, Unit, UnitImage
+from terra360 import media
+from terra360.cache import track_model
+from . import home
+from .models import Banner, QuickAction, Category, MapTeaser
+from .tasks import adopt_media_blob
+from .tiles import invalidate_tiles
+
+logger = logging.getLogger(__name__)
+
+# Champs portés par les tuiles vectorielles (cf. public_api.tiles)
+LISTING_TILE_FIELDS = {"is_active", "price", "currency", "listing_type", "unit"}
+PROPERTY_TILE_FIELDS = {"geom", "property_type"}
+
+
+def _touches(instance, update_fields, fields) -> bool:
+    if update_fields is not None and not fields & set(update_fields):
+        return False
+    return instance.has_changed(*fields)
+
+
+@receiver(post_save, sender=Listing)
+def listing_saved_invalidate_tiles(sender, instance, update_fields=None, **kwargs):
+    if _touches(instance, update_fields, LISTING_TILE_FIELDS):
+        transaction.on_commit(invalidate_tiles)
+
+
+@receiver(post_save, sender=Property)
+def property_saved_invalidate_tiles(sender, instance, created, update_fields=None, **kwargs):
+    # un bien neuf n'a pas encore d'annonce : rien à invalider
+    if not created and _touches(instance, update_fields, PROPERTY_TILE_FIELDS):
+        transaction.on_commit(invalidate_tiles)
+
+
+@receiver(post_delete, sender=Listing)
+def listing_deleted_invalidate_tiles(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_tiles)
+
+
+# =======================
+# Sections /home/ : modèle → section invalidée
+# =======================
+
+HOME_SECTION_MODELS = {
+    Banner: "banners",
+    QuickAction: "quick_actions",
+    Category: "categories",
+    MapTeaser: "map_teaser",
+}
+
+
+def home_content_changed(sender, instance, **kwargs):
+    section = HOME_SECTION_MODELS[sender]
+    transaction.on_commit(lambda: home.invalidate_section(section))
+
+
+for _model in HOME_SECTION_MODELS:
+    post_save.connect(home_content_changed, sender=_model, dispatch_uid=f"home_content_saved_{_model.__name__}")
+    post_delete.connect(home_content_changed, sender=_model, dispatch_uid=f"home_content_deleted_{_model.__name__}")
+
+
+# Générations de modèles : cache-aside (terra360.cache) et ETags (public_api.conditional)
+track_model(Amenity, PartyRole)
+track_model(Listing, Unit, Property, UnitImage, PropertyImage, PropertyDocument)
+
+
+# =======================
+# Médias dédupliqués (cf. terra360.media) : adoption des uploads directs, références
+# =======================
+
+def _schedule_adoption(model_label, pk, field_name):
+    try:
+        adopt_media_blob.delay(model_label, pk, field_name)
+    except Exception:  # broker indisponible : rattrapé par public_api.adopt_pending_media
+        logger.warning("Adoption de %s#%s.%s non planifiée", model_label, pk, field_name, exc_info=True)
+
+
+def media_saved(sender, instance, **kwargs):
+    for field in DEDUP_FIELDS[sender]:
+        name = getattr(instance, field.attname).name
+        # fichier déposé hors de l'application (upload direct) : haché et déplacé par un worker
+        if name and not media.is_blob_name(name):
+            transaction.on_commit(
+                lambda f=field.name: _schedule_adoption(sender._meta.label, instance.pk, f)
+            )
+
+
+def media_deleted(sender, instance, **kwargs):
+    for field in DEDUP_FIELDS[sender]:
+        name = getattr(instance, field.attname).name
+        transaction.on_commit(lambda n=name: media.release_blob(n))
+
+
+DEDUP_FIELDS = defaultdict(list)
+for _model, _field in media.dedup_fields():
+    DEDUP_FIELDS[_model].append(_field)
+
+for _model in DEDUP_FIELDS:
+    post_save.connect(media_saved, sender=_model, dispatch_uid=f"media_saved_{_model._meta.label}")
+    post_delete.connect(media_deleted, sender=_model, dispatch_uid=f"media_deleted_{_model._meta.label}")
@@ -0,0 +1,93 @@
+# public_api/sparse.py
+"""
+Représentations compactes pour les listes + sparse fieldsets.
+
+    GET /listings/?fields=id,price,cover_image
+    GET /listings/?expand=unit,description
+
+- `SparseFieldsetMixin` (serializer) : `?fields=` restreint les champs par défaut, `?expand=` ajoute
+  des champs optionnels (`expandable_fields`) ; `narrow_queryset` réduit le SELECT aux colonnes
+  utiles (`only()`) et ne pose que les prefetchs des champs demandés ;
+- `SparseFieldsetViewMixin` (viewset) : action `list` servie par `compact_serializer_class`,
+  les autres actions (détail, écriture) par `serializer_class`.
+"""
+from __future__ import annotations
+
+
+def _csv(value) -> set[str]:
+    return {part.strip() for part in (value or "").split(",") if part.strip()}
+
+
+class SparseFieldsetMixin:
+    # champs absents par défaut, ajoutés via ?expand=
+    expandable_fields: tuple = ()
+    # champ → chemins de colonnes nécessaires (par défaut : le champ de modèle du même nom)
+    field_columns: dict = {}
+    # champ → callable renvoyant les prefetchs nécessaires
+    field_prefetches: dict = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # sans sélection explicite (ex. serializer imbriqué) : champs par défaut, sans les optionnels
+        selected = self.context.get("sparse_fields")
+        if selected is None:
+            selected = set(self.Meta.fields) - set(self.expandable_fields)
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+    @classmethod
+    def select_fields(cls, query_params) -> set[str]:
+        declared = set(cls.Meta.fields)
+        expandable = set(cls.expandable_fields)
+        requested = _csv(query_params.get("fields")) & declared
+        selected = requested or (declared - expandable)
+        return selected | (_csv(query_params.get("expand")) & expandable) | {"id"}
+
+    @classmethod
+    def narrow_queryset(cls, queryset, selected: set[str], extra_columns=()):
+        columns = {"id", *extra_columns}
+        prefetches = {}
+        for name in selected:
+            columns.update(cls.field_columns.get(name, (name,)))
+            for prefetch in cls.field_prefetches.get(name, lambda: ())():
+                # un même lookup demandé par deux champs : un seul Prefetch (Django refuse les doublons)
+                prefetches.setdefault(prefetch.prefetch_to, prefetch)
+        relations = {path.rsplit("__", 1)[0] for path in columns if "__" in path}
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset.only(*columns).prefetch_related(*prefetches.values())
+
+
+class SparseFieldsetViewMixin:
+    compact_serializer_class = None
+    # colonnes toujours chargées en liste (ex. clés de tri du curseur de pagination)
+    sparse_extra_columns: tuple = ()
+
+    def _compact(self) -> bool:
+        return getattr(self, "action", None) == "list" and self.compact_serializer_class is not None
+
+    def sparse_fields(self) -> set[str]:
+        if not hasattr(self, "_sparse_fields"):
+            self._sparse_fields = self.compact_serializer_class.select_fields(self.request.query_params)
+        return self._sparse_fields
+
+    def get_serializer_class(self):
+        if self._compact():
+            return self.compact_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self._compact():
+            context["sparse_fields"] = self.sparse_fields()
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self._compact():
+            queryset = self.compact_serializer_class.narrow_queryset(
+                queryset, self.sparse_fields(), self.sparse_extra_columns,
+            )
+        return queryset
@@ -0,0 +1,37 @@
+# public_api/tasks.py
+from celery import shared_task
+from django.apps import apps
+
+from terra360 import media
+from . import home, uploads
+
+
+@shared_task(name="public_api.refresh_home_section", ignore_result=True)
+def refresh_home_section(name):
+    """Recalcule une section de /home/ et la remet en cache (cf. public_api.home)."""
+    home.rebuild_section(name)
+
+
+@shared_task(name="public_api.purge_upload_intents", ignore_result=True)
+def purge_upload_intents():
+    """Abandonne les uploads directs expirés et supprime leurs objets/parts orphelins (cf. public_api.uploads)."""
+    return uploads.purge_expired()
+
+
+@shared_task(name="public_api.adopt_media_blob", ignore_result=True)
+def adopt_media_blob(model_label, pk, field_name):
+    """Hache un fichier déposé directement dans MinIO et le remplace par son blob (cf. terra360.media)."""
+    return media.adopt(apps.get_model(model_label), pk, field_name)
+
+
+@shared_task(name="public_api.adopt_pending_media", ignore_result=True)
+def adopt_pending_media():
+    """Rattrape les uploads directs jamais adoptés (publication de adopt_media_blob perdue ou en échec)."""
+    return media.adopt_pending()
+
+
+@shared_task(name="public_api.collect_media_blobs", ignore_result=True)
+def collect_media_blobs():
+    """Recompte les références des blobs puis supprime ceux qui n'en ont plus depuis le délai de grâce."""
+    media.reconcile_refcounts()
+    return media.collect_garbage()
@@ -0,0 +1,105 @@
+import base64
+import json
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from properties.models import Listing, Property, PropertyImage, Unit, UnitImage
+from public_api.serializers import ListingListSerializer
+
+
+class ListingCardProjectionParityTests(TestCase):
+    """Le chemin rapide de GET /api/listings/ (public_api.projections) doit rendre exactement ListingListSerializer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        prop = Property.objects.create(
+            title="Résidence Les Palmiers", property_type=Property.RESIDENTIAL,
+            city="Abidjan", district="Cocody",
+        )
+        PropertyImage.objects.create(property=prop, image="properties/1/cover.jpg", is_primary=True)
+        with_image = Unit.objects.create(property=prop, name="A1", bedrooms=3, bathrooms=2, size_m2=95.5)
+        UnitImage.objects.create(unit=with_image, image="units/1/salon.jpg", ordering=1)
+        UnitImage.objects.create(unit=with_image, image="units/1/facade.jpg", ordering=0)
+        property_cover = Unit.objects.create(property=prop, name="A2", bedrooms=1, bathrooms=1)
+
+        # image traitée : la couverture du chemin rapide (sous-requête JSONObject) lit ses déclinaisons
+        processed = Unit.objects.create(property=prop, name="B1", bedrooms=2, bathrooms=1)
+        processed_image = UnitImage.objects.create(unit=processed, image="units/2/vue.jpg", ordering=0)
+        UnitImage.objects.filter(pk=processed_image.pk).update(
+            width=1600, height=1200, placeholder="data:image/webp;base64,AAAA",
+            renditions={
+                "source": "units/2/vue.jpg",
+                "thumb": {"width": 320, "height": 240, "webp": "units/2/renditions/vue-thumb.webp"},
+                "card": {"width": 800, "height": 600, "webp": "units/2/renditions/vue-card.webp"},
+                "full": {"width": 1600, "height": 1200, "webp": "units/2/renditions/vue-full.webp"},
+            },
+        )
+
+        bare = Property.objects.create(title="Terrain nu", property_type=Property.LAND, city="Bingerville")
+        no_cover = Unit.objects.create(property=bare, name="Lot 4", bedrooms=0, bathrooms=0)
+
+        Listing.objects.create(unit=with_image, listing_type=Listing.RENT, price="350000.50",
+                               description="Vue lagune", is_featured=True)
+        Listing.objects.create(unit=property_cover, listing_type=Listing.SALE, price=85000000,
+                               views_count=12)
+        Listing.objects.create(unit=no_cover, listing_type=Listing.SALE, price="1200000", description=None)
+        Listing.objects.create(unit=processed, listing_type=Listing.RENT, price=450000)
+        Listing.objects.create(unit=no_cover, listing_type=Listing.RENT, price=1, is_active=False)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def expected(self, params=None):
+        fields = ListingListSerializer.select_fields(params or {})
+        listings = Listing.objects.filter(is_active=True).order_by("id")
+        data = ListingListSerializer(listings, many=True, context={"sparse_fields": fields}).data
+        return json.loads(JSONRenderer().render(data))
+
+    def fetch(self, params=None):
+        response = self.client.get("/api/listings/", params or {})
+        self.assertEqual(response.status_code, 200)
+        return sorted(response.json()["results"], key=lambda row: row["id"])
+
+    def test_default_fields_match_serializer(self):
+        self.assertEqual(self.fetch(), self.expected())
+
+    def test_key_order_matches_serializer(self):
+        self.assertEqual(list(self.fetch()[0]), list(self.expected()[0]))
+
+    def test_cover_image_fallbacks(self):
+        covers = [row["cover_image"] for row in self.fetch()]
+        self.assertTrue(covers[0].endswith("units/1/facade.jpg"))
+        self.assertTrue(covers[1].endswith("properties/1/cover.jpg"))
+        self.assertIsNone(covers[2])
+        self.assertTrue(covers[3].endswith("units/2/renditions/vue-card.webp"))
+
+    def test_sparse_fields_match_serializer(self):
+        params = {"fields": "price,cover_image,published_at"}
+        self.assertEqual(self.fetch(params), self.expected(params))
+
+    def test_expand_description_matches_serializer(self):
+        params = {"expand": "description"}
+        self.assertEqual(self.fetch(params), self.expected(params))
+
+    def test_expand_unit_falls_back_to_serializer(self):
+        params = {"expand": "unit"}
+        rows = self.fetch(params)
+        self.assertEqual(rows, self.expected(params))
+        self.assertEqual(len(rows[0]["unit"]["images"]), 2)
+
+    def test_cursor_pagination_on_projection(self):
+        response = self.client.get("/api/listings/", {"pagination": "cursor", "page_size": 2})
+        body = response.json()
+        self.assertEqual(len(body["results"]), 2)
+        self.assertIsNotNone(body["next"])
+        rest = self.client.get(body["next"]).json()
+        ids = [row["id"] for row in body["results"] + rest["results"]]
+        self.assertEqual(sorted(ids), [row["id"] for row in self.expected()])
+
+    def test_forged_cursor_is_not_found(self):
+        for values in (["pas-une-date", 1], [{"a": 1}, 1], [None, 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+            response = self.client.get("/api/listings/", {"cursor": cursor})
+            self.assertEqual(response.status_code, 404, values)
@@ -0,0 +1,86 @@
+# public_api/tiles.py
+"""
+Tuiles vectorielles (Mapbox Vector Tiles) des annonces actives, générées par PostGIS (ST_AsMVT).
+
+Les tuiles sont mises en cache (cache Django) par (z, x, y) sous une « génération » :
+toute modification pertinente (activation, prix, type, localisation) incrémente la génération,
+ce qui invalide d'un coup toutes les tuiles sans avoir à les énumérer (cf. public_api.signals).
+"""
+from __future__ import annotations
+
+import hashlib
+
+from django.core.cache import cache
+from django.db import connection
+
+from properties.models import Listing, Property, Unit
+
+TILE_LAYER = "listings"
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+TILE_MAX_ZOOM = 22
+TILE_CACHE_TIMEOUT = 60 * 60 * 24
+
+_GENERATION_KEY = "tiles:listings:generation"
+
+_TILE_SQL = """
+WITH bounds AS (
+    SELECT ST_TileEnvelope(%(z)s, %(x)s, %(y)s) AS geom
+),
+mvtgeom AS (
+    SELECT ST_AsMVTGeom(ST_Transform(p.geom::geometry, 3857), bounds.geom, %(extent)s, %(buffer)s, true) AS geom,
+           l.id AS listing_id,
+           l.price::float8 AS price,
+           l.currency,
+           l.listing_type,
+           p.property_type
+    FROM {listing} l
+    JOIN {unit} u ON u.id = l.unit_id
+    JOIN {property} p ON p.id = u.property_id
+    CROSS JOIN bounds
+    WHERE l.is_active
+      AND p.geom && ST_Transform(bounds.geom, 4326)::geography
+)
+SELECT ST_AsMVT(mvtgeom.*, %(layer)s, %(extent)s, 'geom') FROM mvtgeom
+"""
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= TILE_MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def tile_generation() -> int:
+    return cache.get_or_set(_GENERATION_KEY, 1, timeout=None)
+
+
+def invalidate_tiles() -> None:
+    """Incrémente la génération : les tuiles en cache deviennent inaccessibles (et expirent seules)."""
+    try:
+        cache.incr(_GENERATION_KEY)
+    except ValueError:  # clé absente/expirée
+        cache.set(_GENERATION_KEY, 2, timeout=None)
+
+
+def render_tile(z: int, x: int, y: int) -> bytes:
+    sql = _TILE_SQL.format(
+        listing=Listing._meta.db_table,
+        unit=Unit._meta.db_table,
+        property=Property._meta.db_table,
+    )
+    params = {"z": z, "x": x, "y": y, "extent": TILE_EXTENT, "buffer": TILE_BUFFER, "layer": TILE_LAYER}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    return bytes(row[0]) if row and row[0] else b""
+
+
+def get_tile(z: int, x: int, y: int) -> tuple[bytes, str]:
+    """Retourne (contenu MVT, ETag), depuis le cache si possible."""
+    key = f"tiles:listings:{tile_generation()}:{z}/{x}/{y}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    data = render_tile(z, x, y)
+    etag = '"%s"' % hashlib.md5(data).hexdigest()
+    cache.set(key, (data, etag), timeout=TILE_CACHE_TIMEOUT)
+    return data, etag
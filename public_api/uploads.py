@@ -0,0 +1,375 @@
+# public_api/uploads.py
+"""
+Uploads directs navigateur → MinIO : les workers de l'application ne voient jamais les octets.
+
+    POST /api/uploads/                  {target, filename, content_type, size, params}
+      → clé réservée sous le préfixe `upload_to` du champ cible + instructions :
+        - "post"      : URL + champs d'un POST présigné (taille et Content-Type imposés par la policy) ;
+        - "multipart" : au-delà de UPLOAD_MULTIPART_THRESHOLD, une URL présignée par part ;
+    POST /api/uploads/{id}/complete/    {parts: [{part_number, etag}]}   (multipart seulement)
+      → HEAD de l'objet (taille, Content-Type), puis rattachement au modèle cible.
+
+Chaque cible (`TARGETS`) déclare son modèle, son champ fichier, les types MIME admis, la taille max,
+le serializer de ses métadonnées (`params`, validés à la création puis à nouveau au rattachement)
+et le contrôle d'accès. Les intents expirés sont purgés par `public_api.purge_upload_intents`.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import APIException, PermissionDenied, ValidationError
+
+from accounts.models import CompanyMembership, KYCDocument, UserProfile
+from accounts.serializers import KYCDocumentSerializer, UserProfileSerializer
+from properties.models import PropertyDocument, PropertyImage, UnitImage
+from terra360.storage import presign_client
+from .models import UploadIntent
+from .serializers import PropertyDocumentSerializer, PropertyImageSerializer, UnitImageSerializer
+
+logger = logging.getLogger(__name__)
+
+IMAGE_TYPES = ("image/jpeg", "image/png", "image/webp")
+DOCUMENT_TYPES = ("application/pdf",) + IMAGE_TYPES
+# taille minimale d'une part S3 (hors dernière)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class DirectUploadUnavailable(APIException):
+    status_code = 503
+    default_detail = "Upload direct indisponible (stockage S3 non configuré)."
+
+
+# ---------- Cibles ----------
+
+class UploadTarget:
+    model = None
+    field_name = None
+    content_types = IMAGE_TYPES
+    max_size_setting = "UPLOAD_MAX_IMAGE_SIZE"
+    params_serializer_class = None
+    result_serializer_class = None
+
+    @property
+    def max_size(self) -> int:
+        return getattr(settings, self.max_size_setting)
+
+    def params_serializer(self, request, params):
+        return self.params_serializer_class(data=params, context={"request": request})
+
+    def check_access(self, request, validated: dict) -> None:
+        raise NotImplementedError
+
+    def build(self, request, params):
+        """Instance non enregistrée (pour `upload_to`), après validation des params et contrôle d'accès."""
+        serializer = self.params_serializer(request, params)
+        serializer.is_valid(raise_exception=True)
+        self.check_access(request, serializer.validated_data)
+        return serializer, self.model(**serializer.validated_data)
+
+    def attach(self, request, params, name: str):
+        serializer, _ = self.build(request, params)
+        return serializer.save(**{self.field_name: name})
+
+    def result(self, request, instance) -> dict:
+        return self.result_serializer_class(instance, context={"request": request}).data
+
+
+def _owns_property(request, prop) -> None:
+    if not (request.user.is_staff or prop.owner_user_id == request.user.id):
+        raise PermissionDenied("Ce bien ne vous appartient pas.")
+
+
+class PropertyImageParams(serializers.ModelSerializer):
+    class Meta:
+        model = PropertyImage
+        fields = ["property", "caption", "is_primary", "ordering"]
+
+
+class PropertyImageTarget(UploadTarget):
+    model = PropertyImage
+    field_name = "image"
+    params_serializer_class = PropertyImageParams
+    result_serializer_class = PropertyImageSerializer
+
+    def check_access(self, request, validated):
+        _owns_property(request, validated["property"])
+
+
+class UnitImageParams(serializers.ModelSerializer):
+    class Meta:
+        model = UnitImage
+        fields = ["unit", "caption", "ordering"]
+
+
+class UnitImageTarget(UploadTarget):
+    model = UnitImage
+    field_name = "image"
+    params_serializer_class = UnitImageParams
+    result_serializer_class = UnitImageSerializer
+
+    def check_access(self, request, validated):
+        _owns_property(request, validated["unit"].property)
+
+
+class PropertyDocumentParams(serializers.ModelSerializer):
+    class Meta:
+        model = PropertyDocument
+        fields = ["property", "doc_type", "title"]
+
+
+class PropertyDocumentTarget(UploadTarget):
+    model = PropertyDocument
+    field_name = "file"
+    content_types = DOCUMENT_TYPES
+    max_size_setting = "UPLOAD_MAX_DOCUMENT_SIZE"
+    params_serializer_class = PropertyDocumentParams
+    result_serializer_class = PropertyDocumentSerializer
+
+    def check_access(self, request, validated):
+        _owns_property(request, validated["property"])
+
+
+class KYCDocumentParams(KYCDocumentSerializer):
+    """KYCDocumentSerializer sans le fichier (fourni au rattachement)."""
+    class Meta(KYCDocumentSerializer.Meta):
+        fields = [f for f in KYCDocumentSerializer.Meta.fields if f != "file"]
+
+
+class KYCDocumentTarget(UploadTarget):
+    model = KYCDocument
+    field_name = "file"
+    content_types = DOCUMENT_TYPES
+    max_size_setting = "UPLOAD_MAX_DOCUMENT_SIZE"
+    params_serializer_class = KYCDocumentParams
+    result_serializer_class = KYCDocumentSerializer
+
+    def check_access(self, request, validated):
+        user = request.user
+        if user.is_staff:
+            return
+        owner_user = validated.get("owner_user")
+        owner_company = validated.get("owner_company")
+        if owner_user is not None and owner_user != user:
+            raise PermissionDenied("Document KYC d'un autre utilisateur.")
+        if owner_company is not None and not CompanyMembership.objects.filter(
+            user=user, company=owner_company,
+        ).exists():
+            raise PermissionDenied("Vous n'êtes pas membre de cette entreprise.")
+
+    def build(self, request, params):
+        serializer, instance = super().build(request, params)
+        # même propriétaire par défaut que KYCDocumentSerializer.create (utilisé par `upload_to`)
+        if instance.owner_user_id is None and instance.owner_company_id is None:
+            instance.owner_user = request.user
+        return serializer, instance
+
+
+class AvatarTarget(UploadTarget):
+    model = UserProfile
+    field_name = "avatar"
+    result_serializer_class = UserProfileSerializer
+
+    def build(self, request, params):
+        return None, request.user.profile
+
+    def attach(self, request, params, name):
+        profile = request.user.profile
+        profile.avatar.name = name
+        profile.save(update_fields=["avatar", "updated_at"])
+        return profile
+
+
+TARGETS = {
+    "avatar": AvatarTarget(),
+    "kyc_document": KYCDocumentTarget(),
+    "property_image": PropertyImageTarget(),
+    "unit_image": UnitImageTarget(),
+    "property_document": PropertyDocumentTarget(),
+}
+
+
+# ---------- S3 ----------
+
+def _storage():
+    try:
+        from storages.backends.s3 import S3Storage
+    except ImportError:
+        raise DirectUploadUnavailable()
+    if not isinstance(default_storage, S3Storage):
+        raise DirectUploadUnavailable()
+    return default_storage
+
+
+def object_key(storage, name: str) -> str:
+    from storages.utils import clean_name
+
+    return storage._normalize_name(clean_name(name))
+
+
+def _object_params(storage) -> dict:
+    params = {}
+    if storage.default_acl:
+        params["ACL"] = storage.default_acl
+    if storage.object_parameters.get("CacheControl"):
+        params["CacheControl"] = storage.object_parameters["CacheControl"]
+    return params
+
+
+def _presigned_post(storage, intent: UploadIntent) -> dict:
+    key = object_key(storage, intent.name)
+    params = _object_params(storage)
+    fields = {"Content-Type": intent.content_type}
+    if "ACL" in params:
+        fields["acl"] = params["ACL"]
+    if "CacheControl" in params:
+        fields["Cache-Control"] = params["CacheControl"]
+    conditions = [{k: v} for k, v in fields.items()]
+    conditions.append(["content-length-range", intent.size, intent.size])
+    post = presign_client().generate_presigned_post(
+        Bucket=storage.bucket_name, Key=key, Fields=fields, Conditions=conditions,
+        ExpiresIn=settings.UPLOAD_INTENT_TTL,
+    )
+    return {"method": "post", "url": post["url"], "fields": post["fields"]}
+
+
+def _multipart(storage, intent: UploadIntent) -> dict:
+    key = object_key(storage, intent.name)
+    client = storage.connection.meta.client
+    created = client.create_multipart_upload(
+        Bucket=storage.bucket_name, Key=key, ContentType=intent.content_type, **_object_params(storage),
+    )
+    intent.upload_id = created["UploadId"]
+    part_size = max(settings.UPLOAD_MULTIPART_PART_SIZE, MIN_PART_SIZE)
+    signer = presign_client()
+    parts = [
+        {
+            "part_number": number,
+            "url": signer.generate_presigned_url(
+                "upload_part",
+                Params={"Bucket": storage.bucket_name, "Key": key,
+                        "UploadId": intent.upload_id, "PartNumber": number},
+                ExpiresIn=settings.UPLOAD_INTENT_TTL,
+            ),
+        }
+        for number in range(1, math.ceil(intent.size / part_size) + 1)
+    ]
+    return {"method": "multipart", "part_size": part_size, "parts": parts}
+
+
+# ---------- Cycle de vie ----------
+
+def create_intent(request, target: str, filename: str, content_type: str, size: int, params: dict):
+    """Réserve la clé et renvoie (intent, instructions d'upload)."""
+    handler = TARGETS[target]
+    if content_type not in handler.content_types:
+        raise ValidationError({"content_type": f"Type non autorisé pour {target} : {content_type}."})
+    if size > handler.max_size:
+        raise ValidationError({"size": f"Fichier trop volumineux (max {handler.max_size} octets)."})
+    storage = _storage()
+
+    _, instance = handler.build(request, params)
+    field = handler.model._meta.get_field(handler.field_name)
+    intent = UploadIntent(
+        user=request.user, target=target, params=params, filename=filename,
+        content_type=content_type, size=size, name=field.generate_filename(instance, filename),
+        expires_at=timezone.now() + timedelta(seconds=settings.UPLOAD_INTENT_TTL),
+    )
+    if size > settings.UPLOAD_MULTIPART_THRESHOLD:
+        instructions = _multipart(storage, intent)
+    else:
+        instructions = _presigned_post(storage, intent)
+    intent.save()
+    return intent, instructions
+
+
+def _discard(storage, intent: UploadIntent) -> None:
+    key = object_key(storage, intent.name)
+    client = storage.connection.meta.client
+    try:
+        if intent.upload_id:
+            client.abort_multipart_upload(Bucket=storage.bucket_name, Key=key, UploadId=intent.upload_id)
+        client.delete_object(Bucket=storage.bucket_name, Key=key)
+    except Exception:
+        logger.warning("Nettoyage de l'upload %s impossible", intent.pk, exc_info=True)
+
+
+def _reject(storage, intent: UploadIntent, errors: dict):
+    _discard(storage, intent)
+    UploadIntent.objects.filter(pk=intent.pk).update(status=UploadIntent.ABORTED)
+    raise ValidationError(errors)
+
+
+def complete_intent(request, intent: UploadIntent, parts=None) -> dict:
+    """Vérifie l'objet déposé (HEAD, sans lire son contenu) et le rattache au modèle cible."""
+    if intent.status != UploadIntent.PENDING:
+        raise ValidationError({"detail": f"Upload déjà {intent.get_status_display().lower()}."})
+    if intent.expires_at < timezone.now():
+        raise ValidationError({"detail": "Upload expiré."})
+    storage = _storage()
+    client = storage.connection.meta.client
+    key = object_key(storage, intent.name)
+
+    if intent.upload_id:
+        if not parts:
+            raise ValidationError({"parts": "Liste des parts (part_number, etag) requise."})
+        try:
+            client.complete_multipart_upload(
+                Bucket=storage.bucket_name, Key=key, UploadId=intent.upload_id,
+                MultipartUpload={"Parts": [
+                    {"PartNumber": p["part_number"], "ETag": p["etag"]}
+                    for p in sorted(parts, key=lambda p: p["part_number"])
+                ]},
+            )
+        except client.exceptions.ClientError as exc:
+            code = exc.response.get("Error", {}).get("Code")
+            # NoSuchUpload : upload déjà assemblé (nouvel essai) ou abandonné — tranché par le HEAD
+            if code != "NoSuchUpload":
+                raise ValidationError({"parts": f"Assemblage des parts refusé ({code})."})
+    try:
+        head = client.head_object(Bucket=storage.bucket_name, Key=key)
+    except client.exceptions.ClientError:
+        raise ValidationError({"detail": "Aucun fichier déposé pour cet upload."})
+    if head["ContentLength"] != intent.size:
+        _reject(storage, intent, {"size": f"Taille reçue {head['ContentLength']} ≠ {intent.size} annoncée."})
+    if head.get("ContentType") != intent.content_type:
+        _reject(storage, intent, {"content_type": f"Type reçu {head.get('ContentType')} ≠ {intent.content_type}."})
+
+    handler = TARGETS[intent.target]
+    with transaction.atomic():
+        locked = UploadIntent.objects.select_for_update().get(pk=intent.pk)
+        if locked.status != UploadIntent.PENDING:
+            raise ValidationError({"detail": "Upload déjà traité."})
+        instance = handler.attach(request, intent.params, intent.name)
+        UploadIntent.objects.filter(pk=intent.pk).update(
+            status=UploadIntent.COMPLETED, completed_at=timezone.now(),
+            attached_model=instance._meta.label, attached_id=instance.pk,
+        )
+    return handler.result(request, instance)
+
+
+def abort_intent(intent: UploadIntent) -> None:
+    if intent.status == UploadIntent.PENDING:
+        _discard(_storage(), intent)
+        UploadIntent.objects.filter(pk=intent.pk).update(status=UploadIntent.ABORTED)
+
+
+def purge_expired(batch: int = 500) -> int:
+    """Intents non terminés et expirés : parts/objets orphelins supprimés, intent marqué abandonné."""
+    expired = list(
+        UploadIntent.objects.filter(status=UploadIntent.PENDING, expires_at__lt=timezone.now())
+        .order_by("expires_at")[:batch]
+    )
+    if not expired:
+        return 0
+    storage = _storage()
+    for intent in expired:
+        _discard(storage, intent)
+    UploadIntent.objects.filter(pk__in=[i.pk for i in expired]).update(status=UploadIntent.ABORTED)
+    return len(expired)
@@ -10,7 +10,7 @@ from billing.views import RentInvoiceViewSet
 from leasing.views import LeaseContractViewSet
 from maintenance.views import MaintenanceTicketViewSet
 from public_api.views import PartyViewSet, UnitViewSet, ListingViewSet, FavoriteListingViewSet, VisitRequestViewSet, \
-    AmenityViewSet, ValuationViewSet, HomeView, SummaryView, SearchSuggestView
+    AmenityViewSet, ValuationViewSet, HomeView, SummaryView, SearchSuggestView, ListingTileView, UploadIntentViewSet
 from public_api.views import PropertyViewSet
 
 router = DefaultRouter()
@@ -44,6 +44,9 @@ router.register(r"visit-requests", VisitRequestViewSet, basename="visitrequest")
 router.register(r"amenities", AmenityViewSet, basename="amenity")
 router.register(r"valuations", ValuationViewSet, basename="valuation")
 
+# Uploads directs (URLs présignées MinIO)
+router.register(r"uploads", UploadIntentViewSet, basename="upload")
+
 urlpatterns = [
                   path("", include(router.urls)),
                   # Auth JWT
@@ -58,6 +61,8 @@ urlpatterns = [
                   path('home/', HomeView.as_view(), name='home'),
                   path('summary/', SummaryView.as_view(), name='summary'),
                   path('search/suggest/', SearchSuggestView.as_view(), name='search-suggest'),
+                  path('tiles/listings/<int:z>/<int:x>/<int:y>.mvt', ListingTileView.as_view(),
+                       name='listing-tiles'),
               ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
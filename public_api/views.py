@@ -1,25 +1,41 @@
 # /Users/ogahserge/Documents/terra360/public_api/views.py
-from datetime import timedelta
+import time
 
-from django.shortcuts import render
+import redis
+
+from django.http import Http404, HttpResponse
+from django.shortcuts import render, get_object_or_404
 
 # Create your views here.
 # public_api/views.py
 
 
-from django.db.models import Count, Avg, Min, Max, Q
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.measure import D
+from django.db.models import Count, Avg, Min, Max, F, Prefetch
 from django.utils import timezone
-from django.utils.decorators import method_decorator
-from django.utils.text import slugify
-from django.views.decorators.cache import cache_page
 from rest_framework import viewsets, mixins, permissions, filters
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
-from .models import Banner, QuickAction, Category, MapTeaser
+from .conditional import (
+    ConditionalGetMixin, is_not_modified, make_etag, not_modified_response, set_validators,
+)
+from .pagination import KeysetPagination
+from .projections import listing_card_projection
+from .sparse import SparseFieldsetViewMixin
+from . import home, tiles, uploads
+from properties import geo
+from properties.search import search_listings
+from properties.stats import stats_from_rollup
+from properties.suggest import suggest
+from properties.view_counts import record_view
+from terra360.cache import cache_aside
+from terra360.signed_urls import url_window, url_window_started_at
 
 # Permissions (import si déjà présents, sinon fallback)
 try:
@@ -45,18 +61,21 @@ except Exception:
             return not roles or request.user.role in roles
 
 # Models & Serializers
-from parties.models import Party
+from parties.models import Party, PartyRole
 from properties.models import (
     Property, Unit, Listing,
     Amenity, PropertyAmenity, UnitAmenity,
+    PropertyImage, UnitImage, PropertyDocument,
     FavoriteListing, VisitRequest, Valuation
 )
 from .serializers import (
     PartySerializer,
-    PropertySerializer, UnitSerializer, ListingSerializer,
+    PropertySerializer, PropertyListSerializer, UnitSerializer, UnitListSerializer,
+    ListingSerializer, ListingListSerializer, listing_media_prefetches,
     AmenitySerializer, FavoriteListingSerializer, VisitRequestSerializer,
-    ValuationSerializer, BannerSerializer, QuickActionSerializer, CategorySerializer, MapTeaserSerializer
+    ValuationSerializer, UploadIntentSerializer, UploadCompleteSerializer,
 )
+from .models import UploadIntent
 
 
 # ============
@@ -89,10 +108,10 @@ class ListingFilterSet(filters.BaseFilterBackend):
         if max_price:
             queryset = queryset.filter(price__lte=max_price)
 
-        # Ville / type de propriété
+        # Ville (colonne dénormalisée, index trigramme partiel) / type de propriété
         city = p.get("city")
         if city:
-            queryset = queryset.filter(unit__property__city__icontains=city)
+            queryset = queryset.filter(property_city__icontains=city)
         ptype = p.get("property_type")
         if ptype:
             queryset = queryset.filter(unit__property__property_type=ptype)
@@ -102,25 +121,61 @@ class ListingFilterSet(filters.BaseFilterBackend):
         if bedrooms:
             queryset = queryset.filter(unit__bedrooms__gte=bedrooms)
 
+        # Géo: rayon autour d'un point (near=lat,lng&radius_km=) et/ou bbox=ouest,sud,est,nord
+        point = None
+        try:
+            if p.get("near"):
+                point = geo.parse_point(p["near"])
+                radius = geo.parse_radius_km(p.get("radius_km"))
+                queryset = queryset.filter(**{f"{geo.LISTING_GEOM}__dwithin": (point, D(km=radius))})
+            if p.get("bbox"):
+                queryset = queryset.filter(**{f"{geo.LISTING_GEOM}__intersects": geo.parse_bbox(p["bbox"])})
+        except ValueError as e:
+            raise ValidationError({"detail": str(e)})
+
         # Actives par défaut
         active = p.get("active", "true").lower()
         if active in {"true", "1"}:
             queryset = queryset.filter(is_active=True)
 
-        # Tri (front envoie '-published_at' pour l’onglet “Nouveaux”)
+        # Tri (front envoie '-published_at' pour l’onglet “Nouveaux”, 'distance' avec near=)
         ordering = p.get("ordering", "-published_at")
-        if ordering:
+        if ordering == "distance":
+            if point is None:
+                raise ValidationError({"detail": "ordering=distance nécessite near=lat,lng"})
+            queryset = queryset.annotate(distance=Distance(geo.LISTING_GEOM, point)).order_by("distance", "id")
+        elif ordering:
             queryset = queryset.order_by(ordering)
         return queryset
 
 
+class ListingSearchFilter(filters.SearchFilter):
+    """
+    `?search=` sur le document de recherche dénormalisé (GIN plein texte + trigrammes),
+    trié par pertinence sauf si le client impose `ordering`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+        queryset = search_listings(queryset, query)
+        if "ordering" not in request.query_params:
+            queryset = queryset.order_by("-search_rank", "-published_at")
+        return queryset
+
+
 # ============
 # Parties (limité)
 # ============
 
 class PartyViewSet(viewsets.ReadOnlyModelViewSet):
     """Lecture seule des parties (utile pour autocomplete côté UI)."""
-    queryset = Party.objects.all().order_by("full_name")
+    queryset = (
+        Party.objects
+        .prefetch_related(Prefetch("roles", queryset=PartyRole.objects.order_by("id")))
+        .order_by("full_name")
+    )
     serializer_class = PartySerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter]
@@ -131,10 +186,17 @@ class PartyViewSet(viewsets.ReadOnlyModelViewSet):
 # Properties
 # ============
 
-class PropertyViewSet(viewsets.ModelViewSet):
-    """CRUD Property – réservé aux propriétaires (owner)."""
-    queryset = Property.objects.select_related("owner", "owner_user").all().order_by("-created_at")
+class PropertyViewSet(ConditionalGetMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
+    """CRUD Property – réservé aux propriétaires (owner). Liste compacte (?fields=/?expand=)."""
+    queryset = (
+        Property.objects.select_related("owner", "owner_user")
+        .prefetch_related("images", "documents")
+        .order_by("-created_at")
+    )
     serializer_class = PropertySerializer
+    compact_serializer_class = PropertyListSerializer
+    conditional_models = (Property, PropertyImage, PropertyDocument)
+    conditional_per_user = True  # liste filtrée par propriétaire
     allowed_roles = ("owner",)
     permission_classes = [RoleRequired & IsOwnerOrReadOnly]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -142,6 +204,14 @@ class PropertyViewSet(viewsets.ModelViewSet):
     ordering_fields = ["created_at", "title"]
     ordering = ["-created_at"]
 
+    def conditional_validators(self, request):
+        # documents en URLs signées : un 304 ne doit pas resservir des URLs expirées
+        etag, last_modified = super().conditional_validators(request)
+        if etag is None:
+            return None, None
+        now = time.time()
+        return make_etag(etag, url_window(now)), max(last_modified or 0, url_window_started_at(now))
+
     def perform_create(self, serializer):
         serializer.save(owner_user=self.request.user)
 
@@ -153,10 +223,11 @@ class PropertyViewSet(viewsets.ModelViewSet):
         return qs.none() if not user.is_staff else qs  # staff voit tout
 
 
-class UnitViewSet(viewsets.ModelViewSet):
-    """CRUD Unit – restreint au propriétaire du bien parent."""
-    queryset = Unit.objects.select_related("property", "property__owner_user").all()
+class UnitViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
+    """CRUD Unit – restreint au propriétaire du bien parent. Liste compacte (?fields=/?expand=)."""
+    queryset = Unit.objects.select_related("property", "property__owner_user").prefetch_related("images")
     serializer_class = UnitSerializer
+    compact_serializer_class = UnitListSerializer
     allowed_roles = ("owner",)
     permission_classes = [RoleRequired & IsOwnerOrReadOnly]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -183,30 +254,62 @@ class UnitViewSet(viewsets.ModelViewSet):
 # Listings (public read-only)
 # ============
 
-class ListingViewSet(viewsets.ReadOnlyModelViewSet):
-    """Catalogue public des annonces."""
+class ListingViewSet(ConditionalGetMixin, SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
+    """Catalogue public des annonces. Liste en cartes compactes (?fields=/?expand=), détail complet."""
     queryset = (
         Listing.objects
         .select_related("unit", "unit__property")
+        .prefetch_related(*listing_media_prefetches())
         .filter(is_active=True)
         .order_by("-published_at")
     )
     serializer_class = ListingSerializer
+    compact_serializer_class = ListingListSerializer
+    # ETag/304 (cf. public_api.conditional) : tout ce que rendent la carte et le détail
+    conditional_models = (Listing, Unit, Property, UnitImage, PropertyImage)
+    # clés de tri/curseur lues sur la dernière ligne de la page
+    sparse_extra_columns = ("published_at", "price")
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, ListingFilterSet, filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ["description", "unit__name", "unit__property__title", "unit__property__address",
-                     "unit__property__city"]
+    filter_backends = [DjangoFilterBackend, ListingFilterSet, ListingSearchFilter, filters.OrderingFilter]
     ordering_fields = ["published_at", "price"]
+    pagination_class = KeysetPagination
+    cursor_orderings = {
+        "-published_at": ("-published_at", "-id"),
+        "published_at": ("published_at", "id"),
+        "-price": ("-price", "-id"),
+        "price": ("price", "id"),
+    }
+    cursor_default_ordering = "-published_at"
+
+    def list(self, request, *args, **kwargs):
+        # chemin rapide : dicts values() mis en forme sans serializer (cf. public_api.projections)
+        projection = listing_card_projection(self.sparse_fields())
+        if projection is None:
+            return super().list(request, *args, **kwargs)
+        queryset = projection.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(projection.transform(page))
+        return Response(projection.transform(queryset))
 
     @action(detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated])
     def increment_view(self, request, pk=None):
-        obj = self.get_object()
-        obj.views_count = (obj.views_count or 0) + 1
-        obj.save(update_fields=["views_count"])
-        return Response({"views_count": obj.views_count})
+        obj = get_object_or_404(Listing.objects.filter(is_active=True).only("id", "views_count"), pk=pk)
+        self.check_object_permissions(request, obj)
+        try:
+            # HINCRBY Redis, reporté en base par la tâche properties.flush_listing_views
+            pending = record_view(obj.pk)
+        except redis.RedisError:
+            Listing.objects.filter(pk=obj.pk).update(views_count=F("views_count") + 1)
+            pending = 1
+        return Response({"views_count": obj.views_count + pending})
 
     @action(detail=False, methods=["get"])
     def stats(self, request):
+        # Combinaisons courantes servies par le rollup ListingStat, sinon agrégat live
+        data = stats_from_rollup(request.query_params)
+        if data is not None:
+            return Response(data)
         qs = self.filter_queryset(self.get_queryset())
         data = qs.aggregate(
             total=Count("id"),
@@ -216,6 +319,19 @@ class ListingViewSet(viewsets.ReadOnlyModelViewSet):
         )
         return Response(data)
 
+    @action(detail=False, methods=["get"])
+    def clusters(self, request):
+        """
+        GET /listings/clusters/?bbox=ouest,sud,est,nord&zoom=12 (+ mêmes filtres que la liste)
+        Clusters geohash avec nombre d'annonces et fourchette de prix, pour la carte.
+        """
+        try:
+            zoom = geo.parse_zoom(request.query_params.get("zoom"))
+        except ValueError as e:
+            raise ValidationError({"zoom": str(e)})
+        qs = self.filter_queryset(self.get_queryset())
+        return Response({"zoom": zoom, "clusters": geo.cluster_listings(qs, zoom)})
+
     @action(detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated])
     def favorite(self, request, pk=None):
         listing = self.get_object()
@@ -236,11 +352,14 @@ class ListingViewSet(viewsets.ReadOnlyModelViewSet):
 class FavoriteListingViewSet(viewsets.ModelViewSet):
     serializer_class = FavoriteListingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_orderings = {"-created_at": ("-created_at", "-id")}
+    cursor_default_ordering = "-created_at"
 
     def get_queryset(self):
         return FavoriteListing.objects.filter(user=self.request.user).select_related(
             "listing", "listing__unit", "listing__unit__property"
-        ).order_by("-created_at")
+        ).prefetch_related(*listing_media_prefetches("listing__")).order_by("-created_at")
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -249,6 +368,9 @@ class FavoriteListingViewSet(viewsets.ModelViewSet):
 class VisitRequestViewSet(viewsets.ModelViewSet):
     serializer_class = VisitRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    cursor_orderings = {"-created_at": ("-created_at", "-id")}
+    cursor_default_ordering = "-created_at"
 
     def get_queryset(self):
         return VisitRequest.objects.filter(user=self.request.user).select_related(
@@ -259,134 +381,43 @@ class VisitRequestViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-@method_decorator(cache_page(60), name="get")  # cache 60s
 class HomeView(APIView):
     """
     GET /home/
     Renvoie la forme attendue par l'écran Home, mais en dynamique.
+    Chaque section est cachée séparément (stale-while-revalidate, cf. public_api.home).
     """
     permission_classes = [AllowAny]
 
     def get(self, request):
-        now = timezone.now()
-
-        # ---------- BANNERS ----------
-        banners_qs = (
-            Banner.objects
-            .filter(active=True)
-            .filter(Q(starts_at__isnull=True) | Q(starts_at__lte=now))
-            .filter(Q(ends_at__isnull=True) | Q(ends_at__gte=now))
-            .order_by("order", "id")
-            .only("id", "title", "subtitle", "cta", "to", "icon", "image")
-        )
-        banners = BannerSerializer(banners_qs, many=True).data
-        if not banners:
-            banners = [
-                {"id": "b1", "title": "Investissez malin", "subtitle": "Rendements locatifs jusqu’à 12%",
-                 "cta": "Explorer", "to": "/#listings", "icon": "trending-up"},
-                {"id": "b2", "title": "Nouveautés", "subtitle": "Annonces fraîchement publiées", "cta": "Voir",
-                 "to": "/#listings?ordering=-published_at", "icon": "flash"},
-            ]
-
-        # ---------- QUICK ACTIONS ----------
-        qa_qs = (
-            QuickAction.objects
-            .filter(active=True)
-            .order_by("order", "id")
-            .only("id", "icon", "label", "to", "gradient", "color")
-        )
-        quick_actions = QuickActionSerializer(qa_qs, many=True).data
-        if not quick_actions:
-            quick_actions = [
-                {"id": "qa1", "icon": "map", "label": "Carte", "to": "/#map", "gradient": True},
-                {"id": "qa2", "icon": "heart", "label": "Favoris", "to": "/favorites"},
-                {"id": "qa3", "icon": "calendar", "label": "Visites", "to": "/visits"},
-                {"id": "qa4", "icon": "filter", "label": "Filtres", "to": "/#listings"},
-            ]
-
-        # ---------- CATEGORIES ----------
-        cat_qs = (
-            Category.objects
-            .filter(active=True)
-            .order_by("order", "id")
-            .only("id", "slug", "label", "icon", "color")
-        )
-        categories = CategorySerializer(cat_qs, many=True).data
-        if not categories:
-            categories = [
-                {"id": "all", "label": "Tout", "icon": "grid"},
-                {"id": "rent", "label": "Location", "icon": "pricetag"},
-                {"id": "sell", "label": "Vente", "icon": "cash"},
-                {"id": "featured", "label": "Vedettes", "icon": "star"},
-                {"id": "new", "label": "Nouveaux", "icon": "flash"},
-            ]
-
-        # ---------- DISTRICTS (tendances) ----------
-        # Idée: "tendance" = où il y a le plus d'annonces récentes
-        recent_since = now - timedelta(days=30)
-
-        district_counts = (
-            Listing.objects.filter(published_at__gte=recent_since)
-            .values("property_city", "property_district")
-            .annotate(n=Count("id"))
-            .order_by("-n")[:12]
-        )
+        sections = home.get_sections()
+        built_at = [entry["built_at"] for entry in sections.values()]
+        etag, last_modified = make_etag("home", built_at), max(built_at)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        response = Response({name: entry["value"] for name, entry in sections.items()})
+        return set_validators(response, etag, last_modified)
 
-        districts = []
-        for i, row in enumerate(district_counts):
-            label = row.get("property_district") or row.get("property_city") or "Inconnu"
-            if not label:
-                continue
-            districts.append({
-                "id": slugify(label) or f"d{i + 1}",
-                "label": label,
-                # si tu as un champ 'district.cover' ailleurs, remplace ceci:
-                "cover": f"https://picsum.photos/300/300?seed={slugify(label) or i}",
-            })
-
-        # Fallback si pas d'activité récente
-        if not districts:
-            # essaie de proposer des districts par défaut ou des plus anciens
-            fallback_agg = (
-                Listing.objects
-                .values("property_city", "property_district")
-                .annotate(n=Count("id"))
-                .order_by("-n")[:6]
-            )
-            for i, row in enumerate(fallback_agg):
-                label = row.get("property_district") or row.get("property_city") or f"Zone {i + 1}"
-                districts.append({
-                    "id": slugify(label) or f"d{i + 1}",
-                    "label": label,
-                    "cover": f"https://picsum.photos/300/300?seed={slugify(label) or i}",
-                })
-
-        # ---------- MAP TEASER ----------
-        teaser_obj = (
-            MapTeaser.objects
-            .filter(active=True)
-            .order_by("order", "id")
-            .only("title", "subtitle", "image", "to")
-            .first()
-        )
-        if teaser_obj:
-            map_teaser = MapTeaserSerializer(teaser_obj).data
+
+class ListingTileView(APIView):
+    """
+    GET /tiles/listings/{z}/{x}/{y}.mvt
+    Tuile vectorielle (MVT) des annonces actives : listing_id, price, currency, listing_type, property_type.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, z, x, y):
+        if not tiles.is_valid_tile(z, x, y):
+            raise Http404("Tuile invalide")
+        data, etag = tiles.get_tile(z, x, y)
+        if etag in request.headers.get("If-None-Match", ""):
+            response = HttpResponse(status=304)
         else:
-            map_teaser = {
-                "image": "https://picsum.photos/900/600?map",
-                "title": "Explorer sur la carte",
-                "subtitle": "Localisez rapidement les biens proches de vous",
-                "to": "/#map",
-            }
-
-        payload = {
-            "banners": banners,
-            "quick_actions": quick_actions,
-            "districts": districts,
-            "categories": categories,
-            "map_teaser": map_teaser,
-        }
-        return Response(payload)
+            response = HttpResponse(data, content_type="application/vnd.mapbox-vector-tile")
+        response["ETag"] = etag
+        response["Cache-Control"] = "public, max-age=60"
+        return response
 
 
 class SummaryView(APIView):
@@ -405,7 +436,8 @@ class SummaryView(APIView):
 class SearchSuggestView(APIView):
     """
     GET /search/suggest/?q=pla
-    => ["Plateau", "Marcory", "Cocody", ...]
+    => [{"label": "Plateau", "type": "district", "count": 42}, {"label": "Abidjan", "type": "city", ...}, ...]
+    Types : city, district, property, amenity. Servi depuis l'index en mémoire (properties.suggest).
     """
     permission_classes = [AllowAny]
 
@@ -413,27 +445,32 @@ class SearchSuggestView(APIView):
         q = (request.query_params.get("q") or "").strip()
         if not q:
             return Response([])
-        cities = (
-            Listing.objects.select_related("unit__property")
-            .filter(unit__property__city__icontains=q)
-            .values_list("unit__property__city", flat=True)
-            .distinct()[:8]
-        )
-        return Response(list(cities))
+        return Response(suggest(q, limit=8))
 
 
 # ============
 # Amenity (catalogue)
 # ============
 
-class AmenityViewSet(viewsets.ReadOnlyModelViewSet):
+class AmenityViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Amenity.objects.all().order_by("label")
     serializer_class = AmenitySerializer
+    conditional_models = (Amenity,)
     permission_classes = [permissions.AllowAny]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["label", "code"]
     ordering_fields = ["label", "code"]
 
+    def list(self, request, *args, **kwargs):
+        # catalogue public : la réponse complète est mise en cache par URL absolue — les liens
+        # next/previous sont absolus (schéma + hôte), une entrée ne peut pas servir un autre hôte
+        data = cache_aside(
+            f"amenities:{request.build_absolute_uri()}",
+            lambda: super(AmenityViewSet, self).list(request, *args, **kwargs).data,
+            depends_on=(Amenity,),
+        )
+        return Response(data)
+
 
 # ============
 # Valuation (staff/pro)
@@ -454,6 +491,40 @@ class ValuationViewSet(viewsets.ModelViewSet):
     ordering = ["-valued_at"]
 
 
+# ============
+# Uploads directs vers MinIO (présignés)
+# ============
+
+class UploadIntentViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin,
+                          viewsets.GenericViewSet):
+    """
+    POST /uploads/ réserve une clé et renvoie les URL(s) présignées ; le client dépose le fichier
+    directement dans MinIO puis appelle POST /uploads/{id}/complete/. DELETE abandonne l'upload.
+    """
+    serializer_class = UploadIntentSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadIntent.objects.filter(user=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        intent, instructions = uploads.create_intent(request, **serializer.validated_data)
+        data = dict(self.get_serializer(intent).data, upload=instructions)
+        return Response(data, status=201)
+
+    @action(detail=True, methods=["post"])
+    def complete(self, request, pk=None):
+        intent = self.get_object()
+        serializer = UploadCompleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(uploads.complete_intent(request, intent, serializer.validated_data.get("parts")))
+
+    def perform_destroy(self, instance):
+        uploads.abort_intent(instance)
+
+
 # ============
 # Healthcheck
 # ============
@@ -0,0 +1,39 @@
+# terra360/batching.py
+"""
+Regroupement d'écritures dérivées jusqu'au commit de la transaction en cours.
+
+Un signal appelle `batch.add(*ids)` autant de fois que nécessaire ; le travail (`flush(ids)`)
+est exécuté une seule fois au commit, pour l'ensemble des ids accumulés. Hors transaction
+(autocommit), `on_commit` exécute immédiatement : un appel = un flush.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Callable, Iterable
+
+from django.db import transaction
+
+
+class OnCommitBatch:
+    def __init__(self, flush: Callable[[set], object]):
+        self._flush = flush
+        self._local = threading.local()
+
+    def _pending(self) -> set:
+        if not hasattr(self._local, "ids"):
+            self._local.ids = set()
+        return self._local.ids
+
+    def add(self, *ids: Iterable) -> None:
+        self._pending().update(i for i in ids if i is not None)
+        # un callback par ajout (coût négligeable) : le premier exécuté vide le lot, les suivants
+        # ne font rien. Après un rollback, les ids restants sont rejoués au prochain commit —
+        # sans effet, les flush devant être idempotents.
+        transaction.on_commit(self._run)
+
+    def _run(self) -> None:
+        ids = self._pending()
+        if not ids:
+            return
+        self._local.ids = set()
+        self._flush(ids)
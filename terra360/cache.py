@@ -0,0 +1,125 @@
+# terra360/cache.py
+"""
+Cache-aside pour les données de catalogue (lecture majoritaire : équipements, rôles de partie…).
+
+Chaque modèle suivi porte un numéro de génération en cache, incrémenté après chaque save/delete.
+La clé d'une entrée embarque les générations des modèles dont elle dépend : une écriture rend
+les anciennes entrées inatteignables (elles expirent seules), sans avoir à connaître leurs clés.
+"""
+from __future__ import annotations
+
+import time
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+GENERATION_KEY = "cache:generation:{}"
+CHANGED_AT_KEY = "cache:changed-at:{}"
+_MISSING = object()
+
+
+def _generation_key(model) -> str:
+    return GENERATION_KEY.format(model._meta.label_lower)
+
+
+def _changed_at_key(model) -> str:
+    return CHANGED_AT_KEY.format(model._meta.label_lower)
+
+
+def _seed() -> int:
+    # génération initiale jamais émise auparavant : après un flush/une éviction, un ancien ETag
+    # (ou une ancienne clé cache_aside) ne peut pas correspondre à nouveau
+    return time.time_ns()
+
+
+# Générations non incrémentées faute de cache (incr absorbé par IGNORE_EXCEPTIONS), rejouées
+# à la lecture suivante de ce process
+_unpublished: set[str] = set()
+
+
+def _replay_unpublished() -> None:
+    for key in list(_unpublished):
+        try:
+            if cache.incr(key) is None:
+                return  # toujours indisponible
+        except ValueError:
+            pass  # clé disparue : elle sera réensemencée
+        _unpublished.discard(key)
+
+
+def _read_generations(generation_keys: list[str], extra_keys: list[str] = ()) -> dict | None:
+    """Valeurs en cache des générations (+ clés annexes) ; None si le cache ne répond pas."""
+    if _unpublished:
+        _replay_unpublished()
+    found = cache.get_many(list(generation_keys) + list(extra_keys))
+    missing = [k for k in generation_keys if k not in found]
+    if missing:
+        seed = _seed()
+        for key in missing:
+            cache.add(key, seed, timeout=None)
+        found.update(cache.get_many(missing))
+        if any(k not in found for k in generation_keys):
+            return None  # cache indisponible (get_many → {} avec IGNORE_EXCEPTIONS)
+    return found
+
+
+def model_generations(models: Iterable) -> tuple[int, ...]:
+    keys = [_generation_key(m) for m in models]
+    found = _read_generations(keys)
+    if found is None:
+        return tuple(0 for _ in keys)  # cache indisponible : cache_aside manquera de toute façon
+    return tuple(found[k] for k in keys)
+
+
+def model_state(models: Iterable) -> tuple[tuple[int, ...] | None, float | None]:
+    """
+    (générations, date de dernière écriture connue) des modèles, en un aller-retour cache ;
+    (None, None) si le cache ne répond pas : aucun validateur ne doit alors être émis.
+    """
+    models = list(models)
+    generation_keys = [_generation_key(m) for m in models]
+    changed_keys = [_changed_at_key(m) for m in models]
+    found = _read_generations(generation_keys, changed_keys)
+    if found is None:
+        return None, None
+    changed = [found[k] for k in changed_keys if k in found]
+    return tuple(found[k] for k in generation_keys), (max(changed) if changed else None)
+
+
+def bump_generation(model) -> None:
+    key = _generation_key(model)
+    try:
+        if cache.incr(key) is None:  # cache indisponible (IGNORE_EXCEPTIONS) : rejoué plus tard
+            _unpublished.add(key)
+    except ValueError:  # clé absente (cache vidé) : nouvelle graine, différente de toute génération passée
+        cache.set(key, _seed(), timeout=None)
+    cache.set(_changed_at_key(model), time.time(), timeout=None)
+
+
+def cache_aside(name: str, builder: Callable, depends_on: Iterable = (), timeout: int | None = None):
+    """
+    Valeur en cache pour `name`, sinon `builder()` mis en cache.
+    `depends_on` : modèles (suivis via `track_model`) dont une écriture invalide l'entrée.
+    """
+    generations = ".".join(str(g) for g in model_generations(depends_on))
+    key = f"aside:{name}:{generations}"
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = builder()
+        cache.set(key, value, timeout if timeout is not None else settings.CATALOGUE_CACHE_TTL)
+    return value
+
+
+def _bump_on_commit(sender, **kwargs):
+    transaction.on_commit(lambda: bump_generation(sender))
+
+
+def track_model(*models) -> None:
+    """Incrémente la génération des modèles donnés après chaque save/delete commité."""
+    for model in models:
+        uid = model._meta.label_lower
+        post_save.connect(_bump_on_commit, sender=model, dispatch_uid=f"cache_generation_saved_{uid}")
+        post_delete.connect(_bump_on_commit, sender=model, dispatch_uid=f"cache_generation_deleted_{uid}")
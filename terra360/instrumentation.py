@@ -0,0 +1,199 @@
+# terra360/instrumentation.py
+"""
+Instrumentation par requête : requêtes SQL, temps SQL, requêtes dupliquées (N+1), temps de sérialisation.
+
+- `RequestMetricsMiddleware` branche un `execute_wrapper` sur les connexions pendant la requête,
+  ajoute un en-tête `Server-Timing` (si SERVER_TIMING_ENABLED) et alimente les métriques Prometheus ;
+- `metrics_view` les expose au format texte Prometheus (/metrics) ;
+- QUERY_BUDGETS {nom de vue: nb max de requêtes} : dépassement journalisé, ou levé en
+  `QueryBudgetExceeded` si QUERY_BUDGET_STRICT (tests).
+
+Sous gunicorn (plusieurs workers), prometheus_client fonctionne en mode multiprocess :
+PROMETHEUS_MULTIPROC_DIR (posé et vidé par gunicorn.conf.py) reçoit les valeurs de chaque worker,
+et /metrics les agrège toutes, quel que soit le worker qui répond au scrape.
+Sans cette variable (runserver, tests, commandes), le registre est celui du process.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from functools import wraps
+
+import prometheus_client
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import multiprocess
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+# Bornes (secondes) de l'histogramme de durée des requêtes HTTP
+DURATION_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializer_depth = 0
+        self.signatures = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper : un appel par requête SQL
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - started
+            self.queries += 1
+            self.signatures[_IN_LIST.sub("IN (...)", sql)] += 1
+
+    def duplicates(self) -> dict[str, int]:
+        """Signatures exécutées au moins QUERY_DUPLICATE_THRESHOLD fois (profil N+1)."""
+        threshold = settings.QUERY_DUPLICATE_THRESHOLD
+        return {sql: n for sql, n in self.signatures.items() if n >= threshold}
+
+
+# ---------- Temps de sérialisation (DRF) ----------
+
+def _timed_data(prop):
+    @wraps(prop.fget)
+    def fget(self):
+        metrics = _current.get()
+        if metrics is None or metrics.serializer_depth:
+            return prop.fget(self)  # hors requête instrumentée, ou `.data` imbriqué
+        metrics.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return prop.fget(self)
+        finally:
+            metrics.serializer_seconds += time.perf_counter() - started
+            metrics.serializer_depth -= 1
+    return property(fget)
+
+
+_serializers_patched = False
+
+
+def instrument_serializers():
+    global _serializers_patched
+    if _serializers_patched:
+        return
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        cls.data = _timed_data(cls.data)
+    _serializers_patched = True
+
+
+# ---------- Métriques Prometheus ----------
+
+class MetricsRegistry:
+    def __init__(self):
+        # registre dédié : pas de métriques process/GC du client, ni de doublon en multiprocess
+        self._registry = prometheus_client.CollectorRegistry()
+        labels = ("view",)
+        self.duration = prometheus_client.Histogram(
+            "http_request_duration_seconds", "Durée des requêtes HTTP par vue.", labels,
+            buckets=DURATION_BUCKETS, registry=self._registry,
+        )
+
+        def counter(name, help_text):
+            return prometheus_client.Counter(name, help_text, labels, registry=self._registry)
+
+        self.queries = counter("db_queries", "Requêtes SQL exécutées.")
+        self.sql_seconds = counter("db_query_seconds", "Temps passé en SQL.")
+        self.serializer_seconds = counter("serializer_seconds", "Temps passé dans serializer.data.")
+        self.duplicate_queries = counter("db_duplicate_queries", "Requêtes répétées (signature N+1).")
+        self.budget_exceeded = counter("query_budget_exceeded", "Requêtes HTTP au-delà du budget SQL.")
+
+    def record(self, view, seconds, metrics: RequestMetrics, duplicates: int, over_budget: bool):
+        self.duration.labels(view).observe(seconds)
+        self.queries.labels(view).inc(metrics.queries)
+        self.sql_seconds.labels(view).inc(metrics.sql_seconds)
+        self.serializer_seconds.labels(view).inc(metrics.serializer_seconds)
+        self.duplicate_queries.labels(view).inc(duplicates)
+        self.budget_exceeded.labels(view).inc(int(over_budget))
+
+    def render(self) -> bytes:
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            # agrégat de tous les workers (fichiers du répertoire partagé), pas seulement de celui-ci
+            registry = prometheus_client.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return prometheus_client.generate_latest(registry)
+        return prometheus_client.generate_latest(self._registry)
+
+
+registry = MetricsRegistry()
+
+
+# ---------- Middleware / vue ----------
+
+def _view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return (match.view_name if match else None) or "unresolved"
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_serializers()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        elapsed = time.perf_counter() - started
+
+        view = _view_name(request)
+        duplicates = metrics.duplicates()
+        budget = settings.QUERY_BUDGETS.get(view, settings.QUERY_BUDGET_DEFAULT)
+        over_budget = budget is not None and metrics.queries > budget
+        registry.record(view, elapsed, metrics, sum(duplicates.values()), over_budget)
+
+        if duplicates:
+            logger.info("%s : requêtes répétées %s", view, {sql[:200]: n for sql, n in duplicates.items()})
+        if over_budget:
+            message = f"{view} : {metrics.queries} requêtes SQL pour un budget de {budget} ({request.path})"
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        if settings.SERVER_TIMING_ENABLED:
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={metrics.sql_seconds * 1000:.1f};desc="{metrics.queries} queries"',
+                f"serialize;dur={metrics.serializer_seconds * 1000:.1f}",
+                f"total;dur={elapsed * 1000:.1f}",
+            ])
+        return response
+
+
+def metrics_view(request):
+    """GET /metrics — METRICS_TOKEN (Bearer) si défini, sinon réservé à METRICS_ALLOWED_IPS."""
+    token = settings.METRICS_TOKEN
+    if token:
+        allowed = request.headers.get("Authorization", "") == f"Bearer {token}"
+    else:
+        allowed = request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type=prometheus_client.CONTENT_TYPE_LATEST)
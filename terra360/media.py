@@ -0,0 +1,279 @@
+# terra360/media.py
+"""
+Stockage dédupliqué par contenu des fichiers uploadés (photos, documents).
+
+Les champs `DedupFileField` / `DedupImageField` remplacent le nom `upload_to` (préfixé d'un uuid4,
+donc une copie par upload) par une clé adressée par contenu :
+
+    blobs/sha256/ab/cd/abcd…<64 hex>.jpg
+
+- upload via l'application (formulaire, admin, seed) : SHA-256 calculé en parcourant les chunks du
+  fichier reçu, avant toute écriture ; si le blob existe déjà, rien n'est écrit dans le stockage ;
+- upload direct (public_api.uploads) : l'objet est déposé sous sa clé `upload_to`, puis la tâche
+  `public_api.adopt_media_blob` le hache en streaming côté worker et le déplace (copie côté serveur)
+  vers sa clé de contenu — ou le supprime si ce contenu est déjà stocké ; `adopt_pending` rattrape
+  les lignes dont la tâche n'a pas pu être publiée (broker indisponible) ou a échoué ;
+- `MediaBlob` (public_api) tient un compteur de références : +1 à chaque rattachement, -1 à la
+  suppression d'une ligne. Les remplacements de fichier et les écritures hors ORM sont rattrapés par
+  `reconcile_refcounts` ; `collect_garbage` supprime les blobs sans référence après un délai de grâce.
+
+`blob_adopted` / `blob_collected` permettent aux apps d'y brancher leur travail dérivé
+(déclinaisons d'images : calculées une fois par blob, supprimées avec lui).
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import mimetypes
+import posixpath
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.db.models.fields.files import FieldFile, ImageFieldFile
+from django.dispatch import Signal
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BLOB_PREFIX = "blobs/sha256/"
+CHUNK_SIZE = 1024 * 1024
+
+# envoyé après le déplacement d'un upload direct vers sa clé de contenu (instance à jour)
+blob_adopted = Signal()
+# envoyé avant la suppression d'un blob du stockage (storage, name)
+blob_collected = Signal()
+
+
+def _blob_model():
+    return apps.get_model("public_api", "MediaBlob")
+
+
+def is_blob_name(name: str | None) -> bool:
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+def blob_name(digest: str, filename: str) -> str:
+    ext = posixpath.splitext(filename)[1].lower()[:10]
+    return f"{BLOB_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+def hash_chunks(chunks) -> tuple[str, int]:
+    digest, size = hashlib.sha256(), 0
+    for chunk in chunks:
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _acquire(blob_id: int) -> None:
+    _blob_model().objects.filter(pk=blob_id).update(refcount=F("refcount") + 1, released_at=None)
+
+
+def store_blob(storage, filename: str, content, max_length=None) -> str:
+    """Écrit `content` sous sa clé de contenu s'il n'est pas déjà stocké ; renvoie le nom du blob (+1 réf.)."""
+    digest, size = hash_chunks(content.chunks(CHUNK_SIZE))
+    content_type = getattr(content, "content_type", None) or mimetypes.guess_type(filename)[0] or ""
+    Blob = _blob_model()
+    with transaction.atomic():
+        # verrou de ligne : deux uploads simultanés du même contenu n'écrivent qu'une fois
+        blob, created = Blob.objects.select_for_update().get_or_create(
+            sha256=digest,
+            defaults={"name": blob_name(digest, filename), "size": size, "content_type": content_type},
+        )
+        if created:
+            stored = storage.save(blob.name, content, max_length=max_length)
+            if stored != blob.name:  # le storage a renommé (objet préexistant hors registre)
+                Blob.objects.filter(pk=blob.pk).update(name=stored)
+                blob.name = stored
+        _acquire(blob.pk)
+    return blob.name
+
+
+def release_blob(name: str) -> None:
+    if is_blob_name(name):
+        _blob_model().objects.filter(name=name).update(
+            refcount=F("refcount") - 1, released_at=timezone.now(),
+        )
+
+
+class DedupFieldFile(FieldFile):
+    def save(self, name, content, save=True):
+        self.name = store_blob(self.storage, name, content, max_length=self.field.max_length)
+        setattr(self.instance, self.field.attname, self.name)
+        self._committed = True
+        if save:
+            self.instance.save()
+
+    save.alters_data = True
+
+
+class DedupImageFieldFile(ImageFieldFile, DedupFieldFile):
+    pass
+
+
+class DedupFileField(models.FileField):
+    """FileField stocké par contenu (cf. module) ; `upload_to` ne sert plus qu'aux uploads directs."""
+    attr_class = DedupFieldFile
+
+
+class DedupImageField(models.ImageField):
+    attr_class = DedupImageFieldFile
+
+
+def dedup_fields():
+    """[(modèle, champ)] de tous les champs dédupliqués du projet."""
+    return [
+        (model, field)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, (DedupFileField, DedupImageField))
+    ]
+
+
+# ---------- Uploads directs : adoption ----------
+
+def _copy(storage, source: str, target: str) -> str:
+    """Copie côté serveur (S3), sans transit par le worker ; copie en streaming sinon."""
+    connection = getattr(storage, "connection", None)
+    if connection is not None:
+        bucket = storage.bucket_name
+        connection.meta.client.copy_object(
+            Bucket=bucket, Key=storage._normalize_name(target),
+            CopySource={"Bucket": bucket, "Key": storage._normalize_name(source)},
+            **({"ACL": storage.default_acl} if storage.default_acl else {}),
+        )
+        stored = target
+    else:
+        with storage.open(source, "rb") as fh:
+            stored = storage.save(target, fh)
+    return stored
+
+
+def adopt(model, pk, field_name: str) -> str | None:
+    """Hache en streaming le fichier d'une ligne et le remplace par son blob ; renvoie le nom du blob."""
+    field = model._meta.get_field(field_name)
+    name = model.objects.filter(pk=pk).values_list(field.attname, flat=True).first()
+    if not name or is_blob_name(name):
+        return name
+    storage = field.storage
+    with storage.open(name, "rb") as fh:
+        digest, size = hash_chunks(iter(lambda: fh.read(CHUNK_SIZE), b""))
+
+    Blob = _blob_model()
+    with transaction.atomic():
+        blob, created = Blob.objects.select_for_update().get_or_create(
+            sha256=digest,
+            defaults={"name": blob_name(digest, name), "size": size,
+                      "content_type": mimetypes.guess_type(name)[0] or ""},
+        )
+        if created:
+            stored = _copy(storage, name, blob.name)
+            if stored != blob.name:
+                Blob.objects.filter(pk=blob.pk).update(name=stored)
+                blob.name = stored
+        # la ligne a pu changer de fichier entre-temps : ne remplacer que le nom haché
+        if model.objects.filter(pk=pk, **{field.attname: name}).update(**{field.attname: blob.name}):
+            _acquire(blob.pk)
+        # l'objet déposé n'est plus référencé (contenu copié, ou déjà stocké)
+        transaction.on_commit(lambda: storage.delete(name))
+    instance = model.objects.filter(pk=pk).first()
+    if instance is not None and getattr(instance, field.attname) == blob.name:
+        blob_adopted.send(sender=model, instance=instance, field=field)
+    return blob.name
+
+
+def adopt_pending(batch: int = 200) -> int:
+    """Adopte les fichiers encore hors blob (tâche d'adoption perdue ou en échec) ; renvoie le nombre adopté."""
+    adopted = 0
+    for model, field in dedup_fields():
+        pks = (
+            model._base_manager.exclude(**{field.attname: ""})
+            .exclude(**{f"{field.attname}__isnull": True})
+            .exclude(**{f"{field.attname}__startswith": BLOB_PREFIX})
+            .order_by("pk").values_list("pk", flat=True)
+        )
+        for pk in pks.iterator():
+            if adopted >= batch:
+                return adopted
+            try:
+                adopt(model, pk, field.name)
+            except Exception:  # fichier absent, MinIO indisponible… : ligne sautée, nouvel essai au prochain passage
+                logger.warning("Adoption de %s#%s.%s impossible", model._meta.label, pk, field.name, exc_info=True)
+                continue
+            adopted += 1
+    return adopted
+
+
+# ---------- Réconciliation / ramasse-miettes ----------
+
+def reconcile_refcounts() -> int:
+    """Recompte les références réelles (remplacements de fichier, écritures hors ORM) ; renvoie les écarts."""
+    # blobs créés pendant le comptage exclus (leur référence peut ne pas encore être visible)
+    started = timezone.now()
+    counts = Counter()
+    for model, field in dedup_fields():
+        rows = (
+            model._base_manager.filter(**{f"{field.attname}__startswith": BLOB_PREFIX})
+            .order_by().values_list(field.attname).annotate(n=models.Count("pk"))
+        )
+        for name, n in rows:
+            counts[name] += n
+    Blob = _blob_model()
+    fixed = 0
+    for blob in Blob.objects.filter(created_at__lt=started).only("id", "name", "refcount").iterator():
+        actual = counts.get(blob.name, 0)
+        if blob.refcount != actual:
+            Blob.objects.filter(pk=blob.pk).update(
+                refcount=actual, released_at=started if actual == 0 else None,
+            )
+            fixed += 1
+    return fixed
+
+
+def _reference_count(name: str) -> int:
+    return sum(
+        model._base_manager.filter(**{field.attname: name}).count()
+        for model, field in dedup_fields()
+    )
+
+
+def _delete_blob_object(name: str) -> bool:
+    blob_collected.send(sender=None, storage=default_storage, name=name)
+    try:
+        default_storage.delete(name)
+    except Exception:
+        logger.warning("Suppression du blob %s impossible", name, exc_info=True)
+        return False
+    return True
+
+
+def collect_garbage(batch: int = 500) -> int:
+    """Supprime (stockage + registre) les blobs sans référence depuis MEDIA_BLOB_GC_GRACE_HOURS."""
+    Blob = _blob_model()
+    cutoff = timezone.now() - timedelta(hours=settings.MEDIA_BLOB_GC_GRACE_HOURS)
+    # released_at nul : blob jamais rattaché (upload direct adopté pour une ligne modifiée entre-temps)
+    candidates = Blob.objects.filter(
+        Q(released_at__lt=cutoff) | Q(released_at__isnull=True, created_at__lt=cutoff), refcount__lte=0,
+    ).order_by("created_at")[:batch]
+    collected = 0
+    for blob in candidates:
+        with transaction.atomic():
+            locked = Blob.objects.select_for_update().filter(pk=blob.pk, refcount__lte=0).first()
+            if locked is None:
+                continue
+            references = _reference_count(locked.name)
+            if references:  # compteur en retard (écriture hors ORM) : corrigé, blob conservé
+                Blob.objects.filter(pk=locked.pk).update(refcount=references, released_at=None)
+                continue
+            # objet supprimé sous le verrou de ligne : un store_blob concurrent du même contenu attend
+            # ce verrou et ne réécrit l'objet (même clé) qu'après la suppression de la ligne
+            if not _delete_blob_object(locked.name):
+                continue  # ligne conservée, nouvel essai au prochain passage
+            locked.delete()
+        collected += 1
+    return collected
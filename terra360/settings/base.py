@@ -64,6 +64,7 @@ ALLOWED_HOSTS = _split_csv_env("ALLOWED_HOSTS")  # ex: admin.example.com,example
 INSTALLED_APPS = [
     "django.contrib.admin",
     "django.contrib.gis",
+    "django.contrib.postgres",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
@@ -111,6 +112,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # En premier : mesure toute la chaîne (requêtes SQL, sérialisation, durée) — cf. terra360.instrumentation
+    "terra360.instrumentation.RequestMetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
 
@@ -193,6 +196,16 @@ REST_FRAMEWORK = {
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
     ],
+    # orjson si installé (public_api.renderers), sinon JSON standard de DRF
+    "DEFAULT_RENDERER_CLASSES": [
+        "public_api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "public_api.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": env_int("PAGE_SIZE", 100),
 }
@@ -239,7 +252,8 @@ MINIO_ENABLED = env_bool("MINIO_ENABLED", True)
 # ========== MinIO / S3 (django-storages) ==========
 if MINIO_ENABLED:
     # Default file storage -> S3/MinIO
-    STORAGES["default"] = {"BACKEND": "storages.backends.s3boto3.S3Boto3Storage"}
+    # S3Boto3Storage + client boto3 mutualisé par process et URLs calculées localement (cf. terra360.storage)
+    STORAGES["default"] = {"BACKEND": "terra360.storage.PooledS3Storage"}
 
     AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID", os.getenv("MINIO_ROOT_USER", "minioadmin"))
     AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY", os.getenv("MINIO_ROOT_PASSWORD", "minioadmin"))
@@ -252,9 +266,21 @@ if MINIO_ENABLED:
     AWS_S3_ADDRESSING_STYLE = os.getenv("AWS_S3_ADDRESSING_STYLE", "path")  # 'path' recommandé pour MinIO
     AWS_S3_VERIFY = env_bool("AWS_S3_VERIFY", False)  # souvent False derrière Traefik auto-signed lors des tests
 
+    # Endpoint vu par les navigateurs (URLs d'upload présignées : l'hôte fait partie de la signature)
+    AWS_S3_PUBLIC_ENDPOINT_URL = os.getenv("AWS_S3_PUBLIC_ENDPOINT_URL", AWS_S3_ENDPOINT_URL)
+
     # URLs publiques signées ? (laisse False si bucket public et Traefik en HTTPS)
     AWS_QUERYSTRING_AUTH = env_bool("AWS_QUERYSTRING_AUTH", False)
     AWS_DEFAULT_ACL = os.getenv("AWS_DEFAULT_ACL", "public-read")
+    # URLs signées : mémorisées par process tant qu'il leur reste plus de MARGIN secondes de validité
+    AWS_S3_SIGNED_URL_MARGIN = env_int("AWS_S3_SIGNED_URL_MARGIN", 60)
+    AWS_S3_SIGNED_URL_CACHE_SIZE = env_int("AWS_S3_SIGNED_URL_CACHE_SIZE", 10000)
+
+    # Pool HTTP du client partagé (threads gunicorn / Celery) ; keep-alive vers MinIO
+    AWS_S3_MAX_POOL_CONNECTIONS = env_int("AWS_S3_MAX_POOL_CONNECTIONS", 50)
+    AWS_S3_TCP_KEEPALIVE = env_bool("AWS_S3_TCP_KEEPALIVE", True)
+    AWS_S3_CONNECT_TIMEOUT = env_int("AWS_S3_CONNECT_TIMEOUT", 5)
+    AWS_S3_READ_TIMEOUT = env_int("AWS_S3_READ_TIMEOUT", 30)
 
     # Empêche l’écrasement si 2 fichiers ont le même nom
     AWS_S3_FILE_OVERWRITE = env_bool("AWS_S3_FILE_OVERWRITE", False)
@@ -302,6 +328,7 @@ SECURE_HSTS_PRELOAD = env_bool("SECURE_HSTS_PRELOAD", not DEBUG)
 # Fallback InMemory si pas de Redis configuré
 REDIS_HOST = os.getenv("REDIS_HOST", "redis")
 REDIS_PORT = env_int("REDIS_PORT", 6379)
+REDIS_URL = os.getenv("REDIS_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/0")
 USE_CHANNELS_REDIS = env_bool("USE_CHANNELS_REDIS", True)
 
 if USE_CHANNELS_REDIS:
@@ -314,6 +341,29 @@ if USE_CHANNELS_REDIS:
 else:
     CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
 
+# ========== Cache ==========
+# Redis partagé par tous les workers gunicorn/celery (base 1 : la 0 sert de broker)
+CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": os.getenv("CACHE_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/1"),
+        "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "terra360"),
+        # incrémenter CACHE_VERSION au déploiement pour abandonner d'un coup toutes les clés
+        "VERSION": env_int("CACHE_VERSION", 1),
+        "TIMEOUT": env_int("CACHE_DEFAULT_TIMEOUT", 300),
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "COMPRESSOR": "django_redis.compressors.zlib.ZlibCompressor",
+            "SOCKET_CONNECT_TIMEOUT": 2,
+            "SOCKET_TIMEOUT": 2,
+            # Redis indisponible → cache miss plutôt qu'une erreur 500
+            "IGNORE_EXCEPTIONS": env_bool("CACHE_IGNORE_EXCEPTIONS", True),
+        },
+    }
+}
+# Durée de vie des données de catalogue (invalidées de toute façon par signaux, cf. terra360.cache)
+CATALOGUE_CACHE_TTL = env_int("CATALOGUE_CACHE_TTL", 3600)
+
 # ========== Celery ==========
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", CELERY_BROKER_URL)
@@ -334,7 +384,87 @@ CELERY_BEAT_SCHEDULE = {
         "schedule": crontab(minute=30, hour=6),
         "args": (),
     },
+    # Compteurs de vues des annonces : Redis → base (UPDATE groupé)
+    "flush-listing-views": {
+        "task": "properties.flush_listing_views",
+        "schedule": timedelta(seconds=env_int("LISTING_VIEWS_FLUSH_SECONDS", 30)),
+    },
+    # Home : districts tendance recalculés hors requête
+    "refresh-home-trending-districts": {
+        "task": "public_api.refresh_home_section",
+        "schedule": timedelta(seconds=env_int("HOME_TRENDING_REFRESH_SECONDS", 600)),
+        "args": ("districts",),
+    },
+    # Autocomplétion : recalcul sur écriture, filet de sécurité horaire (écritures hors signaux)
+    "rebuild-search-suggestions-hourly": {
+        "task": "properties.rebuild_search_suggestions",
+        "schedule": crontab(minute=45),
+    },
+    # Déclinaisons d'images : programmées à l'upload, rattrapage des images non traitées
+    "process-pending-images": {
+        "task": "properties.process_pending_images",
+        "schedule": timedelta(minutes=10),
+    },
+    # Uploads directs jamais terminés : parts et objets orphelins supprimés
+    "purge-upload-intents": {
+        "task": "public_api.purge_upload_intents",
+        "schedule": timedelta(minutes=30),
+    },
+    # Médias dédupliqués : recomptage des références puis suppression des blobs orphelins
+    "collect-media-blobs": {
+        "task": "public_api.collect_media_blobs",
+        "schedule": crontab(minute=30, hour=3),
+    },
+    # Uploads directs dont l'adoption n'a pas pu être planifiée ou a échoué
+    "adopt-pending-media": {
+        "task": "public_api.adopt_pending_media",
+        "schedule": timedelta(minutes=15),
+    },
+    # Rollup /listings/stats/ : maintenu par signaux, réconcilié ici
+    "rebuild-listing-stats-hourly": {
+        "task": "properties.rebuild_listing_stats",
+        "schedule": crontab(minute=15),
+    },
+}
+
+# ========== Home (/home/) ==========
+# Durée de fraîcheur des sections (servies périmées pendant le recalcul asynchrone)
+HOME_SECTION_TTL = env_int("HOME_SECTION_TTL", 300)
+HOME_TRENDING_REFRESH_SECONDS = env_int("HOME_TRENDING_REFRESH_SECONDS", 600)
+# False : recalcul dans le process web (dev sans worker Celery)
+HOME_REFRESH_ASYNC = env_bool("HOME_REFRESH_ASYNC", True)
+
+# ========== Autocomplétion (/search/suggest/) ==========
+# Délai d'anti-rebond du recalcul après une écriture, et fréquence de vérification de la copie locale
+SUGGEST_REBUILD_DELAY = env_int("SUGGEST_REBUILD_DELAY", 10)
+SUGGEST_INDEX_CHECK_SECONDS = env_int("SUGGEST_INDEX_CHECK_SECONDS", 5)
+
+# ========== Photos (déclinaisons responsives, cf. properties.renditions) ==========
+# Largeurs max (px) par nom de déclinaison ; formats encodés si Pillow les prend en charge
+IMAGE_RENDITION_WIDTHS = {
+    "thumb": env_int("IMAGE_RENDITION_THUMB_WIDTH", 320),
+    "card": env_int("IMAGE_RENDITION_CARD_WIDTH", 768),
+    "full": env_int("IMAGE_RENDITION_FULL_WIDTH", 1600),
 }
+IMAGE_RENDITION_FORMATS = _split_csv_env("IMAGE_RENDITION_FORMATS") or ["webp", "avif"]
+IMAGE_RENDITION_QUALITY = env_int("IMAGE_RENDITION_QUALITY", 75)
+
+# ========== Uploads directs (cf. public_api.uploads) ==========
+UPLOAD_INTENT_TTL = env_int("UPLOAD_INTENT_TTL", 900)
+UPLOAD_MAX_IMAGE_SIZE = env_int("UPLOAD_MAX_IMAGE_SIZE", 15 * 1024 * 1024)
+UPLOAD_MAX_DOCUMENT_SIZE = env_int("UPLOAD_MAX_DOCUMENT_SIZE", 50 * 1024 * 1024)
+# au-delà : upload multipart S3, une URL présignée par part
+UPLOAD_MULTIPART_THRESHOLD = env_int("UPLOAD_MULTIPART_THRESHOLD", 16 * 1024 * 1024)
+UPLOAD_MULTIPART_PART_SIZE = env_int("UPLOAD_MULTIPART_PART_SIZE", 8 * 1024 * 1024)
+
+# ========== Fichiers sensibles : URLs signées (cf. terra360.signed_urls) ==========
+# KYC, documents de biens, pièces jointes : validité d'une URL, et durée minimale restante à la livraison
+PRIVATE_MEDIA_URL_TTL = env_int("PRIVATE_MEDIA_URL_TTL", 600)
+PRIVATE_MEDIA_URL_MARGIN = env_int("PRIVATE_MEDIA_URL_MARGIN", 120)
+
+# ========== Médias dédupliqués (cf. terra360.media) ==========
+# Délai avant suppression d'un blob devenu orphelin (re-upload du même fichier, restauration)
+MEDIA_BLOB_GC_GRACE_HOURS = env_int("MEDIA_BLOB_GC_GRACE_HOURS", 24)
 
 # ========== Paystack ==========
 PAYSTACK_SECRET_KEY = os.getenv("PAYSTACK_SECRET_KEY")
@@ -431,6 +561,30 @@ LOGGING = {
     },
 }
 
+# ========== Instrumentation (terra360.instrumentation) ==========
+SERVER_TIMING_ENABLED = env_bool("SERVER_TIMING_ENABLED", DEBUG)
+# Une même requête SQL répétée au moins N fois dans une requête HTTP = suspicion de N+1
+QUERY_DUPLICATE_THRESHOLD = env_int("QUERY_DUPLICATE_THRESHOLD", 3)
+# Budget de requêtes SQL par vue (nom de route) ; QUERY_BUDGET_STRICT lève une erreur (tests)
+QUERY_BUDGETS = {
+    "listing-list": 6,
+    "listing-detail": 5,
+    "listing-stats": 3,
+    "listing-clusters": 2,
+    "favorite-list": 6,
+    "visitrequest-list": 4,
+    "party-list": 4,
+    "amenity-list": 3,
+    "home": 8,
+    "search-suggest": 2,
+    "listing-tiles": 2,
+}
+QUERY_BUDGET_DEFAULT = None
+QUERY_BUDGET_STRICT = env_bool("QUERY_BUDGET_STRICT", False)
+# /metrics : jeton Bearer, ou à défaut IPs autorisées (scrape depuis le réseau interne)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1").split(",") if ip.strip()]
+
 # ========== Divers ==========
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap4"
 CRISPY_TEMPLATE_PACK = "bootstrap4"
@@ -0,0 +1,127 @@
+# terra360/signed_urls.py
+"""
+URLs signées à courte durée pour les fichiers sensibles (KYCDocument, PropertyDocument ;
+PartyAttachment, servi par l'admin uniquement).
+
+Le temps est découpé en fenêtres de PRIVATE_MEDIA_URL_TTL - PRIVATE_MEDIA_URL_MARGIN secondes :
+- chaque fichier est signé au plus une fois par fenêtre (validité PRIVATE_MEDIA_URL_TTL) et l'URL
+  est mise en cache (partagé entre process) jusqu'à la fin de la fenêtre ;
+- une page entière est résolue en un `get_many`, les manquants signés puis écrits en un `set_many` ;
+- une URL servie reste donc valable au moins PRIVATE_MEDIA_URL_MARGIN secondes, et `url_window()`
+  permet d'inclure la fenêtre dans un ETag (un 304 ne doit pas prolonger une URL expirée).
+
+Côté serializers : `SignedURLListSerializer` (préchargement de la page) + `SignedFileMixin`,
+sur le modèle de PendingViewsListSerializer / PendingViewsMixin.
+Sans stockage S3 (MINIO_ENABLED=False), `storage.url()` est renvoyé tel quel.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import time
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+SIGNED_URL_KEY = "signed-url:{}:{}"
+
+
+def _window_length() -> int:
+    return max(1, settings.PRIVATE_MEDIA_URL_TTL - settings.PRIVATE_MEDIA_URL_MARGIN)
+
+
+def url_window(now: float | None = None) -> int:
+    return int((time.time() if now is None else now) // _window_length())
+
+
+def url_window_started_at(now: float | None = None) -> float:
+    """Début de la fenêtre courante : Last-Modified minimal d'une réponse contenant des URLs signées."""
+    return url_window(now) * _window_length()
+
+
+def _cache_key(window: int, name: str) -> str:
+    return SIGNED_URL_KEY.format(window, hashlib.sha1(name.encode()).hexdigest())
+
+
+def _is_s3(storage) -> bool:
+    try:
+        from storages.backends.s3 import S3Storage
+    except ImportError:
+        return False
+    return isinstance(storage, S3Storage)
+
+
+def _sign(storage, name: str) -> str:
+    from storages.utils import clean_name
+
+    from .storage import presign_client
+
+    return presign_client().generate_presigned_url(
+        "get_object",
+        Params={"Bucket": storage.bucket_name, "Key": storage._normalize_name(clean_name(name))},
+        ExpiresIn=settings.PRIVATE_MEDIA_URL_TTL,
+    )
+
+
+def signed_urls(names: Iterable[str], storage=None) -> dict[str, str]:
+    """{nom: URL signée} pour un lot de fichiers, chacun signé au plus une fois par fenêtre."""
+    storage = storage or default_storage
+    names = {name for name in names if name}
+    if not names:
+        return {}
+    if not _is_s3(storage):
+        return {name: storage.url(name) for name in names}
+
+    now = time.time()
+    window = url_window(now)
+    keys = {_cache_key(window, name): name for name in names}
+    found = cache.get_many(list(keys))
+    urls = {keys[key]: url for key, url in found.items()}
+    missing = {key: _sign(storage, name) for key, name in keys.items() if key not in found}
+    if missing:
+        # jusqu'à la fin de la fenêtre : la suivante re-signe, l'URL a encore MARGIN secondes devant elle
+        timeout = max(1, math.ceil((window + 1) * _window_length() - now))
+        cache.set_many(missing, timeout=timeout)
+        urls.update({keys[key]: url for key, url in missing.items()})
+    return urls
+
+
+def signed_url(file) -> str | None:
+    """URL signée d'un FieldFile (admin, lignes isolées) ; None si vide."""
+    if not file:
+        return None
+    return signed_urls([file.name], file.storage)[file.name]
+
+
+# ---------- Serializers ----------
+
+class SignedURLListSerializer(serializers.ListSerializer):
+    """Signe en un lot les fichiers de toute la page, lus ensuite par SignedFileMixin.to_representation."""
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, "all") else data)
+        known = self.context.setdefault("signed_urls", {})
+        for field in self.child.signed_file_fields:
+            files = [getattr(item, field) for item in items]
+            files = [f for f in files if f and f.name not in known]
+            if files:
+                known.update(signed_urls((f.name for f in files), files[0].storage))
+        return super().to_representation(items)
+
+
+class SignedFileMixin:
+    """Remplace l'URL publique des `signed_file_fields` par une URL signée (cf. module)."""
+    signed_file_fields = ("file",)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        known = self.context.get("signed_urls") or {}
+        for field in self.signed_file_fields:
+            if field not in data:
+                continue  # champ exclu par ?fields=
+            file = getattr(instance, field)
+            data[field] = (known.get(file.name) or signed_url(file)) if file else None
+        return data
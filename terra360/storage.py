@@ -0,0 +1,135 @@
+# terra360/storage.py
+"""
+Backend de stockage MinIO/S3 (STORAGES["default"]) : connexions mutualisées, URLs calculées localement.
+
+`S3Storage` crée une ressource boto3 (session + client + pool HTTP) par thread, et
+`unsigned_connection` une seconde pour les URLs non signées : chaque thread de worker web
+ou Celery paie le chargement des modèles botocore et ouvre ses propres connexions TLS vers MinIO.
+`PooledS3Storage` :
+- partage une ressource par process (clé : pid + configuration ; recréée après un fork),
+  avec un pool dimensionné (AWS_S3_MAX_POOL_CONNECTIONS), TCP keep-alive et timeouts courts ;
+- `url()` sans AWS_QUERYSTRING_AUTH : simple concaténation endpoint/bucket/clé, sans boto3 ni
+  requête réseau (aucun HEAD) — même résultat que `generate_presigned_url` non signé ;
+- `url()` avec AWS_QUERYSTRING_AUTH : URL signée (calcul local) mémorisée dans un LRU du
+  process, réutilisée tant qu'il lui reste plus de AWS_S3_SIGNED_URL_MARGIN secondes de validité.
+
+Les clients botocore sont thread-safe ; la ressource partagée n'est utilisée que pour des appels
+sans état (get_object, head_object, put/copy), comme le `bucket` déjà partagé par S3Storage.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from urllib.parse import quote, urlsplit
+
+from botocore.config import Config
+from django.conf import settings
+from storages.backends.s3 import S3Storage
+from storages.utils import clean_name
+
+_connections: dict = {}
+_connections_lock = threading.Lock()
+
+
+class PooledS3Storage(S3Storage):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.client_config = self.client_config.merge(Config(
+            max_pool_connections=getattr(settings, "AWS_S3_MAX_POOL_CONNECTIONS", 50),
+            tcp_keepalive=getattr(settings, "AWS_S3_TCP_KEEPALIVE", True),
+            connect_timeout=getattr(settings, "AWS_S3_CONNECT_TIMEOUT", 5),
+            read_timeout=getattr(settings, "AWS_S3_READ_TIMEOUT", 30),
+            retries={"max_attempts": 3, "mode": "standard"},
+        ))
+        self.signed_url_margin = getattr(settings, "AWS_S3_SIGNED_URL_MARGIN", 60)
+        self._signed_urls_max = getattr(settings, "AWS_S3_SIGNED_URL_CACHE_SIZE", 10_000)
+        self._signed_urls: OrderedDict = OrderedDict()
+        self._signed_urls_lock = threading.Lock()
+        self._public_base = self._unsigned_base()
+
+    # ---------- Connexion mutualisée ----------
+
+    def _connection_key(self) -> tuple:
+        return (
+            os.getpid(), self.endpoint_url, self.region_name, self.access_key, self.session_profile,
+            self.use_ssl, self.verify, self.addressing_style, self.signature_version,
+        )
+
+    @property
+    def connection(self):
+        key = self._connection_key()
+        resource = _connections.get(key)
+        if resource is None:
+            with _connections_lock:
+                resource = _connections.get(key)
+                if resource is None:
+                    resource = self._create_session().resource(
+                        "s3",
+                        region_name=self.region_name,
+                        use_ssl=self.use_ssl,
+                        endpoint_url=self.endpoint_url,
+                        config=self.client_config,
+                        verify=self.verify,
+                    )
+                    _connections[key] = resource
+        return resource
+
+    # ---------- URLs ----------
+
+    def _unsigned_base(self) -> str | None:
+        """Préfixe des URLs publiques ; None si le calcul local n'est pas sûr (S3 AWS, domaine perso)."""
+        if self.custom_domain or not self.endpoint_url:
+            return None
+        endpoint = urlsplit(self.endpoint_url)
+        if self.addressing_style == "virtual":
+            return f"{endpoint.scheme}://{self.bucket_name}.{endpoint.netloc}{endpoint.path.rstrip('/')}/"
+        return f"{self.endpoint_url.rstrip('/')}/{self.bucket_name}/"
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        if not self.querystring_auth:
+            if self._public_base and not parameters and not http_method:
+                # même encodage que botocore (safe="/~")
+                return self._public_base + quote(self._normalize_name(clean_name(name)), safe="/~")
+            return super().url(name, parameters, expire, http_method)
+
+        expire = self.querystring_expire if expire is None else expire
+        if expire <= self.signed_url_margin:
+            return super().url(name, parameters, expire, http_method)
+        key = (name, expire, http_method, tuple(sorted((parameters or {}).items())))
+        now = time.monotonic()
+        with self._signed_urls_lock:
+            cached = self._signed_urls.get(key)
+            if cached and cached[1] > now:
+                self._signed_urls.move_to_end(key)
+                return cached[0]
+        url = super().url(name, parameters, expire, http_method)
+        with self._signed_urls_lock:
+            self._signed_urls[key] = (url, now + expire - self.signed_url_margin)
+            self._signed_urls.move_to_end(key)
+            while len(self._signed_urls) > self._signed_urls_max:
+                self._signed_urls.popitem(last=False)
+        return url
+
+
+@lru_cache(maxsize=1)
+def presign_client():
+    """
+    Client boto3 dédié à la signature (calcul local, aucun appel réseau), sur l'endpoint
+    public : l'hôte fait partie de la signature des URLs présignées.
+    """
+    import boto3
+
+    return boto3.session.Session().client(
+        "s3",
+        endpoint_url=settings.AWS_S3_PUBLIC_ENDPOINT_URL,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_S3_REGION_NAME,
+        config=Config(
+            signature_version=settings.AWS_S3_SIGNATURE_VERSION,
+            s3={"addressing_style": settings.AWS_S3_ADDRESSING_STYLE},
+        ),
+    )
@@ -0,0 +1,63 @@
+# terra360/tracking.py
+"""
+Suivi des champs modifiés depuis le chargement d'une instance.
+
+`TrackedFieldsMixin` mémorise les valeurs lues en base (`from_db`, sans requête supplémentaire) :
+- `changed_fields()` / `has_changed(*fields)` permettent aux signaux d'ignorer les sauvegardes
+  qui ne touchent pas les champs qui les concernent.
+
+`save()` garde sa sémantique habituelle (UPDATE, `auto_now`, signaux) : c'est aux receivers de
+décider, via `has_changed`, si une sauvegarde les concerne.
+"""
+from __future__ import annotations
+
+import copy
+
+
+def _snapshot_value(value):
+    # dict/list (JSONField…) peuvent être modifiés en place : on fige une copie
+    return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+
+class TrackedFieldsMixin:
+    """À placer avant la classe de base du modèle : `class Property(TrackedFieldsMixin, models.Model)`."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_fields()
+        return instance
+
+    def _snapshot_fields(self, fields=None):
+        loaded = self.__dict__.setdefault("_loaded_values", {})
+        for field in self._meta.concrete_fields:
+            if fields is not None and field.name not in fields and field.attname not in fields:
+                continue
+            if field.attname in self.__dict__:
+                loaded[field.attname] = _snapshot_value(self.__dict__[field.attname])
+
+    def changed_fields(self) -> set[str] | None:
+        """Noms des champs modifiés depuis le chargement ; None si l'instance n'a pas été lue en base."""
+        loaded = self.__dict__.get("_loaded_values")
+        if loaded is None:
+            return None
+        changed = set()
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue  # champ différé jamais affecté
+            if field.attname not in loaded or self.__dict__[field.attname] != loaded[field.attname]:
+                changed.add(field.name)
+        return changed
+
+    def has_changed(self, *fields: str) -> bool:
+        """Vrai si l'un des champs a changé (toujours vrai pour une instance non lue en base)."""
+        changed = self.changed_fields()
+        return changed is None or bool(changed & set(fields))
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._snapshot_fields(kwargs.get("update_fields"))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._snapshot_fields(fields)
@@ -20,8 +20,11 @@ from django.contrib import admin
 from django.http import HttpResponse
 from django.urls import path, include
 
+from terra360.instrumentation import metrics_view
+
 urlpatterns = [
     path("healthz", lambda r: HttpResponse("ok")),
+    path("metrics", metrics_view, name="metrics"),
     path('admin/', admin.site.urls),
     path("api/auth/", include("accounts.urls")),
     path("api/", include("public_api.urls")),